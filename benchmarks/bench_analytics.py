@@ -0,0 +1,163 @@
+"""
+The NumPy analytics against the code they replaced (pandas groupby with iterrows, a per-day window re-sum,
+and the per-sample EMA and power derivation loops of the dashboard), on synthetic 10s readings.
+
+    python -m benchmarks.bench_analytics --days 365
+"""
+
+import math
+import time
+from datetime import datetime
+from itertools import pairwise
+
+import numpy as np
+import typer
+
+from src.analytics import EMA_TAU_S
+from src.analytics import avg_daily_energy
+from src.analytics import daily_energy
+from src.analytics import daily_rows
+from src.analytics import derive_power
+from src.analytics import ema
+from src.analytics import moving_mean
+from src.helpers import local_timezone
+
+INTERVAL_MS = 10_000
+
+
+def legacy_daily(readings: list[dict]) -> list[dict]:
+    """The previous get_daily_energy_usage: a DataFrame grouped by date, then iterrows."""
+    import pandas as pd
+
+    df = pd.DataFrame(readings)
+    df["time"] = pd.to_datetime(df["t"], unit="ms")
+    df["energy"] = df["e"]
+    df = df.sort_values("time")
+    df = df[df["energy"].notna() & (df["energy"] > 0)]
+    df["date"] = df["time"].dt.date
+    daily = df.groupby("date").agg(
+        energy_start=("energy", "first"),
+        energy_end=("energy", "last"),
+        first_time=("time", "first"),
+        last_time=("time", "last"),
+    )
+    daily["daily_kwh"] = daily["energy_end"] - daily["energy_start"]
+    daily["is_partial"] = (daily["last_time"] - daily["first_time"]).dt.total_seconds() / 3600 < 23
+    result = []
+    for date, row in daily.iterrows():
+        midpoint = datetime.combine(date, datetime.min.time().replace(hour=12)).replace(
+            tzinfo=local_timezone()
+        )
+        result.append(
+            {
+                "t": int(midpoint.timestamp() * 1000),
+                "kwh": float(row["daily_kwh"]),
+                "is_partial": bool(row["is_partial"]),
+            }
+        )
+    return result
+
+
+def legacy_avg_daily(readings: list[dict]) -> float:
+    """The previous get_avg_daily_energy_usage: a DataFrame filtered to the last year."""
+    import pandas as pd
+
+    df = pd.DataFrame(readings)
+    df["time"] = pd.to_datetime(df["t"], unit="ms")
+    df = df.sort_values("time")
+    last_year = df[df["time"] >= df["time"].max() - pd.Timedelta(days=365)]
+    days_span = (last_year["time"].iloc[-1] - last_year["time"].iloc[0]).total_seconds() / 86400
+    return (last_year["e"].iloc[-1] - last_year["e"].iloc[0]) / days_span
+
+
+def legacy_moving_avg(values: list[float], window: int) -> list[float]:
+    """The previous get_moving_avg_daily_usage: slice and re-sum the window for every day."""
+    result = []
+    for i in range(len(values)):
+        window_values = values[max(0, i - window + 1) : i + 1]
+        result.append(sum(window_values) / len(window_values))
+    return result
+
+
+def legacy_ema(t_s: list[float], values: list[float], tau_s: float) -> list[float]:
+    """The series worker's per-sample EMA."""
+    out, state = [], None
+    for i, value in enumerate(values):
+        if state is None:
+            state = value
+        else:
+            state += (1 - math.exp(-max(0.0, t_s[i] - t_s[i - 1]) / tau_s)) * (value - state)
+        out.append(state)
+    return out
+
+
+def legacy_derive(readings: list[dict]) -> list[list[float]]:
+    """The dashboard's power derivation from consecutive energy readings."""
+    derived = []
+    for a, b in pairwise(readings):
+        if a["e"] is not None and b["e"] is not None and b["t"] > a["t"]:
+            derived.append([b["t"], max(0.0, (b["e"] - a["e"]) * 3_600_000_000 / (b["t"] - a["t"]))])
+    return derived
+
+
+def best_of(repeat: int, func, *args) -> tuple[float, object]:
+    """(best seconds, result) over repeat calls."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench(days: int = typer.Option(365, help="Days of synthetic readings"), repeat: int = 3) -> None:
+    """Time each analytics step the old way and the new way, and check that both agree."""
+    rng = np.random.default_rng(0)
+    count = days * 86_400_000 // INTERVAL_MS
+    end_ms = int(datetime.now().timestamp() * 1000)
+    t = (
+        end_ms
+        - count * INTERVAL_MS
+        + np.arange(count, dtype=np.int64) * INTERVAL_MS
+        + rng.integers(0, 300, count)
+    )
+    power = np.clip(400 + np.cumsum(rng.normal(0, 40, count)), 50, 11_000).round()
+    energy = (12_345 + np.cumsum(power) * INTERVAL_MS / 3_600_000_000).round(4)
+    readings = [
+        {"t": ti, "p": pi, "e": ei} for ti, pi, ei in zip(t.tolist(), power.tolist(), energy.tolist())
+    ]
+    t_s = (t / 1000).tolist()
+    power_list = power.tolist()
+
+    daily = daily_energy(t, energy)
+    kwh = daily["kwh"].tolist()
+    window = 30
+    steps = [
+        ("daily usage", (legacy_daily, readings), (lambda: daily_rows(daily_energy(t, energy)),)),
+        ("avg daily usage", (legacy_avg_daily, readings), (avg_daily_energy, t, energy)),
+        (f"moving avg ({window}d)", (legacy_moving_avg, kwh, window), (moving_mean, daily["kwh"], window)),
+        ("power EMA", (legacy_ema, t_s, power_list, EMA_TAU_S), (ema, t / 1000, power, EMA_TAU_S)),
+        ("power from energy", (legacy_derive, readings), (derive_power, t, energy)),
+    ]
+
+    typer.echo(f"{count} readings over {days} days ({len(kwh)} days of usage)")
+    typer.echo(f"{'step':22} {'before':>10} {'numpy':>10} {'speedup':>8}")
+    results = {}
+    for name, legacy, vectorized in steps:
+        legacy_s, legacy_result = best_of(repeat, *legacy)
+        numpy_s, numpy_result = best_of(repeat, *vectorized)
+        results[name] = (legacy_result, numpy_result)
+        typer.echo(f"{name:22} {legacy_s * 1000:8.1f}ms {numpy_s * 1000:8.1f}ms {legacy_s / numpy_s:7.1f}x")
+
+    legacy_avg, numpy_avg = results["avg daily usage"]
+    assert math.isclose(legacy_avg, numpy_avg, rel_tol=1e-3)
+    legacy_ma, numpy_ma = results[f"moving avg ({window}d)"]
+    assert np.allclose(legacy_ma, numpy_ma)
+    legacy_smoothed, numpy_smoothed = results["power EMA"]
+    assert np.allclose(legacy_smoothed, numpy_smoothed)
+    legacy_power, (_, numpy_power) = results["power from energy"]
+    assert np.allclose([watts for _, watts in legacy_power], numpy_power)
+
+
+if __name__ == "__main__":
+    typer.run(bench)
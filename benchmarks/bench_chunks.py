@@ -0,0 +1,110 @@
+"""
+Compression ratio and decode throughput of the chunk store against the row table, on synthetic 10s readings.
+
+    python -m benchmarks.bench_chunks --days 7
+"""
+
+import json
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import typer
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+import src.database
+from src.database import READING_FIELDS
+from src.database import Base
+from src.database import EnergyReading
+from src.database import ReadingChunk
+from src.database import get_reading_arrays
+from src.database import pack_chunks
+
+INTERVAL_MS = 10_000
+
+
+def synthetic_rows(days: int, end: datetime, seed: int = 0) -> list[dict]:
+    """Readings every ~10s: integer watts as a random walk, phases splitting it, cumulative kWh to 4 decimals."""
+    rng = np.random.default_rng(seed)
+    count = days * 86_400_000 // INTERVAL_MS
+    end_ms = int(end.timestamp() * 1000)
+    t = end_ms - count * INTERVAL_MS + np.arange(count) * INTERVAL_MS + rng.integers(0, 300, count)
+    power = np.clip(400 + np.cumsum(rng.normal(0, 40, count)), 50, 11_000).round()
+    energy = (12_345 + np.cumsum(power) * INTERVAL_MS / 3_600_000_000).round(4)
+    split = rng.dirichlet((5, 3, 2), count)
+    rows = []
+    for i in range(count):
+        phases = (power[i] * split[i]).round()
+        payload = {
+            "Meter_id": "0901454d4800007c5b0b",
+            "Power": power[i],
+            "E_in": energy[i],
+            "E_out": 0.0,
+            "Power_p1": phases[0],
+            "Power_p2": phases[1],
+            "Power_p3": phases[2],
+        }
+        rows.append(
+            {
+                "timestamp": datetime.fromtimestamp(t[i] / 1000),
+                **src.database.reading_values(payload),
+                "raw_payload": json.dumps({"Time": "", "MT681": payload}),
+            }
+        )
+    return rows
+
+
+def table_bytes(engine, table: str) -> int:
+    """Bytes of a table's pages and its indexes' pages, from SQLite's dbstat."""
+    query = text(
+        "SELECT sum(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = :table)"
+    )
+    with engine.connect() as conn:
+        return conn.scalar(query, {"table": table}) or 0
+
+
+def timed_read(repeat: int) -> tuple[int, float]:
+    """Read every field of every reading as arrays; return (readings, best seconds)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        arrays = get_reading_arrays(None, None, tuple(READING_FIELDS))
+        best = min(best, time.perf_counter() - start)
+    return len(arrays["t"]), best
+
+
+def bench(days: int = typer.Option(7, help="Days of synthetic readings"), repeat: int = 3) -> None:
+    """Load synthetic readings, then compare the row table with the packed chunks."""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        src.database.SessionLocal = sessionmaker(bind=engine, future=True)
+        with engine.begin() as conn:
+            conn.execute(EnergyReading.__table__.insert(), synthetic_rows(days, today))
+
+        row_bytes = table_bytes(engine, EnergyReading.__tablename__)
+        count, row_seconds = timed_read(repeat)
+        pack_chunks(today)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        chunk_bytes = table_bytes(engine, ReadingChunk.__tablename__)
+        packed_count, chunk_seconds = timed_read(repeat)
+        assert packed_count == count
+
+    typer.echo(f"{count} readings over {days} days")
+    typer.echo(
+        f"row table:   {row_bytes / 1e6:8.2f} MB  {row_bytes / count:6.1f} B/reading (incl. raw payloads)"
+    )
+    typer.echo(f"chunk table: {chunk_bytes / 1e6:8.2f} MB  {chunk_bytes / count:6.1f} B/reading")
+    typer.echo(f"compression: {row_bytes / chunk_bytes:.1f}x")
+    typer.echo(f"read rows:   {count / row_seconds / 1e6:8.2f} M readings/s")
+    typer.echo(f"decode:      {count / chunk_seconds / 1e6:8.2f} M readings/s")
+
+
+if __name__ == "__main__":
+    typer.run(bench)
@@ -0,0 +1,162 @@
+"""
+Writer/reader contention on one SQLite file: the MQTT ingest path writing at a fixed rate, concurrent API
+readers and the backup copy, each in its own process as in production. Reports p50/p99/max latency per role
+and the writer's time waiting for the write lock.
+
+    python -m benchmarks.bench_contention --seconds 30 --write-hz 10 --readers 4 --backup-every 5
+"""
+
+import multiprocessing
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+import typer
+from sqlalchemy.orm import sessionmaker
+
+import src.database
+from benchmarks.bench_chunks import synthetic_rows
+from src.database import Base
+from src.database import EnergyReading
+from src.database import create_db_engine
+from src.database import rebuild_rollups
+from src.locks import lock_wait_stats
+from src.locks import percentile
+
+PAYLOAD = {
+    "MT681": {
+        "Meter_id": "bench",
+        "Power": 512,
+        "E_in": 20_000.0,
+        "E_out": 0.0,
+        "Power_p1": 256,
+        "Power_p2": 154,
+        "Power_p3": 102,
+    }
+}
+
+
+def _use_database(db_path: Path):
+    """Point this process at the benchmark database, with the production engine setup."""
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    src.database.SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    return engine
+
+
+def _run_until(deadline: float, interval: float, action) -> list[float]:
+    """Call action every interval seconds (0 = back to back) until deadline; return latencies in ms."""
+    latencies = []
+    next_run = time.perf_counter()
+    while next_run < deadline:
+        time.sleep(max(0.0, next_run - time.perf_counter()))
+        start = time.perf_counter()
+        action()
+        latencies.append((time.perf_counter() - start) * 1000)
+        next_run = max(next_run + interval, time.perf_counter()) if interval else time.perf_counter()
+    return latencies
+
+
+def writer(db_path: Path, deadline: float, hz: float, results) -> None:
+    _use_database(db_path)
+    latencies = _run_until(deadline, 1 / hz, lambda: src.database.save_energy_reading(PAYLOAD))
+    results.put(("writer", latencies, lock_wait_stats()))
+
+
+def reader(db_path: Path, deadline: float, seed: int, start_ms: int, end_ms: int, results) -> None:
+    _use_database(db_path)
+    from src.app import app
+
+    client = app.test_client()
+    rng = random.Random(seed)
+
+    def request():
+        # Ranges from an hour to the whole history, so requests rarely repeat and hit both tiers
+        span = rng.choice((3_600_000, 86_400_000, end_ms - start_ms))
+        start = rng.randint(start_ms, max(start_ms, end_ms - span))
+        path = rng.choice(("/api/stats", "/api/readings"))
+        assert client.get(f"{path}?start={start}&end={start + span}").status_code == 200
+
+    results.put(("reader", _run_until(deadline, 0, request), None))
+
+
+def backup(db_path: Path, deadline: float, every: float, results) -> None:
+    """The first step of the backup job (src.git_tool): a plain cp of the live database file."""
+    copy = ["cp", str(db_path), f"{db_path}.bk"]
+    results.put(("backup", _run_until(deadline, every, lambda: subprocess.run(copy, check=True)), None))
+
+
+def seed(db_path: Path, days: int) -> tuple[int, int]:
+    """Fill the database with days of synthetic 10s readings and their rollups; return their extent in ms."""
+    engine = _use_database(db_path)
+    Base.metadata.create_all(bind=engine)
+    end = datetime.now().replace(microsecond=0) - timedelta(minutes=1)
+    rows = synthetic_rows(days, end)
+    with engine.begin() as conn:
+        conn.execute(EnergyReading.__table__.insert(), rows)
+    rebuild_rollups()
+    engine.dispose()
+    return int(rows[0]["timestamp"].timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def _line(role: str, latencies: list[float]) -> str:
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+    return f"{role:<10} {len(latencies):>7}  {p50:9.1f}  {p99:9.1f}  {max(latencies):9.1f}"
+
+
+def bench(
+    seconds: float = typer.Option(30, help="Duration of the concurrent run"),
+    write_hz: float = typer.Option(
+        10, help="Readings written per second (the meter sends about one per 10s)"
+    ),
+    readers: int = typer.Option(4, help="Concurrent API reader processes, each requesting back to back"),
+    backup_every: float = typer.Option(
+        5, help="Seconds between backup copies (0 disables the backup process)"
+    ),
+    seed_days: int = typer.Option(7, help="Days of synthetic readings loaded before the run"),
+) -> None:
+    """Run the writer, readers and backup concurrently and report latency percentiles per role."""
+    context = multiprocessing.get_context("spawn")  # fresh interpreters: no engine or pool shared by fork
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        start_ms, end_ms = seed(db_path, seed_days)
+        results = context.Queue()
+        deadline = time.perf_counter() + seconds + 5  # perf_counter is system-wide; leave time to spawn
+        processes = [context.Process(target=writer, args=(db_path, deadline, write_hz, results))]
+        processes += [
+            context.Process(target=reader, args=(db_path, deadline, i, start_ms, end_ms, results))
+            for i in range(readers)
+        ]
+        if backup_every:
+            processes.append(context.Process(target=backup, args=(db_path, deadline, backup_every, results)))
+        for process in processes:
+            process.start()
+        collected = [results.get(timeout=seconds + 120) for _ in processes]  # raises if a worker died
+        for process in processes:
+            process.join()
+
+    by_role: dict[str, list[float]] = {}
+    waits = None
+    for role, latencies, stats in collected:
+        by_role.setdefault(role, []).extend(latencies)
+        waits = stats or waits
+
+    typer.echo(
+        f"{seed_days} days seeded, {write_hz:g} writes/s, {readers} readers, backup every {backup_every:g}s"
+    )
+    typer.echo(f"{'role':<10} {'count':>7}  {'p50 ms':>9}  {'p99 ms':>9}  {'max ms':>9}")
+    for role in ("writer", "reader", "backup"):
+        if by_role.get(role):
+            typer.echo(_line(role, by_role[role]))
+    for kind in ("lock_wait", "commit"):
+        stats = waits[kind]
+        typer.echo(
+            f"{kind:<10} {stats['count']:>7}  {stats['p50_ms']:9.1f}  {stats['p99_ms']:9.1f}  {stats['max_ms']:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(bench)
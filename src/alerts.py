@@ -0,0 +1,219 @@
+"""Streaming alert rules evaluated at ingest time, with constant state per rule."""
+
+import logging
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+
+from src.config import ALERT_COOLDOWN_MINUTES
+from src.config import ALERT_DAILY_ENERGY_FACTOR
+from src.config import ALERT_NO_DATA_SECONDS
+from src.config import ALERT_PHASE_IMBALANCE_MINUTES
+from src.config import ALERT_PHASE_IMBALANCE_RATIO
+from src.config import ALERT_POWER_MINUTES
+from src.config import ALERT_POWER_WATTS
+from src.database import daily_energy_baseline
+from src.telegram import send_telegram_message
+
+logger = logging.getLogger(__name__)
+
+ALERT_CHECK_SECONDS = 10  # watchdog interval for rules that fire on the absence of readings
+# Phase imbalance is meaningless at idle load, where one appliance dominates a single phase
+MIN_PHASE_MEAN_WATTS = 100
+
+
+@dataclass
+class SustainedThresholdRule(ABC):
+    """Fires once a per-reading value has stayed above threshold for duration_s."""
+
+    name: str
+    threshold: float
+    duration_s: float
+    since: float | None = None
+    message: str | None = None
+
+    @abstractmethod
+    def value(self, values: dict) -> float | None:
+        """The value compared against threshold, None when the reading lacks it."""
+
+    @abstractmethod
+    def describe(self, value: float, seconds: float) -> str:
+        """The alert message once value has been above threshold for seconds."""
+
+    def update(self, t: float, values: dict):
+        value = self.value(values)
+        if value is None or value <= self.threshold:
+            self.since = self.message = None
+            return
+        if self.since is None:
+            self.since = t
+        if t - self.since >= self.duration_s:
+            self.message = self.describe(value, t - self.since)
+
+    def check(self, t: float):
+        pass
+
+
+@dataclass
+class PowerAboveRule(SustainedThresholdRule):
+    """Total power above threshold watts for duration_s."""
+
+    def value(self, values: dict) -> float | None:
+        return values.get("power_watts")
+
+    def describe(self, value: float, seconds: float) -> str:
+        return f"Power above {self.threshold:.0f} W for {seconds / 60:.0f} min (now {value:.0f} W)"
+
+
+@dataclass
+class PhaseImbalanceRule(SustainedThresholdRule):
+    """(max - min) / mean of the three phase powers above threshold for duration_s."""
+
+    def value(self, values: dict) -> float | None:
+        phases = [values.get(f"power_phase_{i}_watts") for i in (1, 2, 3)]
+        if None in phases:
+            return None
+        mean = sum(phases) / len(phases)
+        if mean < MIN_PHASE_MEAN_WATTS:
+            return None
+        return (max(phases) - min(phases)) / mean
+
+    def describe(self, value: float, seconds: float) -> str:
+        return f"Phase imbalance {value:.2f} above {self.threshold:.2f} for {seconds / 60:.0f} min"
+
+
+@dataclass
+class NoDataRule:
+    """No reading for max_silence_s. Checked by the watchdog, as a missing reading never reaches ingest."""
+
+    max_silence_s: float
+    name: str = "no_data"
+    last_seen: float | None = None
+    message: str | None = None
+
+    def update(self, t: float, values: dict):
+        self.last_seen = t
+        self.message = None
+
+    def check(self, t: float):
+        if self.last_seen is None:
+            self.last_seen = t  # count silence from startup
+        silence = t - self.last_seen
+        if silence > self.max_silence_s:
+            self.message = f"No readings for {silence / 60:.0f} min"
+
+
+@dataclass
+class DailyEnergyRule:
+    """Energy used since local midnight above factor x the typical daily usage.
+
+    The day's starting meter value and the typical usage are looked up once per day from the hourly rollups.
+    """
+
+    factor: float
+    name: str = "daily_energy"
+    day: date | None = None
+    start_kwh: float | None = None
+    typical_kwh: float | None = None
+    message: str | None = None
+
+    def update(self, t: float, values: dict):
+        energy = values.get("energy_in_kwh")
+        if not energy:
+            return
+        now = datetime.fromtimestamp(t)
+        if now.date() != self.day:
+            self.day = now.date()
+            self.start_kwh, self.typical_kwh = daily_energy_baseline(
+                datetime.combine(self.day, datetime.min.time())
+            )
+            self.start_kwh = self.start_kwh or energy
+            self.message = None
+        used = energy - self.start_kwh
+        if self.typical_kwh and used > self.factor * self.typical_kwh:
+            self.message = f"Used {used:.1f} kWh today, typical is {self.typical_kwh:.1f} kWh"
+
+    def check(self, t: float):
+        pass
+
+
+def default_rules() -> list:
+    """Build the enabled rules from [tool.config]."""
+    rules = []
+    if ALERT_POWER_WATTS:
+        rules.append(PowerAboveRule("power", ALERT_POWER_WATTS, ALERT_POWER_MINUTES * 60))
+    if ALERT_NO_DATA_SECONDS:
+        rules.append(NoDataRule(ALERT_NO_DATA_SECONDS))
+    if ALERT_DAILY_ENERGY_FACTOR:
+        rules.append(DailyEnergyRule(ALERT_DAILY_ENERGY_FACTOR))
+    if ALERT_PHASE_IMBALANCE_RATIO:
+        rules.append(
+            PhaseImbalanceRule(
+                "phase_imbalance", ALERT_PHASE_IMBALANCE_RATIO, ALERT_PHASE_IMBALANCE_MINUTES * 60
+            )
+        )
+    return rules
+
+
+def _notify_in_background(message: str):
+    """Send a Telegram message without blocking the ingest thread on the HTTP request."""
+    threading.Thread(target=send_telegram_message, args=(message,), daemon=True).start()
+
+
+class AlertEngine:
+    """
+    Feeds readings and watchdog ticks to the rules and debounces their alerts: a rule alerts once when its
+    condition starts, and again only after the condition cleared. Alerts within cooldown_s of the last one are
+    held back until the cooldown ends, and sent then if the condition still holds.
+    """
+
+    def __init__(
+        self, rules: list, notify=_notify_in_background, cooldown_s: float = ALERT_COOLDOWN_MINUTES * 60
+    ):
+        self.rules = rules
+        self.notify = notify
+        self.cooldown_s = cooldown_s
+        self._active: set[str] = set()
+        self._last_sent: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def on_reading(self, t: float, values: dict):
+        """Evaluate all rules against a reading with column values (see reading_values) stored at t."""
+        with self._lock:
+            for rule in self.rules:
+                rule.update(t, values)
+                self._dispatch(rule, t)
+
+    def tick(self, t: float):
+        """Evaluate the time-based conditions of all rules at t."""
+        with self._lock:
+            for rule in self.rules:
+                rule.check(t)
+                self._dispatch(rule, t)
+
+    def _dispatch(self, rule, t: float):
+        if rule.message is None:
+            self._active.discard(rule.name)
+            return
+        if rule.name in self._active:
+            return
+        if t - self._last_sent.get(rule.name, float("-inf")) < self.cooldown_s:
+            return
+        self._active.add(rule.name)
+        self._last_sent[rule.name] = t
+        logger.warning(f"🚨 [alert] {rule.name}: {rule.message}")
+        self.notify(rule.message)
+
+
+def run_watchdog(engine: AlertEngine, interval_s: float = ALERT_CHECK_SECONDS):
+    """Tick the engine forever so rules can fire when readings stop arriving."""
+    while True:
+        try:
+            engine.tick(time.time())
+        except Exception:
+            logger.exception("Alert watchdog tick failed")
+        time.sleep(interval_s)
@@ -0,0 +1,227 @@
+"""
+Energy analytics on NumPy column arrays, all O(n) without per-row Python objects: trailing moving windows
+from cumulative sums, a time-aware EMA as a closed-form recursive filter, power from energy deltas and
+local-day bucketing. NumPy is imported on first use, not at startup.
+"""
+
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+
+from src.helpers import local_timezone
+
+# Time constant of the power EMA, the same as the dashboard's series worker (~2-day response)
+EMA_TAU_S = 100_000
+# Time constants per EMA block: weights grow up to exp(EMA_BLOCK) within a block, far from overflowing
+EMA_BLOCK = 50
+MS_PER_YEAR = 365 * 86_400_000
+
+
+def _sorted(t_ms, *columns):
+    """The columns ordered by time; readings from the database already are, so this rarely sorts."""
+    import numpy as np
+
+    if len(t_ms) < 2 or (np.diff(t_ms) >= 0).all():
+        return (t_ms, *columns)
+    order = np.argsort(t_ms, kind="stable")
+    return (t_ms[order], *(column[order] for column in columns))
+
+
+def readings_to_arrays(readings: list[dict]) -> tuple:
+    """t (int64 ms) and energy (float64, NaN where missing) columns of {t, p, e} readings."""
+    import numpy as np
+
+    t = np.fromiter((row["t"] for row in readings), dtype=np.int64, count=len(readings))
+    energy = np.fromiter(
+        (np.nan if row.get("e") is None else row["e"] for row in readings),
+        dtype=np.float64,
+        count=len(readings),
+    )
+    return t, energy
+
+
+def moving_mean(values, window: int):
+    """Mean of each value and the up to window - 1 values before it, from one cumulative sum."""
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+
+def ema(t_s, values, tau_s: float = EMA_TAU_S):
+    """
+    Time-aware exponential moving average, y[i] = y[i-1] + alpha * (x[i] - y[i-1]) with
+    alpha = 1 - exp(-dt / tau), starting at x[0]. Unrolled, y[i] is a cumulative sum of inputs weighted
+    by exp(elapsed / tau), evaluated per block of EMA_BLOCK time constants. Values must be finite.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty(len(values))
+    if not len(values):
+        return out
+    # Elapsed time in time constants; time going backwards counts as no time, as in the worker
+    elapsed = np.concatenate(([0.0], np.cumsum(np.maximum(np.diff(np.asarray(t_s, dtype=np.float64)), 0))))
+    elapsed /= tau_s
+    alpha = -np.expm1(-np.diff(elapsed, prepend=0.0))
+    blocks = np.floor(elapsed / EMA_BLOCK)
+    starts = np.flatnonzero(np.diff(blocks, prepend=-1))
+    state = values[0]
+    for lo, hi in zip(starts, np.append(starts[1:], len(values)), strict=True):
+        state += alpha[lo] * (values[lo] - state)
+        growth = np.exp(elapsed[lo:hi] - elapsed[lo])
+        weighted = alpha[lo:hi] * values[lo:hi] * growth
+        weighted[0] = state
+        out[lo:hi] = np.cumsum(weighted) / growth
+        state = out[hi - 1]
+    return out
+
+
+def derive_power(t_ms, energy):
+    """Average watts between consecutive energy counter readings, at the later one's time; never negative."""
+    import numpy as np
+
+    t_ms, energy = _sorted(np.asarray(t_ms, dtype=np.int64), np.asarray(energy, dtype=np.float64))
+    dt = np.diff(t_ms)
+    delta = np.diff(energy)
+    valid = (dt > 0) & np.isfinite(delta)
+    return t_ms[1:][valid], np.maximum(0.0, delta[valid] * 3_600_000_000 / dt[valid])
+
+
+def _local_midnights_ms(first: date, days: int):
+    """Local midnight of each of `days` days from first, plus the midnight after the last (DST-safe)."""
+    import numpy as np
+
+    return np.array(
+        [
+            int(datetime.combine(first + timedelta(days=day), time()).timestamp() * 1000)
+            for day in range(days + 1)
+        ],
+        dtype=np.int64,
+    )
+
+
+def daily_energy(t_ms, energy) -> dict:
+    """
+    Energy used per local day from a cumulative counter, as arrays: "t" (local noon, ms), "kwh" (last minus
+    first reading of the day) and "is_partial" (readings cover less than 23 hours). Non-positive counter
+    values are dropped.
+    """
+    import numpy as np
+
+    t_ms, energy = _sorted(np.asarray(t_ms, dtype=np.int64), np.asarray(energy, dtype=np.float64))
+    valid = np.isfinite(energy) & (energy > 0)
+    t_ms, energy = t_ms[valid], energy[valid]
+    if len(t_ms) < 2:
+        return {"t": np.empty(0, dtype=np.int64), "kwh": np.empty(0), "is_partial": np.empty(0, dtype=bool)}
+
+    first = datetime.fromtimestamp(t_ms[0] / 1000).date()
+    last = datetime.fromtimestamp(t_ms[-1] / 1000).date()
+    midnights = _local_midnights_ms(first, (last - first).days + 1)
+    day = np.searchsorted(midnights, t_ms, side="right") - 1
+    starts = np.flatnonzero(np.diff(day, prepend=-1))
+    ends = np.append(starts[1:], len(t_ms)) - 1
+    noon = np.array(
+        [
+            int(
+                datetime.combine(first + timedelta(days=int(d)), time(12), local_timezone()).timestamp()
+                * 1000
+            )
+            for d in day[starts]
+        ],
+        dtype=np.int64,
+    )
+    return {
+        "t": noon,
+        "kwh": energy[ends] - energy[starts],
+        "is_partial": (t_ms[ends] - t_ms[starts]) < 23 * 3_600_000,
+    }
+
+
+def avg_daily_energy(t_ms, energy) -> float:
+    """Average kWh per day over the last year of a cumulative counter."""
+    import numpy as np
+
+    t_ms, energy = _sorted(np.asarray(t_ms, dtype=np.int64), np.asarray(energy, dtype=np.float64))
+    valid = np.isfinite(energy)
+    t_ms, energy = t_ms[valid], energy[valid]
+    if len(t_ms):
+        last_year = t_ms >= t_ms[-1] - MS_PER_YEAR
+        t_ms, energy = t_ms[last_year], energy[last_year]
+    if len(t_ms) < 2:
+        raise ValueError("Not enough data in the last year")
+    days_span = (t_ms[-1] - t_ms[0]) / 86_400_000
+    if days_span <= 0:
+        raise ValueError("Invalid time span")
+    return float((energy[-1] - energy[0]) / days_span)
+
+
+def daily_rows(daily: dict) -> list[dict]:
+    """Per-day arrays as the {t, kwh, is_partial} rows of /api/energy_summary."""
+    return [
+        {"t": t, "kwh": kwh, "is_partial": partial}
+        for t, kwh, partial in zip(
+            daily["t"].tolist(), daily["kwh"].tolist(), daily["is_partial"].tolist(), strict=True
+        )
+    ]
+
+
+def power_overlays(t_ms, power, energy, max_points: int, tau_s: float = EMA_TAU_S) -> dict:
+    """
+    Chart overlays for readings: power (derived from the energy deltas when no reading has power, as the
+    dashboard does) and its EMA, computed at full resolution and reduced to at most max_points as columns:
+    "t" (last reading of each slice), "power" (mean over the slice) and "ema" (at the slice's end).
+    """
+    import numpy as np
+
+    t_ms, power, energy = _sorted(
+        np.asarray(t_ms, dtype=np.int64),
+        np.asarray(power, dtype=np.float64),
+        np.asarray(energy, dtype=np.float64),
+    )
+    derived = bool(len(t_ms)) and bool(np.isnan(power).all())
+    if derived:
+        t_ms, power = derive_power(t_ms, energy)
+    else:
+        finite = np.isfinite(power)
+        t_ms, power = t_ms[finite], power[finite]
+    if not len(t_ms):
+        return {"derived": derived, "tau_s": tau_s, "t": [], "power": [], "ema": []}
+    smoothed = ema(t_ms / 1000, power, tau_s)
+
+    slices = min(len(t_ms), max_points)
+    starts = (np.arange(slices) * len(t_ms)) // slices
+    ends = np.append(starts[1:], len(t_ms)) - 1
+    means = np.add.reduceat(power, starts) / (ends - starts + 1)
+    return {
+        "derived": derived,
+        "tau_s": tau_s,
+        "t": t_ms[ends].tolist(),
+        "power": means.tolist(),
+        "ema": smoothed[ends].tolist(),
+    }
+
+
+def get_avg_daily_energy_usage(readings_data: list[dict]) -> float:
+    """Return the average daily energy usage over the last year from cumulative readings."""
+    return avg_daily_energy(*readings_to_arrays(readings_data))
+
+
+def get_daily_energy_usage(readings_data: list[dict]) -> list[dict]:
+    """Calculate daily energy consumption from cumulative readings, handling partial days."""
+    return daily_rows(daily_energy(*readings_to_arrays(readings_data)))
+
+
+def get_moving_avg_daily_usage(daily_energy_data: list[dict], window_days: int = 30) -> list[dict]:
+    """
+    Calculate 30-day moving average of daily energy consumption.
+    For each day, returns the average kWh consumption of the preceding window_days
+    (or fewer days if less history is available).
+    """
+    sorted_data = sorted(daily_energy_data, key=lambda x: x["t"])
+    averages = moving_mean([day["kwh"] for day in sorted_data], window_days)
+    return [{"t": day["t"], "kwh": kwh} for day, kwh in zip(sorted_data, averages.tolist(), strict=True)]
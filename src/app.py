@@ -2,30 +2,75 @@
 
 import json
 import logging
+import mimetypes
+from datetime import timedelta
 from pathlib import Path
 
 from flask import Flask
+from flask import Response
+from flask import abort
 from flask import jsonify
 from flask import redirect
 from flask import render_template
 from flask import request
+from flask import send_file
+from flask import stream_with_context
 from flask_compress import Compress
 
+from src.analytics import EMA_TAU_S
+from src.analytics import avg_daily_energy
+from src.analytics import daily_energy
+from src.analytics import daily_rows
+from src.analytics import moving_mean
+from src.analytics import power_overlays
+from src.assets import ASSETS_DIR
+from src.assets import build_assets
+from src.assets import precompressed
 from src.config import FLASK_PORT
+from src.config import LOCK_WAIT_LOG_MS
 from src.config import MQTT_PORT
+from src.config import READINGS_PAGE_MAX
+from src.config import RESPONSE_MAX_ROWS
 from src.config import SERVER_URL
+from src.config import SLOW_QUERY_MS
 from src.config import TASMOTA_UI_URL
 from src.config import TOPIC
-from src.database import get_avg_daily_energy_usage
-from src.database import get_daily_energy_usage
-from src.database import get_moving_avg_daily_usage
+from src.database import PHASE_FIELDS
+from src.database import count_readings
+from src.database import get_bucketed_readings
+from src.database import get_gaps
+from src.database import get_phase_stats
+from src.database import get_reading_arrays
 from src.database import get_readings
+from src.database import get_readings_page
 from src.database import get_stats
+from src.database import get_time_extent
 from src.database import latest_energy_reading
 from src.database import num_energy_readings_last_hour
 from src.database import num_total_energy_readings
+from src.export import parse_fields
+from src.export import stream_export
+from src.heatmap import get_heatmap
+from src.heatmap import parse_metric
 from src.helpers import parse_time_param
+from src.jobs import read_job_status
+from src.locks import lock_wait_stats
+from src.memory import memory_stats
+from src.memory import start_tracing
+from src.memory import stop_tracing
 from src.mqtt import get_mqtt_client
+from src.profile import parse_season
+from src.profile import profile_summary
+from src.querylog import recent_slow_queries
+from src.resample import parse_aggregations
+from src.resample import parse_fill
+from src.resample import parse_interval
+from src.resample import resample
+from src.singleflight import single_flight
+from src.singleflight import single_flight_stats
+from src.tiles import get_tile
+from src.tiles import tile_index
+from src.wal import wal_status
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,10 +85,31 @@ app = Flask(
 Compress(app)  # Enable gzip compression for responses > 500 bytes
 logging.getLogger("werkzeug").setLevel(logging.WARNING)
 
+# Static JS/CSS are served from fingerprinted, precompressed copies, so Compress never touches them
+try:
+    ASSET_MANIFEST = build_assets()
+except OSError:
+    logger.exception("Could not build static assets, serving them from /static")
+    ASSET_MANIFEST = {}
+ASSET_NAMES = set(ASSET_MANIFEST.values())
+ASSET_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+DEFAULT_MAX_POINTS = 1000
+# Complete tiles only change when history is backfilled
+COMPLETE_TILE_MAX_AGE_SECONDS = 3600
+
 # Mobile user-agent patterns (exclude iPad - it should see desktop)
 MOBILE_PATTERNS = ["Mobile", "Android", "iPhone", "iPod", "BlackBerry", "Windows Phone"]
 
 
+@app.template_global()
+def asset_url(name: str) -> str:
+    """URL of a static asset: its fingerprinted build if available, else the plain static file."""
+    if name in ASSET_MANIFEST:
+        return f"/assets/{ASSET_MANIFEST[name]}"
+    return f"/static/{name}"
+
+
 def is_mobile_user_agent() -> bool:
     """Check if the request is from a mobile device (excluding iPad)."""
     user_agent = request.headers.get("User-Agent", "")
@@ -61,33 +127,117 @@ def index():
     return render_template("index.html")
 
 
+@app.get("/assets/<name>")
+def asset(name: str):
+    """Serve a fingerprinted asset in the best precompressed encoding the client accepts."""
+    if name not in ASSET_NAMES:
+        abort(404)
+    path, encoding = precompressed(ASSETS_DIR, name, request.accept_encodings)
+    response = send_file(path, mimetype=mimetypes.guess_type(name)[0], max_age=ASSET_MAX_AGE_SECONDS)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.get("/mobile")
 def mobile():
     """Serve the mobile-optimized frontend."""
     return render_template("mobile.html")
 
 
+def _page_limit(value: str | None) -> int:
+    """Parse the `limit` query parameter, capped at readings_page_max."""
+    if value is None:
+        return READINGS_PAGE_MAX
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(int(value), READINGS_PAGE_MAX)
+
+
+def _export_interval(value: str | None) -> int | None:
+    """Parse the export `interval` query parameter in whole seconds; None exports unresampled readings."""
+    if value is None:
+        return None
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError("interval must be a positive number of seconds")
+    return int(value)
+
+
+def _max_points(value: str | None) -> int:
+    """Parse the `max_points` query parameter, capped at response_max_rows like unpaged readings."""
+    if value is None:
+        return DEFAULT_MAX_POINTS
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError("max_points must be a positive integer")
+    return min(int(value), RESPONSE_MAX_ROWS) if RESPONSE_MAX_ROWS else int(value)
+
+
 @app.get("/api/readings")
 def api_readings():
-    """Return readings as {t, p, e} for timestamp, power, energy."""
+    """
+    Return readings as {t, p, e} for timestamp, power, energy (or the requested `fields`).
+    With `after` or `limit`, return one page {readings, next} of full-resolution readings instead.
+    """
     start = parse_time_param(request.args.get("start"))
     end = parse_time_param(request.args.get("end"))
-    data = get_readings(start=start, end=end)
-    return jsonify(data)
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        if "after" not in request.args and "limit" not in request.args:
+            # Cached results were counted when they were fetched
+            if (
+                RESPONSE_MAX_ROWS
+                and not get_readings.cached(start=start, end=end, fields=fields)
+                and (count := count_readings(start, end)) > RESPONSE_MAX_ROWS
+            ):
+                message = f"{count} readings, at most {RESPONSE_MAX_ROWS} per response: page with after/limit"
+                return jsonify({"error": message}), 413
+            return jsonify(get_readings(start=start, end=end, fields=fields))
+        limit = _page_limit(request.args.get("limit"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    after = parse_time_param(request.args.get("after"))
+    if after is not None:
+        # The cursor is the last reading's t: continue strictly after it
+        after += timedelta(milliseconds=1)
+        start = after if start is None else max(start, after)
+    readings, next_cursor = get_readings_page(start, end, fields, limit)
+    return jsonify({"readings": readings, "next": next_cursor})
+
+
+@single_flight
+def _energy_summary() -> dict:
+    """The full history's daily usage from the energy column alone; a reload storm reads it once."""
+    arrays = get_reading_arrays(None, None, ("e",))
+    daily = daily_energy(arrays["t"], arrays["e"])
+    moving_avg = moving_mean(daily["kwh"], 30)
+    return {
+        "avg_daily": avg_daily_energy(arrays["t"], arrays["e"]),
+        "daily": daily_rows(daily),
+        "moving_avg_30d": [
+            {"t": t, "kwh": kwh} for t, kwh in zip(daily["t"].tolist(), moving_avg.tolist(), strict=True)
+        ],
+    }
 
 
 @app.get("/api/energy_summary")
 def energy_summary():
-    """Return avg daily, per-day energy usage, and 30-day moving average."""
-    data = get_readings(start=None, end=None)
-    daily_data = get_daily_energy_usage(data)
-    return jsonify(
-        {
-            "avg_daily": get_avg_daily_energy_usage(data),
-            "daily": daily_data,
-            "moving_avg_30d": get_moving_avg_daily_usage(daily_data, window_days=30),
-        }
-    )
+    """
+    Return avg daily, per-day energy usage, and 30-day moving average.
+    With `since`, only days from `since` on are returned, plus `before_kwh`: the total of the days before,
+    which clients holding those days use to detect that history changed.
+    """
+    summary = dict(_energy_summary())
+    daily_data = summary["daily"]
+    since = parse_time_param(request.args.get("since"))
+    if since is not None:
+        since_ms = int(since.timestamp() * 1000)
+        summary["before_kwh"] = sum(day["kwh"] for day in daily_data if day["t"] < since_ms)
+        summary["daily"] = [day for day in daily_data if day["t"] >= since_ms]
+        summary["moving_avg_30d"] = [day for day in summary["moving_avg_30d"] if day["t"] >= since_ms]
+    return jsonify(summary)
 
 
 @app.get("/api/latest_reading")
@@ -115,9 +265,149 @@ def api_stats():
     )
 
 
+@app.get("/api/phases")
+def api_phases():
+    """Return downsampled per-phase power series {t, p1, p2, p3} and per-phase stats for [start, end]."""
+    start = parse_time_param(request.args.get("start"))
+    end = parse_time_param(request.args.get("end"))
+    try:
+        max_points = _max_points(request.args.get("max_points"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    extent = get_time_extent(start, end)
+    if extent is None:
+        return jsonify({"bucket_ms": None, "series": [], "stats": get_phase_stats(start, end)})
+    first_ms, last_ms = extent
+    bucket_ms = max(1, -(-(last_ms - first_ms + 1) // max_points))  # ceil division
+    return jsonify(
+        {
+            "bucket_ms": bucket_ms,
+            "series": get_bucketed_readings(start, end, fields=PHASE_FIELDS, bucket_ms=bucket_ms),
+            "stats": get_phase_stats(start, end),
+        }
+    )
+
+
+@app.get("/api/overlays")
+def api_overlays():
+    """
+    Return server-computed chart overlays for [start, end] as columns {t, power, ema}: power (derived from
+    energy deltas if no reading has power) and its time-aware EMA with time constant `tau` seconds.
+    """
+    start = parse_time_param(request.args.get("start"))
+    end = parse_time_param(request.args.get("end"))
+    try:
+        max_points = _max_points(request.args.get("max_points"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    tau_s = request.args.get("tau", EMA_TAU_S, type=float)
+    if tau_s is None or not tau_s > 0:
+        return jsonify({"error": "tau must be a positive number of seconds"}), 400
+    arrays = get_reading_arrays(start, end, ("p", "e"))
+    return jsonify(power_overlays(arrays["t"], arrays["p"], arrays["e"], max_points, tau_s))
+
+
+@app.get("/api/profile")
+def api_profile():
+    """
+    Return the typical load profile (per weekday and 15-minute slot, `season` all, current or a season name),
+    the expected kWh of the trailing day, week and month, and forecasts of the current day, week and month.
+    """
+    try:
+        seasons = parse_season(request.args.get("season"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(profile_summary(seasons))
+
+
+@app.get("/api/heatmap")
+def api_heatmap():
+    """
+    Return a dense local day x hour matrix over [start, end] (default: the last 365 days) of hourly kWh
+    (`metric=energy`), mean or max power, from the hourly rollups.
+    """
+    start = parse_time_param(request.args.get("start"))
+    end = parse_time_param(request.args.get("end"))
+    try:
+        return jsonify(get_heatmap(start, end, parse_metric(request.args.get("metric"))))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.get("/api/resample")
+def api_resample():
+    """
+    Return power and energy at a fixed `interval` (e.g. 5m, 1h, 1d) aligned to local time over [start, end),
+    as columns: "t" and one list per `agg` (mean, max, min, energy_delta). `fill=linear` interpolates gaps.
+    """
+    start = parse_time_param(request.args.get("start"))
+    end = parse_time_param(request.args.get("end"))
+    if start is None or end is None:
+        return jsonify({"error": "start and end are required"}), 400
+    try:
+        interval_s = parse_interval(request.args.get("interval"))
+        aggregations = parse_aggregations(request.args.get("agg"))
+        fill = parse_fill(request.args.get("fill"))
+        if end <= start:
+            raise ValueError("end must be after start")
+        return jsonify(resample(start, end, interval_s, aggregations, fill))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.get("/api/export")
+def api_export():
+    """Stream readings in [start, end] as a CSV or Parquet download, optionally resampled."""
+    start = parse_time_param(request.args.get("start"))
+    end = parse_time_param(request.args.get("end"))
+    fmt = request.args.get("format", "csv")
+    try:
+        interval = _export_interval(request.args.get("interval"))
+        chunks = stream_export(start, end, parse_fields(request.args.get("fields")), fmt, interval)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mimetype = "application/vnd.apache.parquet" if fmt == "parquet" else "text/csv"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=energy_readings.{fmt}"},
+    )
+
+
+@app.get("/api/tiles")
+def api_tile_index():
+    """Return the tile grid (levels with bucket and tile span) and the extent of stored readings."""
+    return jsonify(tile_index())
+
+
+@app.get("/api/tiles/<int:level>/<int:index>")
+def api_tile(level: int, index: int):
+    """Return one time tile of readings: raw at level 0, bucket averages at coarser levels."""
+    try:
+        tile = get_tile(level, index, fields=parse_fields(request.args.get("fields")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify(tile)
+    response.cache_control.max_age = COMPLETE_TILE_MAX_AGE_SECONDS if tile["complete"] else 0
+    response.cache_control.no_cache = not tile["complete"]
+    # Clients keep tiles across page loads and revalidate them; unchanged tiles are answered with a 304
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.get("/api/gaps")
+def api_gaps():
+    """Return gaps in the readings overlapping [start, end], for shading outages."""
+    start = parse_time_param(request.args.get("start"))
+    end = parse_time_param(request.args.get("end"))
+    return jsonify(get_gaps(start=start, end=end))
+
+
 @app.get("/api/clear_cache")
 def clear_cache():
-    """Clear Python LRU cache for get_readings. Visit in browser or call via curl."""
+    """Clear the get_readings cache. Not needed for freshness: written readings invalidate it on their own."""
     cache_info = get_readings.cache_info()
     get_readings.cache_clear()
     logger.info(f"Cleared cache: {cache_info}")
@@ -129,6 +419,37 @@ def clear_cache():
     )
 
 
+@app.get("/api/debug/slow_queries")
+def debug_slow_queries():
+    """List the most recent statements over slow_query_ms with their parameters and query plan."""
+    return jsonify({"threshold_ms": SLOW_QUERY_MS, "queries": recent_slow_queries()})
+
+
+@app.get("/api/debug/lock_waits")
+def debug_lock_waits():
+    """Percentiles of this process's waits for the SQLite write lock and of its commits."""
+    return jsonify({"threshold_ms": LOCK_WAIT_LOG_MS, **lock_wait_stats()})
+
+
+@app.get("/api/debug/memory")
+def debug_memory():
+    """
+    This process's RSS, the cache memory budget and per-cache sizes. `trace=start` starts tracemalloc, after
+    which the `top` (default 10) allocation sites are included until `trace=stop`.
+    """
+    trace = request.args.get("trace")
+    top = request.args.get("top", 10, type=int)
+    if trace not in (None, "start", "stop"):
+        return jsonify({"error": "trace must be start or stop"}), 400
+    if top is None or top < 1:
+        return jsonify({"error": "top must be a positive integer"}), 400
+    if trace == "start":
+        start_tracing()
+    elif trace == "stop":
+        stop_tracing()
+    return jsonify(memory_stats(top))
+
+
 @app.get("/status")
 def status():
     """Return service status information."""
@@ -144,6 +465,9 @@ def status():
         "last_reading": latest_energy_reading(),
         "num_readings_last_hour": num_energy_readings_last_hour(),
         "num_total_readings": num_total_energy_readings(),
+        "wal": wal_status(),
+        "jobs": read_job_status(),
+        "single_flight": single_flight_stats(),
     }
 
 
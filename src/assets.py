@@ -0,0 +1,64 @@
+"""Fingerprinted static assets with precomputed gzip and brotli variants, built once at startup."""
+
+import gzip
+import hashlib
+import logging
+from pathlib import Path
+
+import brotli
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+STATIC_DIR = project_root / "static"
+ASSETS_DIR = STATIC_DIR / "dist"
+ASSET_SUFFIXES = (".js", ".css")
+# Content-Encoding -> file suffix of the precompressed variant, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+HASH_LENGTH = 12
+
+
+def fingerprint(name: str, content: bytes) -> str:
+    """Return the content-hashed file name for an asset, e.g. app.js -> app.3f2a9c1b7e4d.js."""
+    stem, suffix = name.rsplit(".", 1)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}.{suffix}"
+
+
+def build_assets(static_dir: Path = STATIC_DIR, out_dir: Path = ASSETS_DIR) -> dict[str, str]:
+    """
+    Write hashed copies of the static JS and CSS files with .gz and .br variants into out_dir and remove
+    stale builds. Unchanged assets are not recompressed. Returns the manifest {name: hashed name}.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for path in sorted(static_dir.iterdir()):
+        if path.suffix not in ASSET_SUFFIXES:
+            continue
+        content = path.read_bytes()
+        hashed = fingerprint(path.name, content)
+        manifest[path.name] = hashed
+        if (out_dir / f"{hashed}.br").exists():
+            continue
+        (out_dir / hashed).write_bytes(content)
+        (out_dir / f"{hashed}.gz").write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        (out_dir / f"{hashed}.br").write_bytes(brotli.compress(content, quality=11))
+        logger.info(f"📦 [assets] Built {hashed}")
+
+    current = set(manifest.values())
+    for path in out_dir.iterdir():
+        if path.name.removesuffix(".gz").removesuffix(".br") not in current:
+            path.unlink()
+    return manifest
+
+
+def precompressed(out_dir: Path, hashed: str, accept_encodings) -> tuple[Path, str | None]:
+    """Pick the best variant of a built asset for the client's Accept-Encoding: (path, Content-Encoding)."""
+    encoding = accept_encodings.best_match(list(ENCODINGS))
+    if encoding is None:
+        return out_dir / hashed, None
+    return out_dir / f"{hashed}{ENCODINGS[encoding]}", encoding
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_assets()
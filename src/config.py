@@ -18,6 +18,30 @@ TASMOTA_UI_URL = _tool_config["tasmota_ui_url"]
 DATABASE_URL = f"sqlite:///{_tool_config['database_path']}"
 TUNNEL_NAME = _tool_config["tunnel_name"]
 DOMAIN_SUFFIX = _tool_config["domain_suffix"]
+GAP_THRESHOLD_SECONDS = _tool_config["gap_threshold_seconds"]
+HEALTH_CHECK_MAX_MISSING_SECONDS = _tool_config["health_check_max_missing_seconds"]
+SLOW_QUERY_MS = _tool_config["slow_query_ms"]
+LOCK_WAIT_LOG_MS = _tool_config["lock_wait_log_ms"]
+READINGS_PAGE_MAX = _tool_config["readings_page_max"]
+MEMORY_BUDGET_MB = _tool_config["memory_budget_mb"]
+RESPONSE_MAX_ROWS = _tool_config["response_max_rows"]
+MQTT_QUEUE_MAX = _tool_config["mqtt_queue_max"]
+WAL_CHECKPOINT_SECONDS = _tool_config["wal_checkpoint_seconds"]
+WAL_RESTART_MB = _tool_config["wal_restart_mb"]
+WAL_TRUNCATE_MB = _tool_config["wal_truncate_mb"]
+WAL_QUIET_SECONDS = _tool_config["wal_quiet_seconds"]
+WAL_AUTOCHECKPOINT_PAGES = _tool_config["wal_autocheckpoint_pages"]
+RETENTION_RAW_DAYS = _tool_config["retention_raw_days"]
+RETENTION_MINUTE_DAYS = _tool_config["retention_minute_days"]
+COMPACTION_BATCH_ROWS = _tool_config["compaction_batch_rows"]
+CHUNK_STORE_DAYS = _tool_config["chunk_store_days"]
+ALERT_POWER_WATTS = _tool_config["alert_power_watts"]
+ALERT_POWER_MINUTES = _tool_config["alert_power_minutes"]
+ALERT_NO_DATA_SECONDS = _tool_config["alert_no_data_seconds"]
+ALERT_DAILY_ENERGY_FACTOR = _tool_config["alert_daily_energy_factor"]
+ALERT_PHASE_IMBALANCE_RATIO = _tool_config["alert_phase_imbalance_ratio"]
+ALERT_PHASE_IMBALANCE_MINUTES = _tool_config["alert_phase_imbalance_minutes"]
+ALERT_COOLDOWN_MINUTES = _tool_config["alert_cooldown_minutes"]
 
 
 # fmt: off
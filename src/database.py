@@ -1,60 +1,103 @@
 import json
 import logging
+import math
+import sqlite3
+import threading
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
-from functools import lru_cache
 
-import pandas as pd
 import sqlalchemy
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Float
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import LargeBinary
 from sqlalchemy import String
 from sqlalchemy import Text
+from sqlalchemy import cast
 from sqlalchemy import create_engine
+from sqlalchemy import delete
 from sqlalchemy import event
 from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import select
 from sqlalchemy import text
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from src.config import DATABASE_URL
+from src.config import GAP_THRESHOLD_SECONDS
+from src.config import HEALTH_CHECK_MAX_MISSING_SECONDS
+from src.config import LOCK_WAIT_LOG_MS
+from src.config import RETENTION_MINUTE_DAYS
+from src.config import RETENTION_RAW_DAYS
+from src.config import SLOW_QUERY_MS
+from src.config import WAL_AUTOCHECKPOINT_PAGES
 from src.helpers import local_timezone
 from src.helpers import timed
+from src.locks import TimedConnection
+from src.locks import install_lock_timing
+from src.querycache import DataState
+from src.querycache import range_cache
+from src.querylog import install_slow_query_log
+from src.singleflight import single_flight
 from src.telegram import report_missing_data_to_telegram
 
 logger = logging.getLogger(__name__)
 
 
-# Configure engine with timeout and connection pool settings for better concurrency
-engine = create_engine(
-    DATABASE_URL,
-    future=True,
-    connect_args={
-        "timeout": 20.0,  # Wait up to 20 seconds for lock to be released
-        "check_same_thread": False,  # Allow multi-threaded access
-    },
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600,  # Recycle connections after 1 hour
-)
-
-
-@event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_conn, connection_record):
     """Enable WAL mode for better concurrency."""
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL, still safe
     cursor.execute("PRAGMA busy_timeout=20000")  # 20 second timeout
+    # Checkpoints are managed by the scheduler (src.wal), keep them out of the ingest commit path
+    cursor.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT_PAGES}")
     cursor.close()
 
 
+def create_db_engine(url: str = DATABASE_URL):
+    """Create an engine with the pragmas, lock-wait timing and slow-query log every connection gets."""
+    # Configure engine with timeout and connection pool settings for better concurrency
+    db_engine = create_engine(
+        url,
+        future=True,
+        connect_args={
+            "timeout": 20.0,  # Wait up to 20 seconds for lock to be released
+            "check_same_thread": False,  # Allow multi-threaded access
+            "factory": TimedConnection,  # Times commits (src.locks)
+        },
+        pool_pre_ping=True,  # Verify connections before using
+        pool_recycle=3600,  # Recycle connections after 1 hour
+    )
+    event.listen(db_engine, "connect", set_sqlite_pragma)
+    # Before the slow-query log, so a statement's time excludes its wait for the write lock
+    install_lock_timing(db_engine, LOCK_WAIT_LOG_MS)
+    if SLOW_QUERY_MS:
+        install_slow_query_log(db_engine, SLOW_QUERY_MS)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
 
 class EnergyReading(Base):
     __tablename__ = "energy_readings"
+    __table_args__ = (
+        # Covering index: phase series and stats are answered from the index without touching rows
+        Index(
+            "ix_energy_readings_phases",
+            "timestamp",
+            "power_phase_1_watts",
+            "power_phase_2_watts",
+            "power_phase_3_watts",
+        ),
+    )
 
     timestamp = Column(
         DateTime,
@@ -85,6 +128,100 @@ class EnergyReading(Base):
         raw_payload={self.raw_payload})"
 
 
+class ReadingGap(Base):
+    """Interval between two consecutive readings spaced more than GAP_THRESHOLD_SECONDS apart."""
+
+    __tablename__ = "reading_gaps"
+
+    start = Column(DateTime, primary_key=True)  # timestamp of the reading before the gap
+    end = Column(DateTime, nullable=False, index=True)  # timestamp of the reading after the gap
+
+    def __repr__(self):
+        return f"ReadingGap(start={self.start}, end={self.end})"
+
+
+class _RollupColumns:
+    """Per-bucket aggregates that merge incrementally (sums, counts, min/max), shared by the rollup tiers."""
+
+    bucket = Column(Integer, primary_key=True)  # bucket start, seconds since epoch
+    count = Column(Integer, nullable=False)
+    power_watts_sum = Column(Float)
+    power_watts_min = Column(Float)
+    power_watts_max = Column(Float)
+    energy_in_kwh_min = Column(Float)  # ignores non-positive glitch readings
+    energy_in_kwh_max = Column(Float)
+    energy_out_kwh_max = Column(Float)
+    power_phase_1_watts_sum = Column(Float)
+    power_phase_1_watts_min = Column(Float)
+    power_phase_1_watts_max = Column(Float)
+    power_phase_2_watts_sum = Column(Float)
+    power_phase_2_watts_min = Column(Float)
+    power_phase_2_watts_max = Column(Float)
+    power_phase_3_watts_sum = Column(Float)
+    power_phase_3_watts_min = Column(Float)
+    power_phase_3_watts_max = Column(Float)
+
+
+class MinuteRollup(_RollupColumns, Base):
+    """1-minute aggregates of energy_readings, kept for RETENTION_MINUTE_DAYS."""
+
+    __tablename__ = "energy_readings_1m"
+    bucket_seconds = 60
+
+
+class HourlyRollup(_RollupColumns, Base):
+    """Hourly aggregates of energy_readings, kept forever."""
+
+    __tablename__ = "energy_readings_1h"
+    bucket_seconds = 3600
+
+
+ROLLUP_TIERS = (MinuteRollup, HourlyRollup)
+
+
+class ReadingChunk(Base):
+    """
+    A closed local day of raw readings packed into compressed columns (see src.chunks), one blob per column.
+    Packed days keep their full resolution but not their meter ids and raw payloads.
+    """
+
+    __tablename__ = "energy_reading_chunks"
+
+    bucket = Column(Integer, primary_key=True)  # day start, seconds since epoch
+    end = Column(Integer, nullable=False)  # next day's start, seconds since epoch
+    count = Column(Integer, nullable=False)
+    timestamps = Column(LargeBinary, nullable=False)  # ms since epoch
+    power_watts = Column(LargeBinary, nullable=False)
+    energy_in_kwh = Column(LargeBinary, nullable=False)
+    energy_out_kwh = Column(LargeBinary, nullable=False)
+    power_phase_1_watts = Column(LargeBinary, nullable=False)
+    power_phase_2_watts = Column(LargeBinary, nullable=False)
+    power_phase_3_watts = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"ReadingChunk(bucket={self.bucket}, end={self.end}, count={self.count})"
+
+
+class LoadProfile(Base):
+    """Typical load per season, weekday and 15-minute slot of the local day (see src.profile)."""
+
+    __tablename__ = "load_profile"
+
+    season = Column(Integer, primary_key=True)  # 0 winter (Dec-Feb), 1 spring, 2 summer, 3 autumn
+    weekday = Column(Integer, primary_key=True)  # 0 Monday ... 6 Sunday
+    slot = Column(Integer, primary_key=True)  # 0 ... 95
+    days = Column(Integer, nullable=False)  # days folded into this slot
+    power_watts_sum = Column(Float, nullable=False)  # sum over those days of the slot's average power
+
+
+class LoadProfileDay(Base):
+    """A local day already folded into the load profile."""
+
+    __tablename__ = "load_profile_days"
+
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD
+
+
 def init_db():
     """Create all tables if they do not exist and enable WAL mode."""
     # Ensure WAL mode is enabled (the event listener handles this for new connections,
@@ -93,31 +230,257 @@ def init_db():
         conn.execute(text("PRAGMA journal_mode=WAL"))
         conn.execute(text("PRAGMA synchronous=NORMAL"))
         conn.execute(text("PRAGMA busy_timeout=20000"))
+        # Only takes effect for new databases; existing ones switch on the next full VACUUM
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
         conn.commit()
 
+    existing_tables = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes added to tables that already exist
+    for index in EnergyReading.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
     logger.info("Created all tables")
+    if ReadingGap.__tablename__ not in existing_tables:
+        rebuild_gap_index()
+    if not {model.__tablename__ for model in ROLLUP_TIERS} <= existing_tables:
+        rebuild_rollups()
+
+
+# Short response keys for reading columns, as used by /api/readings
+READING_FIELDS = {
+    "p": EnergyReading.power_watts,
+    "e": EnergyReading.energy_in_kwh,
+    "o": EnergyReading.energy_out_kwh,
+    "p1": EnergyReading.power_phase_1_watts,
+    "p2": EnergyReading.power_phase_2_watts,
+    "p3": EnergyReading.power_phase_3_watts,
+}
+DEFAULT_READING_FIELDS = ("p", "e")
+PHASE_FIELDS = ("p1", "p2", "p3")
+# Cumulative meter values are monotonic, so the last value in a bucket is its max; everything else is averaged
+BUCKET_AGGREGATES = {"e": func.max, "o": func.max}
+# Rows converted to column arrays per fetch, so only one batch of row tuples is alive at a time
+ARRAY_FETCH_ROWS = 65_536
+
+
+def _epoch_ms(column):
+    """SQL expression converting a naive local timestamp column to integer ms since epoch.
+
+    Timestamps are stored as "YYYY-MM-DD HH:MM:SS.ffffff" local time: whole seconds come from
+    strftime('%s', ..., 'utc') and the millisecond digits are read straight from the text.
+    """
+    seconds = cast(func.strftime("%s", column, "utc"), Integer)
+    millis = cast(func.substr(column, 21, 3), Integer)
+    return seconds * 1000 + millis
+
+
+def _to_db_time(value: datetime) -> datetime:
+    """Convert a datetime to the naive local time the readings table is stored in."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(local_timezone()).replace(tzinfo=None)
+
+
+def to_db_text(value: datetime) -> str:
+    """Format a datetime exactly as SQLAlchemy stores it in SQLite, for raw SQL and bulk writes."""
+    return _to_db_time(value).isoformat(sep=" ", timespec="microseconds")
+
+
+def _epoch_us(value: datetime) -> int:
+    """Whole microseconds since epoch, exact where timestamp() * 1000 can land just below a whole ms."""
+    return round(value.timestamp() * 1_000_000)
+
+
+def _from_epoch_ms(ms: int) -> datetime:
+    """Convert ms since epoch to the naive local time the readings table is stored in."""
+    return datetime.fromtimestamp(ms / 1000)
+
+
+def _update_gap_index(session, timestamp: datetime):
+    """Keep the gap index consistent after inserting a reading at `timestamp`.
+
+    Looks up the neighbouring readings (two index seeks), drops the gap the new reading
+    falls into, and records the gaps on either side that exceed GAP_THRESHOLD_SECONDS.
+    """
+    timestamp = _to_db_time(timestamp)
+    prev_ts = session.scalar(
+        select(EnergyReading.timestamp)
+        .where(EnergyReading.timestamp < timestamp)
+        .order_by(EnergyReading.timestamp.desc())
+        .limit(1)
+    )
+    next_ts = session.scalar(
+        select(EnergyReading.timestamp)
+        .where(EnergyReading.timestamp > timestamp)
+        .order_by(EnergyReading.timestamp.asc())
+        .limit(1)
+    )
+    if prev_ts is not None and next_ts is not None:
+        session.execute(delete(ReadingGap).where(ReadingGap.start == prev_ts))
+
+    for gap_start, gap_end in ((prev_ts, timestamp), (timestamp, next_ts)):
+        if gap_start is None or gap_end is None:
+            continue
+        if (gap_end - gap_start).total_seconds() > GAP_THRESHOLD_SECONDS:
+            session.add(ReadingGap(start=gap_start, end=gap_end))
+
+
+def rebuild_gap_index(start: datetime | None = None, end: datetime | None = None):
+    """Recompute the gap index for readings in [start, end] (the full table by default).
+
+    The range is widened to the neighbouring readings so gaps crossing its edges are rebuilt too.
+    """
+    with SessionLocal() as session:
+        lo = hi = None
+        if start is not None:
+            start = _to_db_time(start)
+            lo = session.scalar(
+                select(func.max(EnergyReading.timestamp)).where(EnergyReading.timestamp < start)
+            )
+            lo = lo or start
+        if end is not None:
+            end = _to_db_time(end)
+            hi = session.scalar(
+                select(func.min(EnergyReading.timestamp)).where(EnergyReading.timestamp > end)
+            )
+            hi = hi or end
+
+        stale_gaps = delete(ReadingGap)
+        if lo is not None:
+            stale_gaps = stale_gaps.where(ReadingGap.start >= lo)
+        if hi is not None:
+            stale_gaps = stale_gaps.where(ReadingGap.start < hi)
+        session.execute(stale_gaps)
+        session.execute(
+            text("""
+                INSERT INTO reading_gaps (start, "end")
+                SELECT prev_ts, timestamp FROM (
+                    SELECT timestamp, LAG(timestamp) OVER (ORDER BY timestamp) AS prev_ts
+                    FROM energy_readings
+                    WHERE (:lo IS NULL OR timestamp >= :lo) AND (:hi IS NULL OR timestamp <= :hi)
+                )
+                WHERE prev_ts IS NOT NULL
+                  AND (julianday(timestamp) - julianday(prev_ts)) * 86400 > :threshold
+                """),
+            {
+                "threshold": GAP_THRESHOLD_SECONDS,
+                "lo": to_db_text(lo) if lo is not None else None,
+                "hi": to_db_text(hi) if hi is not None else None,
+            },
+        )
+        session.commit()
+        num_gaps = session.scalar(select(func.count()).select_from(ReadingGap))
+    logger.info(f"Rebuilt gap index for {start=} {end=}: {num_gaps} gaps > {GAP_THRESHOLD_SECONDS}s in total")
+
+
+# Reading columns aggregated into rollups as sum/min/max (averages are sum / count)
+ROLLUP_POWER_COLUMNS = ("power_watts", "power_phase_1_watts", "power_phase_2_watts", "power_phase_3_watts")
+# (rollup column, aggregate over readings, merge expression into an existing bucket)
+_ROLLUP_AGGREGATES = [
+    ("count", "count(*)", "count + excluded.count"),
+    *(
+        (f"{column}_{agg}", f"{agg}({column})", merge)
+        for column in ROLLUP_POWER_COLUMNS
+        for agg, merge in (
+            ("sum", "coalesce({c} + excluded.{c}, {c}, excluded.{c})"),
+            ("min", "min(coalesce({c}, excluded.{c}), coalesce(excluded.{c}, {c}))"),
+            ("max", "max(coalesce({c}, excluded.{c}), coalesce(excluded.{c}, {c}))"),
+        )
+    ),
+    (
+        "energy_in_kwh_min",
+        "min(CASE WHEN energy_in_kwh > 0 THEN energy_in_kwh END)",
+        "min(coalesce({c}, excluded.{c}), coalesce(excluded.{c}, {c}))",
+    ),
+    (
+        "energy_in_kwh_max",
+        "max(energy_in_kwh)",
+        "max(coalesce({c}, excluded.{c}), coalesce(excluded.{c}, {c}))",
+    ),
+    (
+        "energy_out_kwh_max",
+        "max(energy_out_kwh)",
+        "max(coalesce({c}, excluded.{c}), coalesce(excluded.{c}, {c}))",
+    ),
+]
+
+
+def rollup_merge_sql(model, source: str) -> str:
+    """
+    SQL aggregating the readings in `source` (a table name or parenthesised subquery) into `model`'s buckets.
+    Buckets that already exist are merged rather than replaced, so the same statement serves live ingest,
+    bulk imports and rebuilds, in any order.
+    """
+    columns = ", ".join(column for column, _, _ in _ROLLUP_AGGREGATES)
+    aggregates = ", ".join(agg for _, agg, _ in _ROLLUP_AGGREGATES)
+    merges = ", ".join(f"{column} = {merge.format(c=column)}" for column, _, merge in _ROLLUP_AGGREGATES)
+    bucket = (
+        f"CAST(strftime('%s', timestamp, 'utc') AS INTEGER) / {model.bucket_seconds} * {model.bucket_seconds}"
+    )
+    # "WHERE true" keeps SQLite from parsing ON CONFLICT as a join constraint
+    return (
+        f"INSERT INTO {model.__tablename__} (bucket, {columns}) "
+        f"SELECT {bucket} AS b, {aggregates} FROM {source} WHERE true GROUP BY b "
+        f"ON CONFLICT(bucket) DO UPDATE SET {merges}"
+    )
+
+
+_INGEST_SOURCE = (
+    "(SELECT :timestamp AS timestamp, "
+    + ", ".join(
+        f":{column} AS {column}" for column in (*ROLLUP_POWER_COLUMNS, "energy_in_kwh", "energy_out_kwh")
+    )
+    + ")"
+)
+_INGEST_ROLLUP_SQL = [text(rollup_merge_sql(model, _INGEST_SOURCE)) for model in ROLLUP_TIERS]
+
+
+def _update_rollups(session, timestamp: datetime, values: dict):
+    """Merge a single new reading into every rollup tier."""
+    params = {"timestamp": to_db_text(timestamp), **values}
+    for statement in _INGEST_ROLLUP_SQL:
+        session.execute(statement, params)
+
+
+def rebuild_rollups():
+    """Recompute all rollup tiers from the raw readings. Only lossless before raw rows are compacted or packed."""
+    with SessionLocal() as session:
+        for model in ROLLUP_TIERS:
+            session.execute(delete(model))
+            session.execute(text(rollup_merge_sql(model, EnergyReading.__tablename__)))
+        session.commit()
+        num_buckets = {
+            model.__tablename__: session.scalar(select(func.count()).select_from(model))
+            for model in ROLLUP_TIERS
+        }
+    logger.info(f"Rebuilt rollups: {num_buckets}")
+
+
+def reading_values(mt_payload: dict) -> dict:
+    """Map an MT681 payload to EnergyReading column values (without the timestamp)."""
+    return {
+        "meter_id": str(mt_payload.get("Meter_id")),
+        "power_watts": float(mt_payload.get("Power")),
+        "energy_in_kwh": float(mt_payload.get("E_in")),
+        "energy_out_kwh": float(mt_payload.get("E_out")),
+        "power_phase_1_watts": float(mt_payload.get("Power_p1")),
+        "power_phase_2_watts": float(mt_payload.get("Power_p2")),
+        "power_phase_3_watts": float(mt_payload.get("Power_p3")),
+        "raw_payload": json.dumps(mt_payload),
+    }
 
 
 def save_energy_reading(tasmota_payload: str):
     """Persist a single MT681 energy reading payload."""
-    mt_payload = tasmota_payload["MT681"]
     timestamp = datetime.now(local_timezone())
-    reading = EnergyReading(
-        meter_id=str(mt_payload.get("Meter_id")),
-        power_watts=float(mt_payload.get("Power")),
-        energy_in_kwh=float(mt_payload.get("E_in")),
-        energy_out_kwh=float(mt_payload.get("E_out")),
-        power_phase_1_watts=float(mt_payload.get("Power_p1")),
-        power_phase_2_watts=float(mt_payload.get("Power_p2")),
-        power_phase_3_watts=float(mt_payload.get("Power_p3")),
-        timestamp=timestamp,
-        raw_payload=json.dumps(mt_payload),
-    )
+    values = reading_values(tasmota_payload["MT681"])
+    reading = EnergyReading(timestamp=timestamp, **values)
 
     try:
         with SessionLocal() as session:
             session.add(reading)
+            _update_gap_index(session, timestamp)
+            _update_rollups(session, timestamp, values)
             session.commit()
             session.refresh(reading)
         logger.debug(f"🟢 Saved {reading=}")
@@ -127,14 +490,17 @@ def save_energy_reading(tasmota_payload: str):
         return
 
 
-def latest_energy_reading() -> EnergyReading | None:
-    """Get the latest energy reading."""
+def latest_energy_reading() -> dict | None:
+    """Get the latest energy reading (without its raw payload)."""
+    columns = [c for c in EnergyReading.__table__.columns if c.name != "raw_payload"]
+    query = select(*columns).order_by(EnergyReading.timestamp.desc()).limit(1)
     with SessionLocal() as session:
-        last_reading = session.query(EnergyReading).order_by(EnergyReading.timestamp.desc()).first()
-        last_reading = last_reading.__dict__
-        last_reading.pop("_sa_instance_state")
-        last_reading["timestamp"] = last_reading["timestamp"].isoformat()
-        return last_reading
+        row = session.execute(query).first()
+    if row is None:
+        return None
+    last_reading = row._asdict()
+    last_reading["timestamp"] = last_reading["timestamp"].isoformat()
+    return last_reading
 
 
 def num_energy_readings_last_hour() -> int:
@@ -148,211 +514,920 @@ def num_energy_readings_last_hour() -> int:
 
 
 def num_total_energy_readings() -> int:
-    """Get the total number of energy readings."""
+    """Get the total number of energy readings, packed ones included."""
+    with SessionLocal() as session:
+        packed = session.scalar(select(func.sum(ReadingChunk.count))) or 0
+        return session.query(EnergyReading).count() + packed
+
+
+def get_gaps(start: datetime | None = None, end: datetime | None = None) -> list[dict]:
+    """
+    Return indexed gaps overlapping [start, end] in ascending order.
+    Each gap is a dict with start/end (ms since epoch) and its length in seconds.
+    """
+    query = select(ReadingGap.start, ReadingGap.end).order_by(ReadingGap.start.asc())
+    if start is not None:
+        query = query.where(ReadingGap.end >= _to_db_time(start))
+    if end is not None:
+        query = query.where(ReadingGap.start <= _to_db_time(end))
     with SessionLocal() as session:
-        return session.query(EnergyReading).count()
+        rows = session.execute(query).all()
+
+    return [
+        {
+            "start": int(gap_start.timestamp() * 1000),
+            "end": int(gap_end.timestamp() * 1000),
+            "seconds": (gap_end - gap_start).total_seconds(),
+        }
+        for gap_start, gap_end in rows
+    ]
+
+
+def missing_seconds(start: datetime, end: datetime) -> float:
+    """
+    Return how many seconds of [start, end] are not covered by readings.
+    Sums the indexed gaps clipped to the window plus the open gap since the latest reading.
+    """
+    start_ms = start.timestamp() * 1000
+    end_ms = end.timestamp() * 1000
+    missing_ms = sum(max(0, min(g["end"], end_ms) - max(g["start"], start_ms)) for g in get_gaps(start, end))
+
+    with SessionLocal() as session:
+        latest = session.scalar(select(func.max(EnergyReading.timestamp)))
+    latest_ms = latest.timestamp() * 1000 if latest is not None else start_ms
+    if end_ms - latest_ms > GAP_THRESHOLD_SECONDS * 1000:
+        missing_ms += end_ms - max(latest_ms, start_ms)
+
+    return missing_ms / 1000
 
 
 def log_db_health_check():
-    """Log the number of records in the DB as a health check."""
-    num_readings_last_hour = num_energy_readings_last_hour()
-    if num_readings_last_hour < 300:
-        report_missing_data_to_telegram(f"Only {num_readings_last_hour} readings in the last hour")
-    num_total_readings = num_total_energy_readings()
-    logger.info(f"[log_db_health_check] {num_readings_last_hour=} {num_total_readings=}")
+    """Log missing data in the last hour from the gap index as a health check."""
+    now = datetime.now(local_timezone())
+    missing = missing_seconds(now - timedelta(hours=1), now)
+    if missing > HEALTH_CHECK_MAX_MISSING_SECONDS:
+        report_missing_data_to_telegram(f"{missing / 60:.0f} min of readings missing in the last hour")
+    logger.info(f"[log_db_health_check] {missing=:.0f}s")
+
+
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+
+def tier_cutoffs(align_ms: int = HOUR_MS) -> tuple[datetime | None, datetime | None]:
+    """
+    Return the (minute, raw) retention cutoffs as naive local times, floored to align_ms.
+    Data older than the raw cutoff is read from minute rollups and data older than the minute cutoff from
+    hourly rollups; a cutoff is None when its tier is kept forever.
+    """
+    now_ms = int(datetime.now().timestamp() * 1000)
+
+    def cutoff(days: int) -> datetime | None:
+        if not days:
+            return None
+        return _from_epoch_ms((now_ms - days * DAY_MS) // align_ms * align_ms)
+
+    return cutoff(RETENTION_MINUTE_DAYS), cutoff(RETENTION_RAW_DAYS)
+
+
+def packed_until() -> datetime | None:
+    """Return the end of the newest packed day as naive local time, or None if nothing has been packed."""
+    with SessionLocal() as session:
+        end = session.scalar(select(ReadingChunk.end).order_by(ReadingChunk.bucket.desc()).limit(1))
+    return _from_epoch_ms(end * 1000) if end is not None else None
+
+
+def _tier_windows(start: datetime | None, end: datetime | None, align_ms: int = HOUR_MS) -> list[tuple]:
+    """
+    Split [start, end] at the retention cutoffs into (source, lo, hi, end) windows, oldest first.
+    source is a rollup model, ReadingChunk for packed raw readings or None for raw rows; lo is inclusive,
+    hi exclusive and None is unbounded.
+    """
+    minute_cutoff, raw_cutoff = tier_cutoffs(align_ms)
+    if raw_cutoff is None:
+        tiers = [(None, None, None)]
+    elif minute_cutoff is None:
+        tiers = [(MinuteRollup, None, raw_cutoff), (None, raw_cutoff, None)]
+    else:
+        tiers = [
+            (HourlyRollup, None, minute_cutoff),
+            (MinuteRollup, minute_cutoff, raw_cutoff),
+            (None, raw_cutoff, None),
+        ]
+    packed_end = packed_until()
+    if packed_end is not None and (raw_cutoff is None or packed_end > raw_cutoff):
+        tiers[-1:] = [(ReadingChunk, raw_cutoff, packed_end), (None, packed_end, None)]
+
+    start = _to_db_time(start) if start is not None else None
+    end = _to_db_time(end) if end is not None else None
+    windows = []
+    for source, lo, hi in tiers:
+        if start is not None and (lo is None or start > lo):
+            lo = start
+        if lo is not None and ((hi is not None and lo >= hi) or (end is not None and lo > end)):
+            continue
+        windows.append((source, lo, hi, end))
+    return windows
 
 
-@lru_cache(maxsize=1000)
+def _window_filters(source, lo: datetime | None, hi: datetime | None, end: datetime | None) -> list:
+    """WHERE clauses restricting a tier (None for raw readings) to lo <= t < hi and t <= end."""
+    if source is None:
+        column, bound = EnergyReading.timestamp, _to_db_time
+    else:
+        column, bound = source.bucket, datetime.timestamp
+    filters = []
+    if lo is not None:
+        filters.append(column >= bound(lo))
+    if hi is not None:
+        filters.append(column < bound(hi))
+    if end is not None:
+        filters.append(column <= bound(end))
+    return filters
+
+
+def _rollup_value(model, field: str):
+    """Rollup expression for a reading field: the bucket's average power or its last cumulative energy."""
+    column = READING_FIELDS[field].key
+    if field in BUCKET_AGGREGATES:
+        return getattr(model, f"{column}_max")
+    return getattr(model, f"{column}_sum") / model.count
+
+
+def _rollup_aggregate(model, field: str):
+    """Like _rollup_value, aggregated over several rollup buckets."""
+    column = READING_FIELDS[field].key
+    if field in BUCKET_AGGREGATES:
+        return func.max(getattr(model, f"{column}_max"))
+    return func.sum(getattr(model, f"{column}_sum")) / func.sum(model.count)
+
+
+def _readings_query(
+    start: datetime | None,
+    end: datetime | None,
+    fields: tuple[str, ...],
+    before: datetime | None = None,
+):
+    """Build a Core select of raw (t, *fields) in time order within [start, end] and before `before`."""
+    columns = [READING_FIELDS[field] for field in fields]
+    query = select(_epoch_ms(EnergyReading.timestamp), *columns).order_by(EnergyReading.timestamp.asc())
+    return query.where(*_window_filters(None, start, before, end))
+
+
+def _query_arrays(session, query, fields: tuple[str, ...]) -> dict:
+    """
+    Run a (t, *fields) select into NumPy column arrays: "t" as int64 ms and float64 fields with NaN for NULL.
+    Rows are fetched ARRAY_FETCH_ROWS at a time and each batch converted in one step, without collecting
+    row objects for the whole result. Millisecond timestamps are exact in float64.
+    """
+    import numpy as np
+
+    batches = [
+        np.array(rows, dtype=np.float64)  # None becomes NaN
+        for rows in session.execute(query).partitions(ARRAY_FETCH_ROWS)
+    ]
+    block = np.concatenate(batches) if batches else np.empty((0, len(fields) + 1))
+    del batches
+    arrays = {"t": block[:, 0].astype(np.int64)}
+    for i, field in enumerate(fields, start=1):
+        arrays[field] = np.ascontiguousarray(block[:, i])
+    return arrays
+
+
+def _arrays_to_rows(arrays: dict, fields: tuple[str, ...]) -> list[tuple]:
+    """Convert column arrays back to (t, *fields) rows with None for NaN, like rows read from SQL."""
+    import numpy as np
+
+    columns = [arrays["t"].tolist()]
+    for field in fields:
+        values = arrays[field].astype(object)
+        values[np.isnan(arrays[field])] = None
+        columns.append(values.tolist())
+    return list(zip(*columns, strict=True))
+
+
+def _chunk_arrays(
+    session, lo: datetime | None, hi: datetime | None, end: datetime | None, fields: tuple
+) -> dict:
+    """
+    Decode the packed readings with lo <= t < hi and t <= end into column arrays (see _query_arrays).
+    Raw rows imported into packed days since they were packed are merged in.
+    """
+    import numpy as np
+
+    from src.chunks import decode_timestamps  # lazy: pulls in numpy
+    from src.chunks import decode_values
+
+    blobs = [getattr(ReadingChunk, READING_FIELDS[field].key) for field in fields]
+    query = select(ReadingChunk.count, ReadingChunk.timestamps, *blobs).order_by(ReadingChunk.bucket.asc())
+    if lo is not None:
+        query = query.where(ReadingChunk.end > lo.timestamp())
+    if hi is not None:
+        query = query.where(ReadingChunk.bucket < hi.timestamp())
+    if end is not None:
+        query = query.where(ReadingChunk.bucket <= end.timestamp())
+    parts = [
+        {
+            "t": decode_timestamps(timestamps, count),
+            **{field: decode_values(blob, count) for field, blob in zip(fields, values, strict=True)},
+        }
+        for count, timestamps, *values in session.execute(query)
+    ]
+    late = _query_arrays(session, _readings_query(lo, end, fields, before=hi), fields)
+    if len(late["t"]) or not parts:
+        parts.append(late)
+
+    arrays = {key: np.concatenate([part[key] for part in parts]) for key in ("t", *fields)}
+    t = arrays["t"]
+    keep = np.ones(len(t), dtype=bool)
+    # t is truncated to whole ms like _epoch_ms, so a reading at t was stored at t up to t + 1 ms: compare
+    # with the bounds truncated the same way, and round an exclusive upper bound up
+    if lo is not None:
+        keep &= t >= _epoch_us(lo) // 1000
+    if hi is not None:
+        keep &= t < -(-_epoch_us(hi) // 1000)
+    if end is not None:
+        keep &= t <= _epoch_us(end) // 1000
+    # Chunks are read in day order; only late raw rows need sorting into place
+    order = np.argsort(t, kind="stable") if len(late["t"]) else np.arange(len(t))
+    order = order[keep[order]]
+    return {key: values[order] for key, values in arrays.items()}
+
+
+def _window_query(source, lo: datetime | None, hi: datetime | None, end: datetime | None, fields: tuple):
+    """Select (t, *fields) in time order from a raw or rollup tier window (see _tier_windows)."""
+    if source is None:
+        return _readings_query(lo, end, fields, before=hi)
+    columns = [_rollup_value(source, field) for field in fields]
+    query = select(source.bucket * 1000, *columns).order_by(source.bucket.asc())
+    return query.where(*_window_filters(source, lo, hi, end))
+
+
+def _tiered_rows(start: datetime | None, end: datetime | None, fields: tuple[str, ...]) -> list:
+    """Fetch (t, *fields) rows for [start, end], reading each part of the range from the tier holding it."""
+    rows = []
+    with SessionLocal() as session:
+        for source, lo, hi, window_end in _tier_windows(start, end):
+            if source is ReadingChunk:
+                rows.extend(_arrays_to_rows(_chunk_arrays(session, lo, hi, window_end, fields), fields))
+            else:
+                rows.extend(session.execute(_window_query(source, lo, hi, window_end, fields)).all())
+    return rows
+
+
+# Connection that only watches PRAGMA data_version: it changes whenever another connection commits
+_data_watch = {
+    "database": None,
+    "conn": None,
+    "version": None,
+    "state": DataState(None, None, 0, 0),
+    "rows_before_boundary": 0,
+}
+_data_watch_lock = threading.Lock()
+
+
+def _rollup_rows(session, before_ms: int | None = None) -> int:
+    query = select(func.coalesce(func.sum(HourlyRollup.count), 0))
+    if before_ms is not None:
+        query = query.where(HourlyRollup.bucket < before_ms // 1000)
+    return session.scalar(query)
+
+
+def data_state() -> DataState:
+    """
+    The readings' high-water mark and row count for cache invalidation (see src.querycache). They are
+    re-read only when data_version changed, so checking costs one PRAGMA on an idle database.
+    """
+    database = SessionLocal.kw["bind"].url.database
+    with _data_watch_lock:
+        if _data_watch["database"] != database:
+            if _data_watch["conn"] is not None:
+                _data_watch["conn"].close()
+            _data_watch.update(database=database, version=None)
+            _data_watch["conn"] = sqlite3.connect(database, check_same_thread=False)
+        version = _data_watch["conn"].execute("PRAGMA data_version").fetchone()[0]
+        if version == _data_watch["version"]:
+            return _data_watch["state"]
+
+        old = _data_watch["state"]
+        with SessionLocal() as session:
+            high_water = session.scalar(select(func.max(EnergyReading.timestamp)))
+            high_water_ms = int(high_water.timestamp() * 1000) if high_water is not None else None
+            boundary_ms = high_water_ms // HOUR_MS * HOUR_MS if high_water_ms is not None else None
+            # Readings before the previous boundary only change by backfills, which invalidate everything
+            backfilled = old.boundary_ms is not None and (
+                _rollup_rows(session, old.boundary_ms) != _data_watch["rows_before_boundary"]
+            )
+            rows = _rollup_rows(session)
+            _data_watch["rows_before_boundary"] = _rollup_rows(session, boundary_ms) if boundary_ms else 0
+        state = DataState(high_water_ms, boundary_ms, rows, old.generation + backfilled)
+        _data_watch.update(version=version, state=state)
+        return state
+
+
+@range_cache(data_state, maxsize=1000)
+@single_flight  # the cache only answers once the first call has finished
 @timed
 def get_readings(
-    start: datetime | None = datetime.now(local_timezone()) - timedelta(weeks=52),
-    end: datetime | None = datetime.now(local_timezone()),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    fields: tuple[str, ...] = DEFAULT_READING_FIELDS,
+) -> list[dict]:
+    """
+    Fetch readings in ascending order. Optionally filter by time range (None leaves that side open).
+    Returns a list of dicts with timestamp "t" (ms since epoch) plus one key per requested field
+    (see READING_FIELDS), selecting only those columns. Ranges past the raw retention window come from
+    the rollup tiers at 1-minute or hourly resolution.
+    """
+    rows = _tiered_rows(start, end, fields)
+    logger.debug(f"⚠️ [get_readings] Found {len(rows)} readings for {start=} {end=} {fields=}")
+    keys = ("t", *fields)
+    return [dict(zip(keys, row, strict=True)) for row in rows]
+
+
+def count_readings(start: datetime | None = None, end: datetime | None = None) -> int:
+    """
+    Count the rows get_readings would return for [start, end] without fetching them: rollup buckets where
+    the range is compacted, and whole packed days, so it is an upper bound at the ends of packed days.
+    """
+    total = 0
+    with SessionLocal() as session:
+        for source, lo, hi, window_end in _tier_windows(start, end):
+            if source is ReadingChunk:
+                query = select(func.sum(ReadingChunk.count))
+                if lo is not None:
+                    query = query.where(ReadingChunk.end > lo.timestamp())
+                if hi is not None:
+                    query = query.where(ReadingChunk.bucket < hi.timestamp())
+                if window_end is not None:
+                    query = query.where(ReadingChunk.bucket <= window_end.timestamp())
+            else:
+                model = EnergyReading if source is None else source
+                query = (
+                    select(func.count())
+                    .select_from(model)
+                    .where(*_window_filters(source, lo, hi, window_end))
+                )
+            total += session.scalar(query) or 0
+    return total
+
+
+def _bucket_arrays(arrays: dict, fields: tuple[str, ...], bucket_ms: int) -> dict:
+    """Downsample column arrays like the raw GROUP BY in get_bucketed_readings (NULL-ignoring avg or max)."""
+    import numpy as np
+
+    buckets = arrays["t"] // bucket_ms
+    if not len(buckets):
+        return arrays
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    bucketed = {"t": buckets[starts] * bucket_ms}
+    for field in fields:
+        values = arrays[field]
+        present = ~np.isnan(values)
+        if field in BUCKET_AGGREGATES:
+            bucketed[field] = np.fmax.reduceat(values, starts)
+            continue
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = np.add.reduceat(np.where(present, values, 0.0), starts)
+            bucketed[field] = sums / np.add.reduceat(present, starts)
+    return bucketed
+
+
+@single_flight
+@timed
+def get_bucketed_readings(
+    start: datetime | None,
+    end: datetime | None,
+    fields: tuple[str, ...],
+    bucket_ms: int,
 ) -> list[dict]:
     """
-    Fetch readings in ascending order. Optionally filter by time range.
-    Returns a list of dicts with timestamp (ms since epoch), power_watts, and energy_in_kwh.
+    Downsample readings into fixed buckets of bucket_ms with one GROUP BY query per retention tier.
+    Returns dicts shaped like get_readings: "t" is the bucket start (ms since epoch), power fields are
+    bucket averages and cumulative energy fields the bucket's last value.
     """
-    # Convert to local timezone
+    # Split tiers on bucket boundaries where practical so no bucket is read from two tiers
+    align_ms = math.lcm(bucket_ms, HOUR_MS)
+    rows = []
     with SessionLocal() as session:
-        query = session.query(EnergyReading).order_by(EnergyReading.timestamp.asc())
+        for source, lo, hi, window_end in _tier_windows(
+            start, end, align_ms if align_ms <= DAY_MS else HOUR_MS
+        ):
+            if source is ReadingChunk:
+                arrays = _chunk_arrays(session, lo, hi, window_end, fields)
+                rows.extend(_arrays_to_rows(_bucket_arrays(arrays, fields, bucket_ms), fields))
+                continue
+            if source is None:
+                bucket = _epoch_ms(EnergyReading.timestamp) // bucket_ms
+                columns = [BUCKET_AGGREGATES.get(field, func.avg)(READING_FIELDS[field]) for field in fields]
+            else:
+                bucket = source.bucket * 1000 // bucket_ms
+                columns = [_rollup_aggregate(source, field) for field in fields]
+            query = select(bucket * bucket_ms, *columns).group_by(bucket).order_by(bucket)
+            rows.extend(session.execute(query.where(*_window_filters(source, lo, hi, window_end))).all())
+
+    keys = ("t", *fields)
+    return [dict(zip(keys, row, strict=True)) for row in rows]
+
+
+def iter_readings(
+    start: datetime | None,
+    end: datetime | None,
+    fields: tuple[str, ...],
+    chunk_size: int = 10_000,
+) -> Iterator[list[tuple]]:
+    """
+    Yield (t, *fields) rows in chunks of at most chunk_size using keyset pagination on the timestamp.
+    Each chunk is read in its own short transaction, so long exports never hold a read snapshot
+    that would block WAL checkpoints. Packed days are yielded a day at a time.
+    """
+    after = start
+    packed_end = packed_until()
+    if packed_end is not None and (start is None or _to_db_time(start) < packed_end):
+        query = select(ReadingChunk.end).order_by(ReadingChunk.bucket.asc())
+        if start is not None:
+            query = query.where(ReadingChunk.end > _to_db_time(start).timestamp())
+        if end is not None:
+            query = query.where(ReadingChunk.bucket <= _to_db_time(end).timestamp())
+        with SessionLocal() as session:
+            day_ends = session.scalars(query).all()
+        for day_end in day_ends:
+            day_end = _from_epoch_ms(day_end * 1000)
+            with SessionLocal() as session:
+                rows = _arrays_to_rows(_chunk_arrays(session, after, day_end, end, fields), fields)
+            if rows:
+                yield rows
+            after = day_end
+    while True:
+        with SessionLocal() as session:
+            rows = session.execute(_readings_query(after, end, fields).limit(chunk_size)).all()
+        if rows:
+            yield [tuple(row) for row in rows]
+        if len(rows) < chunk_size:
+            return
+        after = _from_epoch_ms(rows[-1][0] + 1)
+
+
+def get_readings_page(
+    start: datetime | None, end: datetime | None, fields: tuple[str, ...], limit: int
+) -> tuple[list[dict], int | None]:
+    """
+    Return up to limit full-resolution readings with start <= t <= end, shaped like get_readings, and the
+    cursor to continue after: the last page's "t" if more readings follow, else None. Raw rows are a seek
+    on the timestamp primary key reading limit + 1 rows; packed days are decoded a day at a time.
+    """
+    rows = []
+    lo = start
+    packed_end = packed_until()
+    with SessionLocal() as session:
+        if packed_end is not None and (lo is None or _to_db_time(lo) < packed_end):
+            query = select(ReadingChunk.end).order_by(ReadingChunk.bucket.asc())
+            if lo is not None:
+                query = query.where(ReadingChunk.end > _to_db_time(lo).timestamp())
+            if end is not None:
+                query = query.where(ReadingChunk.bucket <= _to_db_time(end).timestamp())
+            for day_end in session.scalars(query).all():
+                day_end = _from_epoch_ms(day_end * 1000)
+                rows.extend(_arrays_to_rows(_chunk_arrays(session, lo, day_end, end, fields), fields))
+                lo = day_end
+                if len(rows) > limit:
+                    break
+        if len(rows) <= limit:
+            rows.extend(session.execute(_readings_query(lo, end, fields).limit(limit + 1 - len(rows))).all())
+
+    keys = ("t", *fields)
+    page = [dict(zip(keys, row, strict=True)) for row in rows[:limit]]
+    return page, page[-1]["t"] if len(rows) > limit else None
+
+
+def iter_bucketed_readings(
+    start: datetime | None,
+    end: datetime | None,
+    fields: tuple[str, ...],
+    bucket_ms: int,
+    buckets_per_chunk: int = 1_000,
+) -> Iterator[list[tuple]]:
+    """Yield get_bucketed_readings rows as (t, *fields) tuples, one time window of buckets at a time."""
+    extent = get_time_extent(start, end)
+    if extent is None:
+        return
+    first_ms, last_ms = extent
+    window_ms = bucket_ms * buckets_per_chunk
+    assert window_ms > 0, "bucket_ms and buckets_per_chunk must be positive"
+    window_start = first_ms // bucket_ms * bucket_ms
+    while window_start <= last_ms:
+        window_end = _from_epoch_ms(window_start + window_ms) - timedelta(microseconds=1)
+        window_from = _from_epoch_ms(window_start)
         if start is not None:
-            start = start.astimezone(local_timezone())
-            query = query.filter(EnergyReading.timestamp >= start)
+            window_from = max(window_from, _to_db_time(start))
         if end is not None:
-            end = end.astimezone(local_timezone())
-            query = query.filter(EnergyReading.timestamp <= end)
-        rows = query.all()
-
-    logger.debug(
-        f"""⚠️ [get_readings] Found {len(rows)} readings for {start=} {end=}:
-    ⚠️ [get_readings] oldest reading: {rows[0].timestamp.isoformat()}
-    ⚠️ [get_readings] latest reading: {rows[-1].timestamp.isoformat()}"""
+            window_end = min(window_end, _to_db_time(end))
+        rows = get_bucketed_readings(window_from, window_end, fields, bucket_ms)
+        if rows:
+            yield [tuple(row.values()) for row in rows]
+        window_start += window_ms
+
+
+def get_reading_arrays(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    fields: tuple[str, ...] = DEFAULT_READING_FIELDS,
+) -> dict:
+    """
+    Fetch readings as NumPy column arrays: "t" (int64 ms since epoch) plus one float64 array per field.
+    Missing values are NaN.
+    """
+    import numpy as np  # lazy: keeps numpy out of the startup of services that never call this
+
+    parts = []
+    with SessionLocal() as session:
+        for source, lo, hi, window_end in _tier_windows(start, end):
+            if source is ReadingChunk:
+                # Packed days decode straight into arrays, without a detour through row tuples
+                parts.append(_chunk_arrays(session, lo, hi, window_end, fields))
+            else:
+                parts.append(
+                    _query_arrays(session, _window_query(source, lo, hi, window_end, fields), fields)
+                )
+    if not parts:
+        return {"t": np.empty(0, dtype=np.int64), **{field: np.empty(0) for field in fields}}
+    return {key: np.concatenate([part[key] for part in parts]) for key in ("t", *fields)}
+
+
+def get_rollup_arrays(model, start: datetime, end: datetime) -> dict:
+    """
+    Fetch the buckets of a rollup tier with start <= bucket < end as NumPy column arrays: "t" (int64 ms),
+    "count", and the float64 power sum/min/max and energy counter min/max (NaN where missing).
+    """
+    import numpy as np  # lazy: keeps numpy out of the startup of services that never call this
+
+    columns = (
+        "power_watts_sum",
+        "power_watts_min",
+        "power_watts_max",
+        "energy_in_kwh_min",
+        "energy_in_kwh_max",
     )
-    result: list[dict] = []
-    for r in rows:
-        # Convert to ms since epoch for charting
-        ts = int(r.timestamp.timestamp() * 1000)
-        result.append(
-            {
-                "t": ts,
-                "p": r.power_watts,
-                "e": r.energy_in_kwh,
-            }
-        )
-    return result
+    query = (
+        select(model.bucket, model.count, *(getattr(model, column) for column in columns))
+        .where(*_window_filters(model, start, end, None))
+        .order_by(model.bucket.asc())
+    )
+    with SessionLocal() as session:
+        rows = session.execute(query).all()
+    arrays = {
+        "t": np.array([row[0] * 1000 for row in rows], dtype=np.int64),
+        "count": np.array([row[1] for row in rows], dtype=np.int64),
+    }
+    for i, column in enumerate(columns, start=2):
+        arrays[column] = np.array([row[i] for row in rows], dtype=np.float64)  # None becomes NaN
+    return arrays
 
 
-def get_avg_daily_energy_usage(readings_data: list[dict]) -> float:
-    """Return the average daily energy usage over the last year from cumulative readings."""
-    df = pd.DataFrame(readings_data)
-    df["t"] = pd.to_datetime(df["t"], unit="ms")
-    df.columns = ["time", "power", "energy"]
-    df = df.sort_values("time")
+def _sql_aggregates(session, source, lo: datetime | None, hi: datetime | None, end: datetime | None, fields):
+    """(min, max, sum, count) per power field, flattened, over a raw or rollup tier window."""
+    aggregates = []
+    for field in fields:
+        if source is None:
+            column = READING_FIELDS[field]
+            aggregates += [func.min(column), func.max(column), func.sum(column), func.count(column)]
+        else:
+            column = READING_FIELDS[field].key
+            aggregates += [
+                func.min(getattr(source, f"{column}_min")),
+                func.max(getattr(source, f"{column}_max")),
+                func.sum(getattr(source, f"{column}_sum")),
+                func.sum(source.count),
+            ]
+    return session.execute(select(*aggregates).where(*_window_filters(source, lo, hi, end))).one()
 
-    last_timestamp = df["time"].max()
-    one_year_ago = last_timestamp - pd.Timedelta(days=365)
 
-    last_year_data = df[df["time"] >= one_year_ago]
+def _array_aggregates(arrays: dict, fields: tuple[str, ...]) -> list:
+    """Like _sql_aggregates, over column arrays of readings (NaN counts as NULL)."""
+    import numpy as np
 
-    if len(last_year_data) < 2:
-        raise ValueError("Not enough data in the last year")
+    aggregates = []
+    for field in fields:
+        values = arrays[field][~np.isnan(arrays[field])]
+        if not len(values):
+            aggregates += [None, None, None, 0]
+            continue
+        aggregates += [float(values.min()), float(values.max()), float(values.sum()), len(values)]
+    return aggregates
 
-    energy_start = last_year_data["energy"].iloc[0]
-    energy_end = last_year_data["energy"].iloc[-1]
 
-    days_span = (last_year_data["time"].iloc[-1] - last_year_data["time"].iloc[0]).total_seconds() / 86400
-    if days_span <= 0:
-        raise ValueError("Invalid time span")
+def _power_aggregates(
+    start: datetime | None, end: datetime | None, fields: tuple[str, ...]
+) -> dict[str, tuple]:
+    """Return (min, max, sum, count) per power field over [start, end], combined across retention tiers."""
+    totals = {field: (None, None, 0.0, 0) for field in fields}
+    with SessionLocal() as session:
+        for source, lo, hi, window_end in _tier_windows(start, end):
+            if source is ReadingChunk:
+                row = _array_aggregates(_chunk_arrays(session, lo, hi, window_end, fields), fields)
+            else:
+                row = _sql_aggregates(session, source, lo, hi, window_end, fields)
 
-    return (energy_end - energy_start) / days_span
+            for i, field in enumerate(fields):
+                min_value, max_value, sum_value, count = row[i * 4 : i * 4 + 4]
+                if not count or sum_value is None:
+                    continue
+                total_min, total_max, total_sum, total_count = totals[field]
+                totals[field] = (
+                    min_value if total_min is None else min(total_min, min_value),
+                    max_value if total_max is None else max(total_max, max_value),
+                    total_sum + sum_value,
+                    total_count + count,
+                )
+    return totals
 
 
-def get_daily_energy_usage(readings_data: list[dict]) -> list[dict]:
-    """Calculate daily energy consumption from cumulative readings, handling partial days."""
-    if not readings_data:
-        return []
+def _power_stats(aggregates: tuple) -> dict:
+    """Format a (min, max, sum, count) tuple from _power_aggregates as min/max/avg power."""
+    min_power, max_power, power_sum, count = aggregates
+    return {
+        "min_power_watts": float(min_power) if min_power is not None else None,
+        "max_power_watts": float(max_power) if max_power is not None else None,
+        "avg_power_watts": power_sum / count if count else None,
+    }
+
+
+@single_flight
+def get_stats(start: datetime, end: datetime) -> dict:
+    """
+    Compute stats between [start, end], from whichever retention tiers cover the range:
+      - energy_used_kwh: difference in cumulative energy_in_kwh between first>=start and last<=end
+      - min_power_watts, max_power_watts, avg_power_watts
+      - count
+    """
+    first_energy = last_energy = None
+    with SessionLocal() as session:
+        for source, lo, hi, window_end in _tier_windows(start, end):
+            window = _window_filters(source, lo, hi, window_end)
+            if source is ReadingChunk:
+                energy = _chunk_arrays(session, lo, hi, window_end, ("e",))["e"]
+                ends = energy[[0, -1]].tolist() if len(energy) else [math.nan, math.nan]
+                first, last = [None if math.isnan(value) else value for value in ends]
+            elif source is None:
+                # First and last energy reading within window
+                energy_query = select(EnergyReading.energy_in_kwh).where(*window).limit(1)
+                first = session.scalar(energy_query.order_by(EnergyReading.timestamp.asc()))
+                last = session.scalar(energy_query.order_by(EnergyReading.timestamp.desc()))
+            else:
+                energy_query = select(func.min(source.energy_in_kwh_min), func.max(source.energy_in_kwh_max))
+                first, last = session.execute(energy_query.where(*window)).one()
+            if first_energy is None:
+                first_energy = first
+            if last is not None:
+                last_energy = last
 
-    df = pd.DataFrame(readings_data)
-    df["time"] = pd.to_datetime(df["t"], unit="ms")
-    df["energy"] = df["e"]
-    df = df.sort_values("time")
-    df = df[df["energy"].notna() & (df["energy"] > 0)]
+    aggregates = _power_aggregates(start, end, ("p",))["p"]
+    logger.debug(f"⚠️ [get_stats] {aggregates=}")
+    energy_used = None
+    if first_energy is not None and last_energy is not None:
+        energy_used = float(last_energy) - float(first_energy)
 
-    if len(df) < 2:
-        return []
+    return {"energy_used_kwh": energy_used, **_power_stats(aggregates), "count": aggregates[3]}
 
-    df["date"] = df["time"].dt.date
 
-    # Group by date and get first/last energy reading per day
-    daily = df.groupby("date").agg(
-        energy_start=("energy", "first"),
-        energy_end=("energy", "last"),
-        first_time=("time", "first"),
-        last_time=("time", "last"),
-    )
+def get_time_extent(start: datetime | None, end: datetime | None) -> tuple[int, int] | None:
+    """Return the (first, last) reading timestamps in ms within [start, end], or None if empty.
 
-    # Calculate daily consumption as difference between end and start of each day
-    daily["daily_kwh"] = daily["energy_end"] - daily["energy_start"]
+    Hourly rollups cover the whole history, so they bound the extent where raw rows were compacted.
+    """
+    raw_query = select(func.min(EnergyReading.timestamp), func.max(EnergyReading.timestamp))
+    rollup_query = select(func.min(HourlyRollup.bucket), func.max(HourlyRollup.bucket))
+    with SessionLocal() as session:
+        first, last = session.execute(raw_query.where(*_window_filters(None, start, None, end))).one()
+        first_bucket, last_bucket = session.execute(
+            rollup_query.where(*_window_filters(HourlyRollup, start, None, end))
+        ).one()
 
-    # Mark partial days (less than 23 hours of coverage)
-    daily["hours_covered"] = (daily["last_time"] - daily["first_time"]).dt.total_seconds() / 3600
-    daily["is_partial"] = daily["hours_covered"] < 23
+    firsts = [int(first.timestamp() * 1000)] if first is not None else []
+    lasts = [int(last.timestamp() * 1000)] if last is not None else []
+    if first_bucket is not None:
+        firsts.append(first_bucket * 1000)
+        lasts.append(last_bucket * 1000)
+    if not firsts:
+        return None
+    return min(firsts), max(lasts)
 
-    # Build result: use midpoint of each day as timestamp
-    result = []
-    for date, row in daily.iterrows():
-        midpoint = datetime.combine(date, datetime.min.time().replace(hour=12))
-        midpoint = midpoint.replace(tzinfo=local_timezone())
-        result.append(
-            {
-                "t": int(midpoint.timestamp() * 1000),
-                "kwh": float(row["daily_kwh"]),
-                "is_partial": bool(row["is_partial"]),
-            }
+
+@single_flight
+def get_phase_stats(start: datetime | None, end: datetime | None) -> dict:
+    """
+    Compute per-phase min/max/avg power in one pass per retention tier (raw rows use the covering index).
+    imbalance_ratio is (max - min) / mean of the three phase averages.
+    """
+    aggregates = _power_aggregates(start, end, PHASE_FIELDS)
+    stats = {field: _power_stats(aggregates[field]) for field in PHASE_FIELDS}
+
+    averages = [stats[field]["avg_power_watts"] for field in PHASE_FIELDS]
+    imbalance_ratio = None
+    if None not in averages and sum(averages) > 0:
+        imbalance_ratio = (max(averages) - min(averages)) / (sum(averages) / len(averages))
+    stats["imbalance_ratio"] = imbalance_ratio
+    return stats
+
+
+def daily_energy_baseline(day_start: datetime, days: int = 30) -> tuple[float | None, float | None]:
+    """
+    Return (energy_in_kwh at day_start, average daily kWh over the preceding days) from the hourly rollups.
+    Both are short primary key range scans, cheap enough to run once per day at ingest.
+    """
+    day_start_s = day_start.timestamp()
+    history = select(
+        func.min(HourlyRollup.bucket),
+        func.max(HourlyRollup.bucket),
+        func.min(HourlyRollup.energy_in_kwh_min),
+        func.max(HourlyRollup.energy_in_kwh_max),
+    ).where(HourlyRollup.bucket >= day_start_s - days * 86400, HourlyRollup.bucket < day_start_s)
+    with SessionLocal() as session:
+        start_kwh = session.scalar(
+            select(func.min(HourlyRollup.energy_in_kwh_min)).where(HourlyRollup.bucket >= day_start_s)
         )
+        first_bucket, last_bucket, first_kwh, last_kwh = session.execute(history).one()
 
-    return result
+    typical_kwh = None
+    if first_kwh is not None and last_kwh is not None:
+        span_days = (last_bucket + 3600 - first_bucket) / 86400
+        typical_kwh = (last_kwh - first_kwh) / span_days
+    return start_kwh, typical_kwh
 
 
-def get_moving_avg_daily_usage(daily_energy_data: list[dict], window_days: int = 30) -> list[dict]:
+def pack_chunks(before: datetime) -> int:
     """
-    Calculate 30-day moving average of daily energy consumption.
-    For each day, returns the average kWh consumption of the preceding window_days
-    (or fewer days if less history is available).
+    Move the raw readings of every whole local day ending by `before` into a ReadingChunk, one day per
+    transaction. Days packed earlier are merged with readings imported into them since. Returns the rows packed.
     """
-    if not daily_energy_data:
-        return []
+    import numpy as np
 
-    # Sort by timestamp
-    sorted_data = sorted(daily_energy_data, key=lambda x: x["t"])
+    from src.chunks import encode_timestamps  # lazy: pulls in numpy
+    from src.chunks import encode_values
 
-    result = []
-    for i, day in enumerate(sorted_data):
-        # Get up to window_days of history (including current day)
-        start_idx = max(0, i - window_days + 1)
-        window_data = sorted_data[start_idx : i + 1]
+    before = _to_db_time(before)
+    packed = 0
+    while True:
+        with SessionLocal() as session:
+            first = session.scalar(
+                select(func.min(EnergyReading.timestamp)).where(EnergyReading.timestamp < before)
+            )
+            if first is None:
+                return packed
+            day_start = first.replace(hour=0, minute=0, second=0, microsecond=0)
+            day_end = day_start + timedelta(days=1)
+            if day_end > before:
+                return packed
 
-        # Calculate average kWh for this window
-        kwh_values = [d["kwh"] for d in window_data]
-        avg_kwh = sum(kwh_values) / len(kwh_values) if kwh_values else 0.0
+            arrays = _chunk_arrays(session, day_start, day_end, None, tuple(READING_FIELDS))
+            unique = np.concatenate(([True], np.diff(arrays["t"]) != 0))  # keep the packed copy of duplicates
+            session.merge(
+                ReadingChunk(
+                    bucket=int(day_start.timestamp()),
+                    end=int(day_end.timestamp()),
+                    count=int(unique.sum()),
+                    timestamps=encode_timestamps(arrays["t"][unique]),
+                    **{
+                        column.key: encode_values(arrays[field][unique])
+                        for field, column in READING_FIELDS.items()
+                    },
+                )
+            )
+            day = (EnergyReading.timestamp >= day_start, EnergyReading.timestamp < day_end)
+            rows = session.execute(delete(EnergyReading).where(*day)).rowcount
+            session.commit()
+        packed += rows
+        logger.info(f"📦 [chunks] Packed {rows} readings of {day_start:%Y-%m-%d}")
 
-        result.append(
-            {
-                "t": day["t"],
-                "kwh": float(avg_kwh),
-            }
-        )
 
-    return result
+_PROFILE_SLOT = (
+    "CAST(strftime('%H', bucket, 'unixepoch', 'localtime') AS INTEGER) * 4"
+    " + CAST(strftime('%M', bucket, 'unixepoch', 'localtime') AS INTEGER) / 15"
+)
+_FOLD_PROFILE_SQL = text(f"""
+    INSERT INTO {LoadProfile.__tablename__} (season, weekday, slot, days, power_watts_sum)
+    SELECT :season, :weekday, {_PROFILE_SLOT} AS s, 1, sum(power_watts_sum) / sum(count)
+    FROM {MinuteRollup.__tablename__}
+    WHERE bucket >= :lo AND bucket < :hi AND power_watts_sum IS NOT NULL
+    GROUP BY s
+    ON CONFLICT(season, weekday, slot) DO UPDATE SET
+        days = days + 1, power_watts_sum = power_watts_sum + excluded.power_watts_sum
+    """)
 
 
-def get_stats(start: datetime, end: datetime) -> dict:
+def fold_profile_day(day_start: datetime, season: int) -> int:
     """
-    Compute stats between [start, end]:
-      - energy_used_kwh: difference in cumulative energy_in_kwh between first>=start and last<=end
-      - min_power_watts, max_power_watts, avg_power_watts
-      - count
+    Add a closed local day's average power per 15-minute slot, from the 1-minute rollups, to the load profile.
+    Each day is folded once; returns the slots folded (0 for days without data or folded before).
     """
+    day = day_start.date().isoformat()
     with SessionLocal() as session:
-        # First and last within window
-        first_row = (
-            session.query(EnergyReading)
-            .filter(EnergyReading.timestamp >= start, EnergyReading.timestamp <= end)
-            .order_by(EnergyReading.timestamp.asc())
-            .first()
+        if session.get(LoadProfileDay, day) is not None:
+            return 0
+        params = {
+            "season": season,
+            "weekday": day_start.weekday(),
+            "lo": day_start.timestamp(),
+            "hi": (day_start + timedelta(days=1)).timestamp(),
+        }
+        slots = session.execute(_FOLD_PROFILE_SQL, params).rowcount
+        if slots:
+            session.add(LoadProfileDay(day=day))
+        session.commit()
+    return slots
+
+
+def profile_fold_start() -> datetime | None:
+    """Return the first local day to fold: the day after the last folded one, else the first day with data."""
+    with SessionLocal() as session:
+        last_day = session.scalar(select(func.max(LoadProfileDay.day)))
+        if last_day is not None:
+            return datetime.fromisoformat(last_day) + timedelta(days=1)
+        first_bucket = session.scalar(select(func.min(MinuteRollup.bucket)))
+    if first_bucket is None:
+        return None
+    return _from_epoch_ms(first_bucket * 1000).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def profile_rows(seasons: tuple[int, ...]) -> list[tuple]:
+    """Return (weekday, slot, days, power_watts_sum) of the load profile, combined over seasons."""
+    query = (
+        select(
+            LoadProfile.weekday,
+            LoadProfile.slot,
+            func.sum(LoadProfile.days),
+            func.sum(LoadProfile.power_watts_sum),
         )
-        last_row = (
-            session.query(EnergyReading)
-            .filter(EnergyReading.timestamp >= start, EnergyReading.timestamp <= end)
-            .order_by(EnergyReading.timestamp.desc())
-            .first()
+        .where(LoadProfile.season.in_(seasons))
+        .group_by(LoadProfile.weekday, LoadProfile.slot)
+    )
+    with SessionLocal() as session:
+        return [tuple(row) for row in session.execute(query).all()]
+
+
+def clear_profile():
+    """Empty the load profile, so the next update folds the whole history again."""
+    with SessionLocal() as session:
+        session.execute(delete(LoadProfile))
+        session.execute(delete(LoadProfileDay))
+        session.commit()
+
+
+def energy_counter_since(start: datetime) -> float | None:
+    """Return the first energy_in_kwh counter value from start on, from the hourly rollups."""
+    with SessionLocal() as session:
+        return session.scalar(
+            select(func.min(HourlyRollup.energy_in_kwh_min)).where(HourlyRollup.bucket >= start.timestamp())
         )
 
-        agg = (
-            session.query(
-                func.min(EnergyReading.power_watts),
-                func.max(EnergyReading.power_watts),
-                func.avg(EnergyReading.power_watts),
-                func.count(EnergyReading.power_watts),
-            )
-            .filter(EnergyReading.timestamp >= start, EnergyReading.timestamp <= end)
-            .one()
+
+def hourly_rollup_rows(start: datetime, end: datetime) -> list[tuple]:
+    """
+    (bucket, energy_in_kwh_min, energy_in_kwh_max, power_watts_sum, count, power_watts_max) of the hourly
+    rollups with start <= bucket < end, oldest first, in one range scan of the primary key.
+    """
+    query = (
+        select(
+            HourlyRollup.bucket,
+            HourlyRollup.energy_in_kwh_min,
+            HourlyRollup.energy_in_kwh_max,
+            HourlyRollup.power_watts_sum,
+            HourlyRollup.count,
+            HourlyRollup.power_watts_max,
         )
+        .where(HourlyRollup.bucket >= start.timestamp(), HourlyRollup.bucket < end.timestamp())
+        .order_by(HourlyRollup.bucket.asc())
+    )
+    with SessionLocal() as session:
+        return [tuple(row) for row in session.execute(query)]
 
-    min_power, max_power, avg_power, count = agg
-    logger.debug(f"⚠️ [get_stats] {min_power=} {max_power=} {avg_power=} {count=}")
-    energy_used = None
-    if first_row is not None and last_row is not None:
-        if first_row.energy_in_kwh is not None and last_row.energy_in_kwh is not None:
-            energy_used = float(last_row.energy_in_kwh) - float(first_row.energy_in_kwh)
 
-    return {
-        "energy_used_kwh": energy_used,
-        "min_power_watts": float(min_power) if min_power is not None else None,
-        "max_power_watts": float(max_power) if max_power is not None else None,
-        "avg_power_watts": float(avg_power) if avg_power is not None else None,
-        "count": int(count) if count is not None else 0,
-    }
+def delete_older_than(model, cutoff: datetime, limit: int) -> int:
+    """Delete up to `limit` of the oldest rows of a tier older than cutoff in one short transaction."""
+    column = EnergyReading.timestamp if model is EnergyReading else model.bucket
+    bound = _to_db_time(cutoff) if model is EnergyReading else cutoff.timestamp()
+    oldest = select(column).where(column < bound).order_by(column.asc()).limit(limit)
+    with SessionLocal() as session:
+        deleted = session.execute(delete(model).where(column.in_(oldest))).rowcount
+        session.commit()
+    return deleted
+
+
+def incremental_vacuum() -> int:
+    """Return free pages to the filesystem (requires auto_vacuum=INCREMENTAL); returns the pages freed."""
+    with SessionLocal() as session:
+        free_pages = session.scalar(text("PRAGMA freelist_count"))
+        session.execute(text("PRAGMA incremental_vacuum"))
+        session.commit()
+        return free_pages - session.scalar(text("PRAGMA freelist_count"))
+
+
+def vacuum():
+    """Rebuild the database file with incremental auto-vacuum enabled. Blocks writers while it runs."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+    logger.info("🧹 Vacuumed database")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+"""Streaming export of readings as CSV or Parquet, shared by /api/export and the `export` CLI."""
+
+import csv
+import io
+import logging
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import typer
+
+from src.database import DEFAULT_READING_FIELDS
+from src.database import READING_FIELDS
+from src.database import iter_bucketed_readings
+from src.database import iter_readings
+from src.helpers import parse_time_param
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_CHUNK_ROWS = 10_000
+
+
+def parse_fields(value: str | None) -> tuple[str, ...]:
+    """Parse a comma-separated list of reading field keys (see READING_FIELDS)."""
+    if not value:
+        return DEFAULT_READING_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in READING_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields {unknown}; choose from {list(READING_FIELDS)}")
+    return fields
+
+
+def column_names(fields: tuple[str, ...]) -> list[str]:
+    """Return the export header: timestamp_ms followed by the full column name of each field."""
+    return ["timestamp_ms", *(READING_FIELDS[field].name for field in fields)]
+
+
+def iter_export_chunks(
+    start, end, fields: tuple[str, ...], interval_s: int | None = None
+) -> Iterator[list[tuple]]:
+    """Yield row chunks for the export, resampled to interval_s buckets when given."""
+    if interval_s is not None:
+        return iter_bucketed_readings(start, end, fields, bucket_ms=interval_s * 1000)
+    return iter_readings(start, end, fields, chunk_size=EXPORT_CHUNK_ROWS)
+
+
+def stream_csv(chunks: Iterator[list[tuple]], fields: tuple[str, ...]) -> Iterator[str]:
+    """Render row chunks as CSV text, one string per chunk (header first)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column_names(fields))
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose written bytes can be taken out after each Parquet row group."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(chunks: Iterator[list[tuple]], fields: tuple[str, ...]) -> Iterator[bytes]:
+    """Render row chunks as a Parquet file, one row group per chunk. Requires the optional pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("parquet export needs pyarrow: uv sync --extra parquet") from e
+
+    names = column_names(fields)
+    schema = pa.schema([pa.field(names[0], pa.int64()), *(pa.field(n, pa.float64()) for n in names[1:])])
+
+    def row_groups():
+        sink = _DrainableSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for chunk in chunks:
+                columns = list(zip(*chunk, strict=True))
+                writer.write_table(pa.Table.from_arrays([pa.array(c) for c in columns], schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    return row_groups()
+
+
+def stream_export(start, end, fields: tuple[str, ...], fmt: str, interval_s: int | None = None):
+    """Return an iterator of encoded export chunks in the requested format."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown format {fmt!r}; choose from {list(EXPORT_FORMATS)}")
+    if interval_s is not None and interval_s <= 0:
+        raise ValueError("interval must be a positive number of seconds")
+    chunks = iter_export_chunks(start, end, fields, interval_s)
+    if fmt == "parquet":
+        return stream_parquet(chunks, fields)
+    return stream_csv(chunks, fields)
+
+
+def export_cli(
+    output: Path = typer.Argument(..., help="File to write; use - for stdout"),
+    start: str = typer.Option(None, "--start", help="ISO-8601 or ms since epoch"),
+    end: str = typer.Option(None, "--end", help="ISO-8601 or ms since epoch"),
+    fields: str = typer.Option(",".join(DEFAULT_READING_FIELDS), "--fields", help=",".join(READING_FIELDS)),
+    fmt: str = typer.Option("csv", "--format", help=" or ".join(EXPORT_FORMATS)),
+    interval: int = typer.Option(None, "--interval", help="Resample to buckets of this many seconds"),
+) -> None:
+    """Export readings to CSV or Parquet in constant memory."""
+    try:
+        chunks = stream_export(
+            parse_time_param(start), parse_time_param(end), parse_fields(fields), fmt, interval
+        )
+    except ValueError as e:
+        typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1) from None
+    if str(output) == "-":
+        stdout = sys.stdout.buffer if fmt == "parquet" else sys.stdout
+        for chunk in chunks:
+            stdout.write(chunk)
+        return
+    with output.open("wb" if fmt == "parquet" else "w") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    logger.info(f"📦 Exported readings to {output}")
+
+
+def main():
+    typer.run(export_cli)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ logger = logging.getLogger(__name__)
 
 BRANCH = "main"
 COMMIT_PREFIX = "[DB-AUTO-BACKUP]"
+COMMAND_TIMEOUT_SECONDS = 300  # a hung git push is killed instead of blocking the backup job forever
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
 RANGE_RE = re.compile(
     r"(?P<start>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})-" r"(?P<end>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})"
@@ -21,7 +22,7 @@ file_to_commit = f"{database_path}.bk"
 
 
 def run_command(cmd):
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=COMMAND_TIMEOUT_SECONDS)
     if result.returncode != 0:
         logger.error("Command %s failed: %s", cmd, result.stderr.strip())
         raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
@@ -79,7 +80,7 @@ def commit_db_if_changed():
     try:
         run_command(push_args)
         logger.info(log_action)
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
         logger.warning(f"Failed to push backup commit to remote: {e}")
 
 
@@ -0,0 +1,82 @@
+"""
+Calendar heatmap: a dense local day x hour-of-day matrix of hourly energy or power, built from the hourly
+rollups in one query, so a year is 8760 rows instead of millions of readings.
+"""
+
+from datetime import datetime
+from datetime import timedelta
+
+from src.database import hourly_rollup_rows
+from src.helpers import local_timezone
+
+METRICS = {"energy": "kWh", "mean_power": "W", "max_power": "W"}
+HOURS = 24
+DEFAULT_DAYS = 365
+MAX_DAYS = 3660  # ten years, 88k cells
+
+
+def parse_metric(value: str | None) -> str:
+    if value in (None, ""):
+        return "energy"
+    if value not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    return value
+
+
+def _local_day(moment: datetime) -> datetime:
+    """Naive local midnight of moment's local day."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(local_timezone()).replace(tzinfo=None)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_heatmap(start: datetime | None, end: datetime | None, metric: str = "energy") -> dict:
+    """
+    Return the local days from start's to end's (default: the last 365) as a row-major days x 24 list of
+    hourly values: kWh used, or mean or max power in watts. Hours without data are None; in the hour that
+    is repeated when clocks go back, both hours add up in one cell.
+    """
+    end = end or datetime.now(local_timezone())
+    first_day = _local_day(start or end - timedelta(days=DEFAULT_DAYS - 1))
+    last_day = _local_day(end)
+    days = (last_day.date() - first_day.date()).days + 1
+    if not 0 < days <= MAX_DAYS:
+        raise ValueError(f"the range must cover 1 to {MAX_DAYS} days")
+
+    values: list[float | None] = [None] * (days * HOURS)
+    power_counts = [0] * (days * HOURS)
+    previous_bucket = previous_energy = None
+    # One hour before the first day, so its first hour's energy starts from the previous counter value
+    for bucket, energy_min, energy_max, power_sum, count, power_max in hourly_rollup_rows(
+        first_day - timedelta(hours=1), last_day + timedelta(days=1)
+    ):
+        contiguous = previous_bucket == bucket - 3600 and previous_energy is not None
+        energy_start = previous_energy if contiguous else energy_min
+        previous_bucket = bucket
+        previous_energy = energy_max if energy_max is not None else previous_energy
+
+        moment = datetime.fromtimestamp(bucket)
+        if moment < first_day:
+            continue
+        cell = (moment.date() - first_day.date()).days * HOURS + moment.hour
+        if metric == "energy":
+            if energy_max is not None and energy_start is not None:
+                values[cell] = (values[cell] or 0.0) + energy_max - energy_start
+        elif metric == "mean_power":
+            if power_sum is not None:
+                values[cell] = (values[cell] or 0.0) + power_sum
+                power_counts[cell] += count
+        elif power_max is not None:
+            values[cell] = power_max if values[cell] is None else max(values[cell], power_max)
+
+    if metric == "mean_power":
+        values = [v / n if v is not None and n else None for v, n in zip(values, power_counts, strict=True)]
+    digits = 4 if metric == "energy" else 1
+    return {
+        "metric": metric,
+        "unit": METRICS[metric],
+        "start": int(first_day.timestamp() * 1000),
+        "days": days,
+        "hours": HOURS,
+        "values": [round(v, digits) if v is not None else None for v in values],
+    }
@@ -0,0 +1,265 @@
+"""Bulk import of historical readings (CSV, JSONL or Tasmota console logs) with their original timestamps."""
+
+import bisect
+import csv
+import json
+import logging
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+from operator import itemgetter
+from pathlib import Path
+
+import typer
+
+from src.database import ROLLUP_TIERS
+from src.database import EnergyReading
+from src.database import engine
+from src.database import get_gaps
+from src.database import get_time_extent
+from src.database import reading_values
+from src.database import rebuild_gap_index
+from src.database import rollup_merge_sql
+from src.database import to_db_text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl", "tasmota-log")
+IMPORT_BATCH_ROWS = 100_000
+# Imported rows this close to a stored reading are treated as the same reading (live timestamps have
+# sub-second precision, device log timestamps do not)
+DEDUP_TOLERANCE = timedelta(seconds=5)
+IMPORT_COLUMNS = (
+    "timestamp",
+    "meter_id",
+    "power_watts",
+    "energy_in_kwh",
+    "energy_out_kwh",
+    "power_phase_1_watts",
+    "power_phase_2_watts",
+    "power_phase_3_watts",
+    "raw_payload",
+)
+# Batches are staged in a temp table so that only rows that are actually new reach the rollup tiers
+STAGING_TABLE = "import_staging"
+STAGING_DDL = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+    f"(timestamp TEXT PRIMARY KEY, {', '.join(IMPORT_COLUMNS[1:])})"
+)
+STAGE_SQL = (
+    f"INSERT OR IGNORE INTO {STAGING_TABLE} ({', '.join(IMPORT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in IMPORT_COLUMNS)})"
+)
+DROP_EXISTING_SQL = (
+    f"DELETE FROM {STAGING_TABLE} WHERE timestamp IN (SELECT timestamp FROM {EnergyReading.__tablename__})"
+)
+INSERT_SQL = (
+    f"INSERT INTO {EnergyReading.__tablename__} ({', '.join(IMPORT_COLUMNS)}) "
+    f"SELECT {', '.join(IMPORT_COLUMNS)} FROM {STAGING_TABLE}"
+)
+ROLLUP_SQL = [rollup_merge_sql(model, STAGING_TABLE) for model in ROLLUP_TIERS]
+# Relaxed durability while loading: a crash mid-import only loses the import, which can be re-run
+BULK_LOAD_PRAGMAS = ("PRAGMA synchronous=OFF", "PRAGMA cache_size=-65536", "PRAGMA temp_store=MEMORY")
+RESTORE_PRAGMAS = ("PRAGMA synchronous=NORMAL", "PRAGMA cache_size=-2000", "PRAGMA temp_store=DEFAULT")
+
+
+_row_values = itemgetter(*IMPORT_COLUMNS[1:])
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse ms since epoch or ISO-8601 into a datetime; naive values are local time and kept naive."""
+    if value.isdigit():
+        return datetime.fromtimestamp(int(value) / 1000)
+    return datetime.fromisoformat(value)
+
+
+def _row(timestamp: datetime, values: dict) -> tuple:
+    return (to_db_text(timestamp), *_row_values(values))
+
+
+def parse_csv(lines: Iterator[str]) -> Iterator[tuple]:
+    """
+    Parse CSV with a timestamp (ISO-8601) or timestamp_ms column plus any EnergyReading column names.
+    The header is checked right away, the rows as they are read.
+    """
+    reader = csv.DictReader(lines)
+    if not {"timestamp", "timestamp_ms"} & set(reader.fieldnames or ()):
+        raise ValueError(f"CSV header {reader.fieldnames} has neither a timestamp nor a timestamp_ms column")
+    return _parse_csv_records(reader)
+
+
+def _parse_csv_records(reader: csv.DictReader) -> Iterator[tuple]:
+    float_columns = IMPORT_COLUMNS[2:-1]
+    for record in reader:
+        value = record.pop("timestamp_ms", None) or record.pop("timestamp", None)
+        if not value:
+            raise ValueError(f"CSV line {reader.line_num} has no timestamp")
+        timestamp = _parse_timestamp(value)
+        values = {column: float(record[column]) if record.get(column) else None for column in float_columns}
+        values["meter_id"] = record.get("meter_id") or None
+        values["raw_payload"] = json.dumps(record)
+        yield _row(timestamp, values)
+
+
+def _parse_tasmota_payload(payload: dict) -> tuple | None:
+    """Turn a Tasmota SENSOR payload ({"Time": ..., "MT681": {...}}) into a row, or None if not a reading."""
+    if "MT681" not in payload or "Time" not in payload:
+        return None
+    return _row(_parse_timestamp(payload["Time"]), reading_values(payload["MT681"]))
+
+
+def parse_jsonl(lines: Iterator[str]) -> Iterator[tuple]:
+    """Parse one Tasmota SENSOR payload per line."""
+    for line in lines:
+        if line.strip() and (row := _parse_tasmota_payload(json.loads(line))):
+            yield row
+
+
+def parse_tasmota_log(lines: Iterator[str]) -> Iterator[tuple]:
+    """Parse Tasmota console lines like `12:00:00.123 MQT: tele/tasmota/SENSOR = {...}`."""
+    for line in lines:
+        if "SENSOR = {" not in line:
+            continue
+        payload = line.split(" = ", 1)[1]
+        if row := _parse_tasmota_payload(json.loads(payload)):
+            yield row
+
+
+PARSERS = {"csv": parse_csv, "jsonl": parse_jsonl, "tasmota-log": parse_tasmota_log}
+
+
+def detect_format(path: Path) -> str:
+    """Guess the import format from the file extension."""
+    match path.suffix.lower():
+        case ".csv":
+            return "csv"
+        case ".jsonl" | ".json" | ".ndjson":
+            return "jsonl"
+        case _:
+            return "tasmota-log"
+
+
+def _gap_filter():
+    """Return a predicate accepting db timestamps inside a known gap or outside the stored range.
+
+    Built from the gap index in O(gaps). Bounds are pulled in by DEDUP_TOLERANCE so imported rows
+    never duplicate live readings stored with slightly different timestamps.
+    """
+    extent = get_time_extent(None, None)
+    if extent is None:
+        return lambda ts: True
+
+    def shifted(ms: int, delta: timedelta) -> str:
+        return to_db_text(datetime.fromtimestamp(ms / 1000) + delta)
+
+    gaps = get_gaps()
+    before_first = shifted(extent[0], -DEDUP_TOLERANCE)
+    after_last = shifted(extent[1], DEDUP_TOLERANCE)
+    gap_starts = [shifted(gap["start"], DEDUP_TOLERANCE) for gap in gaps]
+    gap_ends = [shifted(gap["end"], -DEDUP_TOLERANCE) for gap in gaps]
+
+    def accept(ts: str) -> bool:
+        if ts < before_first or ts > after_last:
+            return True
+        i = bisect.bisect_left(gap_starts, ts) - 1
+        return i >= 0 and gap_starts[i] < ts < gap_ends[i]
+
+    return accept
+
+
+def bulk_insert(rows: Iterator[tuple], batch_size: int = IMPORT_BATCH_ROWS, only_gaps: bool = True) -> dict:
+    """
+    Insert rows with executemany in large transactions, then refresh derived data once for the range.
+    Existing timestamps are kept; with only_gaps, rows are only loaded into gaps of the existing data.
+    Each batch is merged into the rollup tiers in the same transaction that inserts it.
+    """
+    accept = _gap_filter() if only_gaps else (lambda ts: True)
+    stats = {"read": 0, "skipped": 0, "inserted": 0, "first": None, "last": None}
+
+    raw = engine.raw_connection()
+    cursor = raw.cursor()
+    try:
+        for pragma in BULK_LOAD_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.execute(STAGING_DDL)
+        batch: list[tuple] = []
+
+        def flush():
+            cursor.executemany(STAGE_SQL, batch)
+            cursor.execute(DROP_EXISTING_SQL)
+            before = raw.total_changes
+            cursor.execute(INSERT_SQL)
+            stats["inserted"] += raw.total_changes - before
+            for sql in ROLLUP_SQL:
+                cursor.execute(sql)
+            cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+            raw.commit()
+            batch.clear()
+
+        for row in rows:
+            stats["read"] += 1
+            if not accept(row[0]):
+                stats["skipped"] += 1
+                continue
+            batch.append(row)
+            stats["first"] = min(stats["first"] or row[0], row[0])
+            stats["last"] = max(stats["last"] or row[0], row[0])
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        # The connection goes back to the pool, so undo the relaxed durability even when the import fails
+        raw.rollback()
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        for pragma in RESTORE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+        raw.close()
+
+    if stats["inserted"]:
+        refresh_derived_data(datetime.fromisoformat(stats["first"]), datetime.fromisoformat(stats["last"]))
+    return stats
+
+
+def refresh_derived_data(start: datetime, end: datetime):
+    """Rebuild indexes derived from readings for [start, end] after a bulk load."""
+    rebuild_gap_index(start, end)
+
+
+def import_cli(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV, JSONL or Tasmota log file"),
+    fmt: str = typer.Option(None, "--format", help=" or ".join(IMPORT_FORMATS) + " (default: by extension)"),
+    batch_size: int = typer.Option(IMPORT_BATCH_ROWS, "--batch-size", help="Rows per transaction"),
+    only_gaps: bool = typer.Option(True, "--only-gaps/--all-rows", help="Only fill gaps in existing data"),
+) -> None:
+    """Bulk import historical readings with their original timestamps."""
+    fmt = fmt or detect_format(path)
+    if fmt not in PARSERS:
+        typer.secho(
+            f"Error: unknown format {fmt!r}; choose from {list(IMPORT_FORMATS)}",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    started = time.perf_counter()
+    try:
+        with path.open() as f:
+            stats = bulk_insert(PARSERS[fmt](f), batch_size=batch_size, only_gaps=only_gaps)
+    except ValueError as e:
+        typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1) from None
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"📥 Imported {stats['inserted']}/{stats['read']} rows ({stats['skipped']} outside gaps) in {elapsed:.1f}s"
+    )
+
+
+def main():
+    typer.run(import_cli)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Concurrent job runner for the scheduler. Jobs run on a worker pool, so a slow job doesn't delay the others,
+with a per-job timeout, overlap prevention and start jitter. Each job keeps a history of its recent runs.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from urllib.parse import urlparse
+
+from src.config import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+JOB_HISTORY_LENGTH = 20  # runs kept per job
+# Where the scheduler publishes job status for the web app's /status
+JOBS_STATUS_FILE = Path(urlparse(DATABASE_URL).path.lstrip("/")).with_name("scheduler-jobs.json")
+
+
+@dataclass
+class Job:
+    """A scheduled task: runs over timeout_s are reported as timed out, starts are delayed by up to jitter_s."""
+
+    name: str
+    func: Callable[[], object]
+    timeout_s: float
+    jitter_s: float = 0
+    running: bool = False
+    history: deque = field(default_factory=lambda: deque(maxlen=JOB_HISTORY_LENGTH))
+
+
+class JobRunner:
+    """
+    Runs jobs on a pool of max_workers. Python threads can't be killed, so a timed-out run is abandoned: it is
+    recorded as "timeout", its job stays marked running until it returns, and it is not started again until then.
+    Job code that can hang (e.g. subprocesses) should enforce its own timeout as well.
+    """
+
+    def __init__(self, max_workers: int = 4, status_file: Path | None = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self.jobs: dict[str, Job] = {}
+        self.status_file = status_file
+
+    def submit(self, job: Job):
+        """Start a run of job unless one is still running. Returns immediately; use as a schedule callback."""
+        self.jobs[job.name] = job
+        with self._lock:
+            overlapping = job.running
+            job.running = True
+        if overlapping:
+            logger.warning(f"⏭️ [jobs] {job.name} skipped, previous run still in progress")
+            self._record(job, time.time(), 0, "skipped", None)
+            return
+        self._pool.submit(self._supervise, job)
+
+    def _supervise(self, job: Job):
+        time.sleep(random.uniform(0, job.jitter_s))
+        error = None
+
+        def target():
+            nonlocal error
+            try:
+                job.func()
+            except Exception as e:
+                logger.exception(f"❌ [jobs] {job.name} failed")
+                error = e
+            finally:
+                with self._lock:
+                    job.running = False
+
+        started = time.time()
+        start = time.perf_counter()
+        thread = threading.Thread(target=target, name=f"job-{job.name}", daemon=True)
+        thread.start()
+        thread.join(job.timeout_s)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if thread.is_alive():
+            logger.error(f"⏱️ [jobs] {job.name} exceeded its {job.timeout_s}s timeout, abandoning the run")
+            self._record(job, started, duration_ms, "timeout", None)
+        elif error is not None:
+            self._record(job, started, duration_ms, "error", repr(error))
+        else:
+            logger.info(f"✅ [jobs] {job.name} finished in {duration_ms:.0f}ms")
+            self._record(job, started, duration_ms, "ok", None)
+
+    def _record(self, job: Job, started: float, duration_ms: float, outcome: str, error: str | None):
+        job.history.append(
+            {
+                "at": int(started * 1000),
+                "duration_ms": round(duration_ms, 1),
+                "outcome": outcome,
+                "error": error,
+            }
+        )
+        if self.status_file is not None:
+            self._write_status()
+
+    def status(self) -> dict:
+        """Per job: whether it is running, its last run and its recent runs (oldest first)."""
+        with self._lock:
+            return {
+                name: {
+                    "running": job.running,
+                    "last": job.history[-1] if job.history else None,
+                    "history": list(job.history),
+                }
+                for name, job in self.jobs.items()
+            }
+
+    def _write_status(self):
+        """Publish status() for the web app's /status, which runs in another process."""
+        status = self.status()
+        with self._status_lock:
+            tmp = self.status_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(status))
+            os.replace(tmp, self.status_file)
+
+
+def read_job_status(status_file: Path = JOBS_STATUS_FILE) -> dict | None:
+    """Read the status published by a JobRunner, or None if there is none yet."""
+    try:
+        return json.loads(status_file.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,92 @@
+"""
+Lock-wait instrumentation. In WAL mode readers never block, but a writer waits up to busy_timeout for the write
+lock. A transaction normally takes that lock inside its first INSERT/UPDATE/DELETE, hiding the wait in a slow
+statement; here it is taken by an explicit BEGIN IMMEDIATE just before, which is timed on its own. Commits are
+timed by the connection class.
+"""
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+MAX_SAMPLES = 1000  # most recent lock waits and commits kept per process for percentiles
+MAX_LONG_WAITS = 50  # most recent lock waits over the log threshold kept with their statement
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_samples = {"lock_wait": deque(maxlen=MAX_SAMPLES), "commit": deque(maxlen=MAX_SAMPLES)}
+_counts = {"lock_wait": 0, "commit": 0}
+_long_waits: deque[dict] = deque(maxlen=MAX_LONG_WAITS)
+_lock = threading.Lock()
+
+
+def _record(kind: str, ms: float):
+    with _lock:
+        _samples[kind].append(ms)
+        _counts[kind] += 1
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection timing its commits; pass as connect_args={"factory": TimedConnection}."""
+
+    def commit(self):
+        start = time.perf_counter()
+        super().commit()
+        _record("commit", (time.perf_counter() - start) * 1000)
+
+
+def install_lock_timing(engine, log_ms: float):
+    """Take the write lock of engine's transactions with a timed BEGIN IMMEDIATE; log waits of log_ms or more."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def begin_immediate(conn, cursor, statement, parameters, context, executemany):
+        dbapi_conn = cursor.connection
+        # Autocommit connections (isolation_level None) must not be left with an open transaction
+        if dbapi_conn.in_transaction or dbapi_conn.isolation_level is None:
+            return
+        if not statement.lstrip().upper().startswith(WRITE_STATEMENTS):
+            return
+        start = time.perf_counter()
+        dbapi_conn.execute("BEGIN IMMEDIATE")
+        waited_ms = (time.perf_counter() - start) * 1000
+        _record("lock_wait", waited_ms)
+        if log_ms and waited_ms >= log_ms:
+            with _lock:
+                _long_waits.append(
+                    {"at": int(time.time() * 1000), "ms": round(waited_ms, 1), "statement": statement}
+                )
+            logger.warning(
+                f"🔒 [lock wait] {waited_ms:.0f}ms for the write lock before: {' '.join(statement.split())}"
+            )
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (q in 0..100) of values, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def lock_wait_stats() -> dict:
+    """Per kind (lock_wait, commit): total count and p50/p99/max ms over the recent samples, plus long waits."""
+    with _lock:
+        samples = {kind: list(values) for kind, values in _samples.items()}
+        counts = dict(_counts)
+        long_waits = list(reversed(_long_waits))
+    stats = {
+        kind: {
+            "count": counts[kind],
+            "p50_ms": percentile(values, 50),
+            "p99_ms": percentile(values, 99),
+            "max_ms": max(values, default=None),
+        }
+        for kind, values in samples.items()
+    }
+    return {**stats, "long_waits": long_waits}
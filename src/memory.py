@@ -0,0 +1,154 @@
+"""
+Memory accounting for small hosts. Caches register with the estimated bytes of their entries, and when the
+total exceeds the global budget (`memory_budget_mb`), the least recently used entries of the largest cache
+are evicted first. Also reports the process RSS and, on demand, the top tracemalloc allocation sites.
+"""
+
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections.abc import Callable
+from typing import NamedTuple
+
+from src.config import MEMORY_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+BUDGET_BYTES = MEMORY_BUDGET_MB * 1024 * 1024
+SAMPLE_ITEMS = 16  # items of a long list measured to estimate its size
+ENTRY_SHARE = 4  # a single result larger than 1 / ENTRY_SHARE of the budget is not cached
+
+_lock = threading.Lock()
+
+
+class _Cache(NamedTuple):
+    usage: Callable[[], tuple[int, int]]  # (entries, bytes)
+    evict_one: Callable[[], int]  # drops the least recently used entry, returns its bytes (0 if empty)
+
+
+_caches: dict[str, _Cache] = {}
+
+
+def register_cache(name: str, usage: Callable[[], tuple[int, int]], evict_one: Callable[[], int]):
+    """Account a cache under name; the callbacks must take the cache's own lock, not call back in here."""
+    with _lock:
+        _caches[name] = _Cache(usage, evict_one)
+
+
+def estimate_bytes(value) -> int:
+    """
+    Approximate deep size of a cached result: exact for NumPy arrays and scalars, and for lists, tuples and
+    dicts the container plus its items, measured on up to SAMPLE_ITEMS evenly spaced items and scaled.
+    Dict keys are not counted, as rows share their (interned) keys.
+    """
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + _items_bytes(list(value.values()))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + _items_bytes(value)
+    return sys.getsizeof(value)
+
+
+def _items_bytes(items) -> int:
+    if len(items) <= SAMPLE_ITEMS:
+        return sum(estimate_bytes(item) for item in items)
+    step = len(items) / SAMPLE_ITEMS
+    sample = sum(estimate_bytes(items[int(i * step)]) for i in range(SAMPLE_ITEMS))
+    return sample * len(items) // SAMPLE_ITEMS
+
+
+def fits_budget(nbytes: int) -> bool:
+    """Whether a result of nbytes may be cached at all, so one huge result doesn't flush every cache."""
+    return not BUDGET_BYTES or nbytes <= BUDGET_BYTES // ENTRY_SHARE
+
+
+def cache_usage() -> dict[str, dict[str, int]]:
+    """Entries and estimated bytes per registered cache."""
+    with _lock:
+        caches = dict(_caches)
+    return {
+        name: dict(zip(("entries", "bytes"), cache.usage(), strict=True)) for name, cache in caches.items()
+    }
+
+
+def enforce_budget() -> int:
+    """Evict least recently used entries of the largest cache until all caches fit the budget; return bytes freed."""
+    if not BUDGET_BYTES:
+        return 0
+    with _lock:
+        caches = dict(_caches)
+    freed = 0
+    while True:
+        usage = {name: cache.usage()[1] for name, cache in caches.items()}
+        if sum(usage.values()) <= BUDGET_BYTES:
+            break
+        evicted = caches[max(usage, key=usage.get)].evict_one()
+        if not evicted:
+            break
+        freed += evicted
+    if freed:
+        logger.info(f"🧹 Evicted {freed / 1e6:.1f} MB of cached results to stay within {MEMORY_BUDGET_MB} MB")
+    return freed
+
+
+def rss_bytes() -> int | None:
+    """Resident set size of this process from /proc (Linux, so the Pi), None elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def start_tracing(frames: int = 1):
+    """Start tracing allocations; costs CPU and memory until stopped, so it's only on demand."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        logger.info("🔬 Started tracemalloc")
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logger.info("🔬 Stopped tracemalloc")
+
+
+def top_allocations(limit: int = 10) -> list[dict]:
+    """The source lines holding the most memory allocated since tracing started, largest first."""
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    return [
+        {
+            "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def memory_stats(top: int = 10) -> dict:
+    """RSS, the budget, per-cache usage and, while tracemalloc is tracing, the top allocation sites."""
+    caches = cache_usage()
+    return {
+        "rss_bytes": rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "budget_bytes": BUDGET_BYTES or None,
+        "cached_bytes": sum(cache["bytes"] for cache in caches.values()),
+        "caches": caches,
+        "tracing": tracemalloc.is_tracing(),
+        "top_allocations": top_allocations(top),
+    }
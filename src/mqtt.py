@@ -5,24 +5,34 @@ import logging
 import queue
 import sys
 import threading
+import time
 
 import paho.mqtt.client as mqtt
 
+from src.alerts import AlertEngine
+from src.alerts import default_rules
+from src.alerts import run_watchdog
 from src.config import MQTT_PORT
+from src.config import MQTT_QUEUE_MAX
 from src.config import SERVER_URL
 from src.config import TOPIC
 from src.database import init_db
+from src.database import reading_values
 from src.database import save_energy_reading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Queue for database writes
-db_queue = queue.Queue()
+# Queue for database writes, bounded so a stalled writer can't grow it without limit (0 = unbounded)
+db_queue = queue.Queue(maxsize=MQTT_QUEUE_MAX)
+_dropped = 0
 
 # Global MQTT client for status checks
 _mqtt_client: mqtt.Client | None = None
 
+# Alert rules evaluated on every stored reading; None until the service starts
+_alert_engine: AlertEngine | None = None
+
 
 def db_worker():
     """Single thread consuming DB writes."""
@@ -34,10 +44,42 @@ def db_worker():
             save_energy_reading(tasmota_payload=payload)
         except Exception:
             logger.exception("Failed to save reading")
+        else:
+            evaluate_alerts(payload)
         finally:
             db_queue.task_done()
 
 
+def enqueue(payload: dict):
+    """Queue a reading for the DB writer; when the queue is full, drop the oldest to keep the newest."""
+    global _dropped
+    while True:
+        try:
+            db_queue.put_nowait(payload)
+            return
+        except queue.Full:
+            try:
+                db_queue.get_nowait()
+                db_queue.task_done()
+            except queue.Empty:
+                continue
+            _dropped += 1
+            if _dropped % 100 == 1:
+                logger.warning(
+                    f"⚠️ DB write queue full ({db_queue.maxsize}), dropped {_dropped} readings so far"
+                )
+
+
+def evaluate_alerts(payload: dict):
+    """Feed a stored reading to the alert rules."""
+    if _alert_engine is None:
+        return
+    try:
+        _alert_engine.on_reading(time.time(), reading_values(payload["MT681"]))
+    except Exception:
+        logger.exception("Failed to evaluate alerts")
+
+
 def get_mqtt_client():
     """Get the MQTT client instance."""
     return _mqtt_client
@@ -67,7 +109,7 @@ def on_message(client, userdata, msg):
         return
 
     if "MT681" in data:
-        db_queue.put(data)  # enqueue DB write
+        enqueue(data)
 
 
 def on_disconnect(client, userdata, reason_code, properties):
@@ -82,6 +124,11 @@ if __name__ == "__main__":
         logger.info("Using macOS, skipping MQTT loop")
         sys.exit(0)
 
+    # Start alert engine before the DB worker so the first reading is evaluated
+    _alert_engine = AlertEngine(default_rules())
+    threading.Thread(target=run_watchdog, args=(_alert_engine,), daemon=True).start()
+    logger.info(f"✅ Started alert watchdog with rules {[rule.name for rule in _alert_engine.rules]}")
+
     # Start DB worker thread
     worker_thread = threading.Thread(target=db_worker, daemon=True)
     worker_thread.start()
@@ -0,0 +1,172 @@
+"""
+Typical load profile: the expected power per weekday and 15-minute slot, optionally by season, kept as a small
+precomputed cube that is folded forward one closed day at a time. Forecasts combine the consumption so far in
+the current day, week and month with what the profile expects for the rest of the period.
+"""
+
+import logging
+from datetime import datetime
+from datetime import timedelta
+
+import typer
+
+from src.database import clear_profile
+from src.database import energy_counter_since
+from src.database import fold_profile_day
+from src.database import latest_energy_reading
+from src.database import profile_fold_start
+from src.database import profile_rows
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SEASONS = ("winter", "spring", "summer", "autumn")  # meteorological, winter is Dec-Feb
+ALL_SEASONS = tuple(range(len(SEASONS)))
+# Trailing windows ending now, matching the dashboard's period summary
+TRAILING_DAYS = {"day": 1, "week": 7, "month": 30}
+
+
+def season_of(moment: datetime) -> int:
+    return moment.month % 12 // 3
+
+
+def parse_season(value: str | None, now: datetime | None = None) -> tuple[int, ...]:
+    """Map a season query parameter ("all", "current" or a season name) to season numbers."""
+    if value in (None, "", "all"):
+        return ALL_SEASONS
+    if value == "current":
+        return (season_of(now or datetime.now()),)
+    if value in SEASONS:
+        return (SEASONS.index(value),)
+    raise ValueError(f"season must be all, current or one of {', '.join(SEASONS)}")
+
+
+def update_profile(today: datetime | None = None) -> int:
+    """Fold every closed local day that is not in the profile yet. Returns the days folded."""
+    today = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    day = profile_fold_start()
+    folded = 0
+    while day is not None and day < today:
+        if fold_profile_day(day, season_of(day)):
+            folded += 1
+        day += timedelta(days=1)
+    logger.info(f"📈 [profile] Folded {folded} days into the load profile")
+    return folded
+
+
+def get_profile(seasons: tuple[int, ...] = ALL_SEASONS) -> dict:
+    """Return the cube as 7 x 96 lists, Monday first: average power, expected kWh and days per slot."""
+    power = [[None] * SLOTS_PER_DAY for _ in range(7)]
+    energy = [[None] * SLOTS_PER_DAY for _ in range(7)]
+    days = [[0] * SLOTS_PER_DAY for _ in range(7)]
+    for weekday, slot, slot_days, power_sum in profile_rows(seasons):
+        power[weekday][slot] = power_sum / slot_days
+        energy[weekday][slot] = power[weekday][slot] * SLOT_MINUTES / 60 / 1000
+        days[weekday][slot] = slot_days
+    return {"slot_minutes": SLOT_MINUTES, "power_watts": power, "energy_kwh": energy, "days": days}
+
+
+def _fill_missing(energy: list[list]) -> list[list[float]]:
+    """Replace empty slots with the slot's average over the other weekdays, or 0 if it has none."""
+    filled = []
+    for weekday in energy:
+        row = []
+        for slot, value in enumerate(weekday):
+            if value is None:
+                others = [day[slot] for day in energy if day[slot] is not None]
+                value = sum(others) / len(others) if others else 0.0
+            row.append(value)
+        filled.append(row)
+    return filled
+
+
+def expected_energy_kwh(energy: list[list[float]], start: datetime, end: datetime) -> float:
+    """Expected kWh over [start, end) of local time, counting partly covered slots pro rata."""
+    slot_length = timedelta(minutes=SLOT_MINUTES)
+    day_totals = [sum(day) for day in energy]
+    total = 0.0
+    moment = start
+    while moment < end:
+        if moment.time() == datetime.min.time() and moment + timedelta(days=1) <= end:
+            total += day_totals[moment.weekday()]  # whole days at once
+            moment += timedelta(days=1)
+            continue
+        minutes = moment.hour * 60 + moment.minute
+        slot_end = moment.replace(minute=0, second=0, microsecond=0) + timedelta(
+            minutes=minutes % 60 // SLOT_MINUTES * SLOT_MINUTES + SLOT_MINUTES
+        )
+        covered = min(end, slot_end) - moment
+        total += energy[moment.weekday()][minutes // SLOT_MINUTES] * (covered / slot_length)
+        moment = slot_end
+    return total
+
+
+def _periods(now: datetime) -> dict[str, tuple[datetime, datetime]]:
+    """The local calendar day, week (from Monday) and month containing now, as (start, end)."""
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    week_start = today - timedelta(days=today.weekday())
+    return {
+        "day": (today, today + timedelta(days=1)),
+        "week": (week_start, week_start + timedelta(days=7)),
+        "month": (month_start, next_month),
+    }
+
+
+def forecast(energy: list[list[float]], now: datetime) -> dict:
+    """
+    Project the consumption of the current day, week and month: the kWh used since the period started plus
+    the profile's expectation for its remainder.
+    """
+    latest = latest_energy_reading()
+    latest_kwh = latest["energy_in_kwh"] if latest is not None else None
+    periods = {}
+    for name, (start, end) in _periods(now).items():
+        start_kwh = energy_counter_since(start)
+        actual = latest_kwh - start_kwh if latest_kwh is not None and start_kwh is not None else None
+        remaining = expected_energy_kwh(energy, now, end)
+        periods[name] = {
+            "start": int(start.timestamp() * 1000),
+            "end": int(end.timestamp() * 1000),
+            "actual_kwh": actual,
+            "remaining_kwh": remaining,
+            "projected_kwh": actual + remaining if actual is not None else None,
+            "typical_kwh": expected_energy_kwh(energy, start, end),
+        }
+    return periods
+
+
+def profile_summary(seasons: tuple[int, ...] = ALL_SEASONS, now: datetime | None = None) -> dict:
+    """The profile cube with the expected kWh of the trailing day, week and month and the period forecasts."""
+    now = now or datetime.now()
+    summary = {
+        "seasons": [SEASONS[s] for s in seasons],
+        **get_profile(seasons),
+        "trailing": None,
+        "forecast": None,
+    }
+    if not any(any(days) for days in summary["days"]):
+        return summary
+    energy = _fill_missing(summary["energy_kwh"])
+    summary["trailing"] = {
+        name: expected_energy_kwh(energy, now - timedelta(days=days), now)
+        for name, days in TRAILING_DAYS.items()
+    }
+    summary["forecast"] = forecast(energy, now)
+    return summary
+
+
+def profile_cli(
+    rebuild: bool = typer.Option(False, "--rebuild", help="Fold the whole history again from scratch"),
+) -> None:
+    """Fold closed days into the load profile."""
+    if rebuild:
+        clear_profile()
+    update_profile()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    typer.run(profile_cli)
@@ -0,0 +1,150 @@
+"""
+Range query cache invalidated by the data itself instead of by hand. Every lookup first asks for the current
+DataState of the readings, which the database layer re-reads only when SQLite's PRAGMA data_version reports a
+commit by another connection. When new readings arrive, only entries whose range reaches into the hour of
+the previous high-water mark (or is open-ended) are dropped; closed historical ranges stay cached until
+evicted. A change below that hour, such as a backfill, drops everything. Entries are accounted against the
+global memory budget (see src.memory), which evicts least recently used entries under pressure.
+"""
+
+import inspect
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+from functools import wraps
+from typing import NamedTuple
+
+from src.memory import enforce_budget
+from src.memory import estimate_bytes
+from src.memory import fits_budget
+from src.memory import register_cache
+
+
+class DataState(NamedTuple):
+    high_water_ms: int | None  # newest reading
+    boundary_ms: int | None  # start of the high-water mark's hour: older data only changes by backfills
+    rows: int  # readings counted by the hourly rollups
+    generation: int  # bumped whenever readings before the previous boundary changed
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    invalidated: int
+    bytes: int  # estimated size of the cached results
+
+
+def _end_ms(end: datetime | None) -> float | None:
+    return end.timestamp() * 1000 if end is not None else None
+
+
+def range_cache(state: Callable[[], DataState], maxsize: int = 1000):
+    """
+    LRU cache for functions taking `start` and `end` datetimes (None = unbounded), keyed on all arguments
+    after binding defaults. Like lru_cache, it exposes cache_info(), cache_clear() and __wrapped__, plus
+    cached(*args, **kwargs) telling whether a call would currently be answered from the cache.
+    Results too large for the memory budget are returned without being cached.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        # key -> (end ms, result, estimated bytes)
+        entries: OrderedDict[tuple, tuple[float | None, object, int]] = OrderedDict()
+        lock = threading.Lock()
+        counts = {"hits": 0, "misses": 0, "invalidated": 0, "bytes": 0}
+        # epoch counts invalidations, so a result computed across one is not stored as current
+        current = {"state": None, "epoch": 0}
+
+        def invalidate(new: DataState):
+            old = current["state"]
+            if old is None or new.generation != old.generation or old.boundary_ms is None:
+                stale = list(entries)
+            else:
+                stale = [key for key, (end, _, _) in entries.items() if end is None or end >= old.boundary_ms]
+            for key in stale:
+                counts["bytes"] -= entries.pop(key)[2]
+            counts["invalidated"] += len(stale)
+            current["state"] = new
+            current["epoch"] += 1
+
+        def bind(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound, tuple(bound.arguments.items())
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound, key = bind(args, kwargs)
+            new_state = state()
+            with lock:
+                if new_state != current["state"]:
+                    invalidate(new_state)
+                if key in entries:
+                    entries.move_to_end(key)
+                    counts["hits"] += 1
+                    return entries[key][1]
+                counts["misses"] += 1
+                epoch = current["epoch"]
+
+            result = func(*bound.args, **bound.kwargs)
+            size = estimate_bytes(result)
+            if not fits_budget(size):
+                return result
+            with lock:
+                if current["epoch"] == epoch:
+                    if key in entries:  # stored by a concurrent call meanwhile
+                        counts["bytes"] -= entries[key][2]
+                    entries[key] = (_end_ms(bound.arguments["end"]), result, size)
+                    counts["bytes"] += size
+                    if len(entries) > maxsize:
+                        counts["bytes"] -= entries.popitem(last=False)[1][2]
+            enforce_budget()
+            return result
+
+        def cached(*args, **kwargs) -> bool:
+            """Whether the result for these arguments is cached and current; not counted as a hit or miss."""
+            _, key = bind(args, kwargs)
+            new_state = state()
+            with lock:
+                if new_state != current["state"]:
+                    invalidate(new_state)
+                return key in entries
+
+        def cache_info() -> CacheInfo:
+            with lock:
+                return CacheInfo(
+                    counts["hits"],
+                    counts["misses"],
+                    maxsize,
+                    len(entries),
+                    counts["invalidated"],
+                    counts["bytes"],
+                )
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+                counts.update(hits=0, misses=0, invalidated=0, bytes=0)
+
+        def usage() -> tuple[int, int]:
+            with lock:
+                return len(entries), counts["bytes"]
+
+        def evict_one() -> int:
+            with lock:
+                if not entries:
+                    return 0
+                size = entries.popitem(last=False)[1][2]
+                counts["bytes"] -= size
+                return size
+
+        wrapper.cached = cached
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        register_cache(f"{func.__module__}.{func.__qualname__}", usage, evict_one)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,80 @@
+"""Slow-query log: times every SQL statement and keeps the query plan of those over a threshold."""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+MAX_SLOW_QUERIES = 50  # most recent slow queries kept for /api/debug/slow_queries
+MAX_PARAMS_CHARS = 300  # raw MQTT payloads are bound as parameters, keep log lines short
+
+_slow_queries: deque[dict] = deque(maxlen=MAX_SLOW_QUERIES)
+_lock = threading.Lock()
+
+
+def explain_query_plan(dbapi_conn, statement: str, parameters) -> list[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines of a statement, or [] if it can't be explained."""
+    try:
+        rows = dbapi_conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    except sqlite3.Error:
+        return []
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(plan: list[str]) -> bool:
+    """
+    A SCAN step reads every row of its table, also through a covering index (which only saves reading
+    the table pages); steps constrained by an index range are SEARCH steps. Scans of a constant row or
+    of a subquery's result, which an inner step produced, are not counted.
+    """
+    subqueries = {step.split()[-1] for step in plan if step.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+    return any(
+        step.startswith("SCAN ")
+        and step != "SCAN CONSTANT ROW"
+        and not step.startswith("SCAN (subquery")
+        and step.split()[1] not in subqueries
+        for step in plan
+    )
+
+
+def install_slow_query_log(engine, threshold_ms: float):
+    """Time every statement on engine; record those taking threshold_ms or longer with their query plan."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context.query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_slow_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context.query_start) * 1000
+        if elapsed_ms < threshold_ms or statement.lstrip().upper().startswith(("PRAGMA", "EXPLAIN")):
+            return
+        # executemany binds a list of parameter sets, the first one is representative for the plan
+        plan_parameters = parameters[0] if executemany and parameters else parameters
+        plan = explain_query_plan(cursor.connection, statement, plan_parameters)
+        entry = {
+            "at": int(time.time() * 1000),
+            "ms": round(elapsed_ms, 1),
+            "statement": statement,
+            "parameters": repr(parameters)[:MAX_PARAMS_CHARS],
+            "plan": plan,
+            "full_scan": is_full_scan(plan),
+        }
+        with _lock:
+            _slow_queries.append(entry)
+        scan = " FULL SCAN" if entry["full_scan"] else ""
+        logger.warning(
+            f"🐢 [slow query] {entry['ms']}ms{scan}: {' '.join(statement.split())} "
+            f"params={entry['parameters']} plan={plan}"
+        )
+
+
+def recent_slow_queries() -> list[dict]:
+    """Return the recorded slow queries, newest first."""
+    with _lock:
+        return list(reversed(_slow_queries))
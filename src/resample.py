@@ -0,0 +1,216 @@
+"""
+Fixed-interval resampling for analysis and external tools: power mean/max/min and energy deltas per bucket,
+with buckets aligned to local time. NumPy is imported on first use, not at startup.
+
+Intervals that divide an hour step in absolute time from local midnight, which keeps them on local
+boundaries across DST changes (offsets change by whole hours). Whole hours dividing a day and whole days
+step in wall-clock time, so a day bucket is 23 or 25 hours long on DST days. Buckets are computed from the
+coarsest rollup tier that divides the interval and covers the range, otherwise from the readings.
+"""
+
+import re
+from datetime import datetime
+from datetime import timedelta
+
+from src.database import HourlyRollup
+from src.database import MinuteRollup
+from src.database import get_reading_arrays
+from src.database import get_rollup_arrays
+from src.database import tier_cutoffs
+from src.helpers import local_timezone
+
+AGGREGATIONS = ("mean", "max", "min", "energy_delta")
+FILLS = ("null", "linear")
+MAX_BUCKETS = 100_000
+INTERVAL_RE = re.compile(r"^(\d+)([smhd])$")
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(value: str | None) -> int:
+    """Parse an interval like 30s, 5m, 1h or 1d into seconds; it must divide an hour, a day or be whole days."""
+    match = INTERVAL_RE.match(value or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError("interval must be a number with a unit s, m, h or d, e.g. 15m")
+    seconds = int(match.group(1)) * UNIT_SECONDS[match.group(2)]
+    if 3600 % seconds and 86400 % seconds and seconds % 86400:
+        raise ValueError("interval must divide an hour or a day, or be whole days")
+    return seconds
+
+
+def parse_aggregations(value: str | None) -> tuple[str, ...]:
+    """Parse the comma-separated `agg` parameter, keeping the order and dropping duplicates."""
+    if not value:
+        return ("mean",)
+    aggregations = tuple(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+    unknown = [agg for agg in aggregations if agg not in AGGREGATIONS]
+    if unknown or not aggregations:
+        raise ValueError(f"agg must be a comma-separated subset of {', '.join(AGGREGATIONS)}")
+    return aggregations
+
+
+def parse_fill(value: str | None) -> str:
+    if value in (None, ""):
+        return "null"
+    if value not in FILLS:
+        raise ValueError(f"fill must be one of {', '.join(FILLS)}")
+    return value
+
+
+def _local(moment: datetime) -> datetime:
+    """Naive local time of moment."""
+    if moment.tzinfo is not None:
+        return moment.astimezone(local_timezone()).replace(tzinfo=None)
+    return moment
+
+
+def _from_ms(ms) -> datetime:
+    return datetime.fromtimestamp(int(ms) / 1000, tz=local_timezone())
+
+
+def bucket_edges(start: datetime, end: datetime, interval_s: int):
+    """Return the int64 ms edges of the buckets covering [start, end), starting at or before start."""
+    import numpy as np
+
+    start, end = _local(start), _local(end)
+    start_ms, end_ms = start.timestamp() * 1000, end.timestamp() * 1000
+    first_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    if 3600 % interval_s == 0:
+        step = interval_s * 1000
+        origin = int(first_day.timestamp() * 1000)
+        first = int((start_ms - origin) // step)
+        last = -int(-(end_ms - origin) // step)  # ceil
+        return origin + step * np.arange(first, max(last, first + 1) + 1, dtype=np.int64)
+
+    # Wall-clock edges; a nonexistent local time maps onto the next real one and is dropped as a duplicate
+    days = (end.date() - first_day.date()).days + 1
+    if interval_s % 86400 == 0:
+        step_days = interval_s // 86400
+        walls = [first_day + timedelta(days=day) for day in range(0, days + step_days, step_days)]
+    else:
+        per_day = 86400 // interval_s
+        walls = [
+            first_day + timedelta(days=day, seconds=k * interval_s)
+            for day in range(days + 1)
+            for k in range(per_day)
+        ]
+    edges = np.unique(np.array([int(wall.timestamp() * 1000) for wall in walls], dtype=np.int64))
+    lo = max(int(np.searchsorted(edges, start_ms, side="right")) - 1, 0)
+    hi = min(int(np.searchsorted(edges, end_ms, side="left")), len(edges) - 1)
+    return edges[lo : max(hi, lo + 1) + 1]
+
+
+def _samples(start: datetime, end: datetime, interval_s: int) -> tuple[str, dict]:
+    """
+    Per-sample arrays for bucketing, from the coarsest source that divides the interval: t, count (readings
+    with power), power sum/min/max and the first and last energy counter value.
+    """
+    import numpy as np
+
+    minute_cutoff, _ = tier_cutoffs()
+    if interval_s % 3600 == 0:
+        model, source = HourlyRollup, "1h"
+    elif interval_s % 60 == 0 and (minute_cutoff is None or _local(start) >= minute_cutoff):
+        model, source = MinuteRollup, "1m"
+    else:
+        arrays = get_reading_arrays(start, end, ("p", "e"))
+        present = ~np.isnan(arrays["p"])
+        return "raw", {
+            "t": arrays["t"],
+            "count": present.astype(np.int64),
+            "sum": np.where(present, arrays["p"], 0.0),
+            "min": arrays["p"],
+            "max": arrays["p"],
+            "e_first": arrays["e"],
+            "e_last": arrays["e"],
+        }
+    arrays = get_rollup_arrays(model, start, end)
+    return source, {
+        "t": arrays["t"],
+        "count": arrays["count"],
+        "sum": np.nan_to_num(arrays["power_watts_sum"]),
+        "min": arrays["power_watts_min"],
+        "max": arrays["power_watts_max"],
+        "e_first": arrays["energy_in_kwh_min"],
+        "e_last": arrays["energy_in_kwh_max"],
+    }
+
+
+def _reduce(ufunc, values, starts, nonempty, buckets: int):
+    """ufunc.reduceat over the samples of each non-empty bucket; NaN for empty buckets."""
+    import numpy as np
+
+    out = np.full(buckets, np.nan)
+    if nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, starts[nonempty])
+    return out
+
+
+def _interpolate(values):
+    """Linearly fill the NaN gaps between known values; leading and trailing NaNs stay."""
+    import numpy as np
+
+    known = np.flatnonzero(~np.isnan(values))
+    if len(known) < 2:
+        return values
+    inside = np.arange(known[0], known[-1] + 1)
+    filled = values.copy()
+    filled[inside] = np.interp(inside, known, values[known])
+    return filled
+
+
+def resample(
+    start: datetime,
+    end: datetime,
+    interval_s: int,
+    aggregations: tuple[str, ...] = ("mean",),
+    fill: str = "null",
+) -> dict:
+    """
+    Resample [start, end) into fixed local-time buckets. Returns columns: "t" (bucket starts, ms) and one
+    list per aggregation (power in W, energy_delta in kWh), None for empty buckets unless fill is "linear".
+    energy_delta runs from the last counter value before the bucket, so deltas add up to the total usage;
+    after an empty bucket it includes the usage over the gap (with fill "linear", spread over the gap).
+    """
+    import numpy as np
+
+    if (_local(end) - _local(start)).total_seconds() / interval_s > MAX_BUCKETS:
+        raise ValueError(
+            f"at most {MAX_BUCKETS} buckets are allowed, use a longer interval or a shorter range"
+        )
+    edges = bucket_edges(start, end, interval_s)
+    buckets = len(edges) - 1
+    source, samples = _samples(_from_ms(edges[0]), _from_ms(edges[-1]), interval_s)
+
+    inside = (samples["t"] >= edges[0]) & (samples["t"] < edges[-1])
+    samples = {key: values[inside] for key, values in samples.items()}
+    starts = np.searchsorted(samples["t"], edges[:-1], side="left")
+    sizes = np.diff(np.append(starts, len(samples["t"])))
+    nonempty = sizes > 0
+
+    columns = {"t": edges[:-1].tolist()}
+    for agg in aggregations:
+        if agg == "mean":
+            counts = _reduce(np.add, samples["count"], starts, nonempty, buckets)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = _reduce(np.add, samples["sum"], starts, nonempty, buckets) / counts
+            values[counts == 0] = np.nan
+        elif agg == "max":
+            values = _reduce(np.fmax, samples["max"], starts, nonempty, buckets)
+        elif agg == "min":
+            values = _reduce(np.fmin, samples["min"], starts, nonempty, buckets)
+        else:
+            last = _reduce(np.fmax, samples["e_last"], starts, nonempty, buckets)
+            first = _reduce(np.fmin, samples["e_first"], starts, nonempty, buckets)
+            if fill == "linear":
+                last = _interpolate(last)
+            # The last counter value of the closest earlier bucket that has one
+            known = np.where(np.isnan(last), -1, np.arange(buckets))
+            previous = np.maximum.accumulate(np.concatenate(([-1], known[:-1])))
+            before = np.where(previous >= 0, last[np.maximum(previous, 0)], first)
+            values = last - before
+            values[np.isnan(last)] = np.nan
+        if fill == "linear" and agg != "energy_delta":
+            values = _interpolate(values)
+        columns[agg] = [None if np.isnan(v) else float(v) for v in values]
+
+    return {"interval_s": interval_s, "source": source, "fill": fill, **columns}
@@ -0,0 +1,79 @@
+"""
+Tiered retention: drop raw readings and 1-minute rollups once they are past their retention window, and
+optionally pack closed days of raw readings into compressed chunks.
+"""
+
+import logging
+import time
+from datetime import datetime
+from datetime import timedelta
+
+import typer
+
+from src.config import CHUNK_STORE_DAYS
+from src.config import COMPACTION_BATCH_ROWS
+from src.database import EnergyReading
+from src.database import MinuteRollup
+from src.database import ReadingChunk
+from src.database import delete_older_than
+from src.database import incremental_vacuum
+from src.database import pack_chunks
+from src.database import tier_cutoffs
+from src.database import vacuum
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pause between delete batches so the MQTT writer can take the write lock
+COMPACTION_PAUSE_SECONDS = 0.1
+
+
+def compact_tier(model, cutoff: datetime, batch_rows: int = COMPACTION_BATCH_ROWS) -> int:
+    """Delete rows of a tier older than cutoff, batch_rows per transaction. Returns the rows deleted."""
+    deleted = 0
+    while True:
+        batch = delete_older_than(model, cutoff, batch_rows)
+        deleted += batch
+        if batch < batch_rows:
+            return deleted
+        time.sleep(COMPACTION_PAUSE_SECONDS)
+
+
+def compact(batch_rows: int = COMPACTION_BATCH_ROWS) -> dict:
+    """
+    Compact every tier past its retention window, then return the freed pages with an incremental VACUUM.
+    Rollups are maintained as readings are written, so the coarser tier already holds the downsampled data
+    and compaction only has to delete. With CHUNK_STORE_DAYS set, closed days are packed first.
+    """
+    started = time.perf_counter()
+    minute_cutoff, raw_cutoff = tier_cutoffs()
+    stats = {"raw_deleted": 0, "minute_deleted": 0, "packed": 0, "chunks_deleted": 0}
+    if CHUNK_STORE_DAYS:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        stats["packed"] = pack_chunks(today - timedelta(days=CHUNK_STORE_DAYS))
+    if raw_cutoff is not None:
+        stats["raw_deleted"] = compact_tier(EnergyReading, raw_cutoff, batch_rows)
+        # A chunk is a whole day: only drop those ending before the cutoff (days last up to 25h)
+        stats["chunks_deleted"] = compact_tier(ReadingChunk, raw_cutoff - timedelta(hours=25), batch_rows)
+    if minute_cutoff is not None:
+        stats["minute_deleted"] = compact_tier(MinuteRollup, minute_cutoff, batch_rows)
+    stats["pages_freed"] = incremental_vacuum()
+    logger.info(
+        f"🗜️ [compact] {stats} in {time.perf_counter() - started:.1f}s ({raw_cutoff=} {minute_cutoff=})"
+    )
+    return stats
+
+
+def retention_cli(
+    full_vacuum: bool = typer.Option(
+        False, "--vacuum", help="Run a full VACUUM afterwards (needed once to enable incremental vacuum)"
+    ),
+) -> None:
+    """Compact the database according to the retention policy."""
+    compact()
+    if full_vacuum:
+        vacuum()
+
+
+if __name__ == "__main__":
+    typer.run(retention_cli)
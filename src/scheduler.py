@@ -1,16 +1,30 @@
-"""Hourly scheduler for database health checks and git backups."""
+"""Scheduler for DB health checks, git backups, retention compaction, load profile and WAL checkpoints."""
 
 import logging
 import time
 
 import schedule
 
+from src.config import WAL_CHECKPOINT_SECONDS
 from src.database import log_db_health_check
 from src.git_tool import commit_db_if_changed
+from src.jobs import JOBS_STATUS_FILE
+from src.jobs import Job
+from src.jobs import JobRunner
+from src.profile import update_profile
+from src.retention import compact
+from src.wal import run_checkpoint
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Jobs run concurrently, so the hourly jobs sharing :00 don't wait on each other; jitter spreads their I/O
+HEALTH_CHECK_JOB = Job("log_db_health_check", log_db_health_check, timeout_s=60)
+GIT_BACKUP_JOB = Job("commit_db_if_changed", commit_db_if_changed, timeout_s=900, jitter_s=120)
+COMPACTION_JOB = Job("compact", compact, timeout_s=3600, jitter_s=60)
+CHECKPOINT_JOB = Job("run_checkpoint", run_checkpoint, timeout_s=30)
+PROFILE_JOB = Job("update_profile", update_profile, timeout_s=600)
+
 
 def get_scheduled_jobs():
     """Get the scheduled jobs for logging."""
@@ -18,12 +32,22 @@ def get_scheduled_jobs():
 
 
 if __name__ == "__main__":
-    schedule.every().hour.at(":00").do(log_db_health_check)
+    runner = JobRunner(status_file=JOBS_STATUS_FILE)
+    schedule.every().hour.at(":00").do(runner.submit, HEALTH_CHECK_JOB)
     logger.info("⏰ Scheduled hourly logging of DB health check")
-    schedule.every().hour.at(":00").do(commit_db_if_changed)
+    schedule.every().hour.at(":00").do(runner.submit, GIT_BACKUP_JOB)
     logger.info("⏰ Scheduled hourly commit of DB if changed")
+    schedule.every().day.at("03:30").do(runner.submit, COMPACTION_JOB)
+    logger.info("⏰ Scheduled daily retention compaction")
+    schedule.every().day.at("00:15").do(runner.submit, PROFILE_JOB)
+    logger.info("⏰ Scheduled nightly load profile update")
+    if WAL_CHECKPOINT_SECONDS > 0:
+        schedule.every(WAL_CHECKPOINT_SECONDS).seconds.do(runner.submit, CHECKPOINT_JOB)
+        logger.info(f"⏰ Scheduled WAL checkpoints every {WAL_CHECKPOINT_SECONDS}s")
+    else:
+        logger.info("⏰ WAL checkpoints disabled, SQLite's auto-checkpoint remains")
     logger.info(f"⏰ Scheduled jobs: {get_scheduled_jobs()}")
 
     while True:
         schedule.run_pending()
-        time.sleep(30)
+        time.sleep(1)
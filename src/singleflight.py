@@ -0,0 +1,65 @@
+"""
+Single-flight coalescing: concurrent calls of a decorated function with the same arguments wait for the one
+call already in flight and share its result (or exception) instead of each querying the database. Unlike a
+cache, nothing is kept once the call returns, so results are never stale.
+"""
+
+import threading
+from functools import wraps
+
+_lock = threading.Lock()
+_in_flight: dict[tuple, "_Call"] = {}
+_counts: dict[str, dict[str, int]] = {}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+def single_flight(func):
+    """Decorator coalescing concurrent calls with equal arguments, which must be hashable as for lru_cache."""
+    name = func.__qualname__
+    counts = _counts.setdefault(name, {"calls": 0, "coalesced": 0})
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        with _lock:
+            counts["calls"] += 1
+            call = _in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _in_flight[key] = _Call()
+            else:
+                counts["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with _lock:
+                del _in_flight[key]
+            call.done.set()
+
+    return wrapper
+
+
+def single_flight_stats() -> dict:
+    """Per decorated function: calls, calls that joined one in flight, and calls in flight now."""
+    with _lock:
+        in_flight = [key[0] for key in _in_flight]
+        return {
+            name: {**counts, "in_flight": in_flight.count(name)} for name, counts in sorted(_counts.items())
+        }
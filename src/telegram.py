@@ -1,19 +1,19 @@
 import logging
 import sys
 
-import requests
-
 from src.values import TELEGRAM_API_TOKEN
 from src.values import TELEGRAM_CHAT_ID
 
 
-def report_missing_data_to_telegram(message: str) -> None:
-    """Send an error message to a Telegram chat."""
+def send_telegram_message(message: str) -> None:
+    """Send an alert message to the Telegram chat."""
 
     # if running on mac, return
     if sys.platform == "darwin":
         return
 
+    import requests  # lazy: alerts are rare, the services importing this module start on every restart
+
     # Truncate full_status if too long - keep the END since errors are usually there
     message = f"""⚠️⚡️*ENERGY MONITOR:*⚡️⚠️ {message}"""
 
@@ -25,7 +25,12 @@ def report_missing_data_to_telegram(message: str) -> None:
     }
 
     try:
-        response = requests.post(url, data=payload)
+        response = requests.post(url, data=payload, timeout=10)
         response.raise_for_status()
     except requests.RequestException as exc:
         logging.error("Failed to send message to Telegram: %s", exc)
+
+
+def report_missing_data_to_telegram(message: str) -> None:
+    """Send a missing data error message to a Telegram chat."""
+    send_telegram_message(message)
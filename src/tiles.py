@@ -0,0 +1,68 @@
+"""Multi-resolution time tiles: a fixed grid of (level, index) windows for zoom-aware fetching."""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from src.database import DEFAULT_READING_FIELDS
+from src.database import get_bucketed_readings
+from src.database import get_readings
+from src.database import get_time_extent
+from src.helpers import local_timezone
+
+TILE_POINTS = 512  # buckets per tile at every level
+RAW_INTERVAL_MS = 10_000  # nominal spacing of raw readings
+# Bucket size per level; level 0 serves raw readings
+TILE_LEVELS = (None, 60_000, 300_000, 900_000, 3_600_000, 21_600_000, 86_400_000)
+# Tiles must end before datetime's last year, with a day to spare for any local UTC offset
+MAX_TILE_END_MS = int(datetime(9999, 12, 31, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def tile_span_ms(level: int) -> int:
+    """Return the time window covered by one tile at `level`."""
+    return (TILE_LEVELS[level] or RAW_INTERVAL_MS) * TILE_POINTS
+
+
+def tile_index() -> dict:
+    """Describe the tile grid and the extent of the stored readings, for clients to plan requests."""
+    extent = get_time_extent(None, None)
+    return {
+        "tile_points": TILE_POINTS,
+        "levels": [
+            {"level": level, "bucket_ms": bucket_ms or RAW_INTERVAL_MS, "span_ms": tile_span_ms(level)}
+            for level, bucket_ms in enumerate(TILE_LEVELS)
+        ],
+        "first": extent[0] if extent else None,
+        "last": extent[1] if extent else None,
+    }
+
+
+def get_tile(level: int, index: int, fields: tuple[str, ...] = DEFAULT_READING_FIELDS) -> dict:
+    """
+    Return the readings of tile `index` at `level`: raw readings at level 0, bucket averages above.
+    A tile is complete once its window has passed; complete tiles never change except by backfills.
+    """
+    if not 0 <= level < len(TILE_LEVELS):
+        raise ValueError(f"level must be between 0 and {len(TILE_LEVELS) - 1}")
+    span_ms = tile_span_ms(level)
+    if not 0 <= index < MAX_TILE_END_MS // span_ms:
+        raise ValueError(f"index must be between 0 and {MAX_TILE_END_MS // span_ms - 1} at level {level}")
+    start_ms = index * span_ms
+    start = datetime.fromtimestamp(start_ms / 1000, tz=local_timezone())
+    end = start + timedelta(milliseconds=span_ms - 1)
+    complete = end < datetime.now(local_timezone())
+
+    if TILE_LEVELS[level] is None:
+        readings = get_readings(start=start, end=end, fields=fields)
+    else:
+        readings = get_bucketed_readings(start, end, fields=fields, bucket_ms=TILE_LEVELS[level])
+
+    return {
+        "level": level,
+        "index": index,
+        "bucket_ms": TILE_LEVELS[level] or RAW_INTERVAL_MS,
+        "start": start_ms,
+        "end": start_ms + span_ms,
+        "complete": complete,
+        "readings": readings,
+    }
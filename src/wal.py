@@ -0,0 +1,116 @@
+"""
+WAL checkpoint manager. Runs PASSIVE checkpoints on a schedule and escalates to RESTART or TRUNCATE when the
+WAL outgrows its size policy, once writes pause for wal_quiet_seconds. Checkpoints use their own connection
+with a short busy timeout, so a checkpoint blocked by readers gives up and retries later instead of holding
+back the ingest writer.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from src.config import DATABASE_URL
+from src.config import WAL_QUIET_SECONDS
+from src.config import WAL_RESTART_MB
+from src.config import WAL_TRUNCATE_MB
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+CHECKPOINT_BUSY_TIMEOUT_SECONDS = 0.1  # longest a RESTART/TRUNCATE checkpoint waits on readers
+
+database_path = Path(urlparse(DATABASE_URL).path.lstrip("/"))
+
+
+def wal_file(db_path: Path) -> Path:
+    return db_path.with_name(f"{db_path.name}-wal")
+
+
+def stats_file(db_path: Path) -> Path:
+    """Last checkpoint result, shared with the web app's /status."""
+    return db_path.with_name(f"{db_path.name}-checkpoint.json")
+
+
+def wal_size_bytes(db_path: Path = database_path) -> int:
+    try:
+        return wal_file(db_path).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def seconds_since_write(db_path: Path = database_path) -> float:
+    """Time since the WAL was last written, inf without a WAL."""
+    try:
+        return time.time() - wal_file(db_path).stat().st_mtime
+    except FileNotFoundError:
+        return float("inf")
+
+
+def checkpoint_mode(wal_bytes: int) -> str:
+    """Pick the checkpoint mode for a WAL of wal_bytes."""
+    if WAL_TRUNCATE_MB and wal_bytes >= WAL_TRUNCATE_MB * MB:
+        return "TRUNCATE"
+    if WAL_RESTART_MB and wal_bytes >= WAL_RESTART_MB * MB:
+        return "RESTART"
+    return "PASSIVE"
+
+
+def checkpoint(mode: str, db_path: Path = database_path) -> dict:
+    """
+    Run one checkpoint and return its metrics. busy is true when readers or writers prevented a
+    RESTART/TRUNCATE from completing; frames count WAL frames total and copied into the database.
+    """
+    wal_bytes_before = wal_size_bytes(db_path)
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path, timeout=CHECKPOINT_BUSY_TIMEOUT_SECONDS)
+    try:
+        busy, log_frames, checkpointed_frames = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    finally:
+        conn.close()
+    return {
+        "mode": mode,
+        "at": int(time.time() * 1000),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "busy": bool(busy),
+        "log_frames": log_frames,
+        "checkpointed_frames": checkpointed_frames,
+        "wal_bytes_before": wal_bytes_before,
+        "wal_bytes_after": wal_size_bytes(db_path),
+    }
+
+
+def run_checkpoint(db_path: Path = database_path) -> dict:
+    """
+    Checkpoint with the mode the current WAL size calls for and publish the result for /status. While
+    writes are in progress, RESTART and TRUNCATE fall back to PASSIVE, which doesn't wait on the writer.
+    """
+    mode = checkpoint_mode(wal_size_bytes(db_path))
+    if mode != "PASSIVE" and seconds_since_write(db_path) < WAL_QUIET_SECONDS:
+        logger.info(f"🧾 [wal] Writes in progress, {mode} checkpoint deferred to a quiet run")
+        mode = "PASSIVE"
+    result = checkpoint(mode, db_path)
+    tmp = stats_file(db_path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(result))
+    os.replace(tmp, stats_file(db_path))
+    level = logging.WARNING if result["busy"] else logging.INFO
+    logger.log(
+        level,
+        f"🧾 [wal] {result['mode']} checkpoint in {result['duration_ms']}ms: "
+        f"{result['checkpointed_frames']}/{result['log_frames']} frames, "
+        f"WAL {result['wal_bytes_before'] / MB:.1f} -> {result['wal_bytes_after'] / MB:.1f} MB"
+        + (" (busy, retrying next run)" if result["busy"] else ""),
+    )
+    return result
+
+
+def wal_status(db_path: Path = database_path) -> dict:
+    """Current WAL size and the metrics of the last managed checkpoint (None before the first)."""
+    try:
+        last_checkpoint = json.loads(stats_file(db_path).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        last_checkpoint = None
+    return {"wal_bytes": wal_size_bytes(db_path), "last_checkpoint": last_checkpoint}
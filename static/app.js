@@ -1,4 +1,8 @@
 (() => {
+  const { cacheClear, fetchEnergySummaryCached } = window.EnergyCache;
+  const { createTileLoader } = window.EnergyTiles;
+  const { fetchHeatmap, drawHours, drawCalendar } = window.EnergyHeatmap;
+
   const chartEl = document.getElementById("chart");
   const chartLoading = document.getElementById("chart-loading");
   const statusConn = document.getElementById("status-connection");
@@ -17,6 +21,10 @@
   const btnLastHour = document.getElementById("btn-last-hour");
   const btnLastDay = document.getElementById("btn-last-day");
   const btnRefresh = document.getElementById("btn-refresh");
+  const btnHeatmap = document.getElementById("btn-heatmap");
+  const heatmapPanel = document.getElementById("heatmap-panel");
+  const heatmapHours = document.getElementById("heatmap-hours");
+  const heatmapCalendar = document.getElementById("heatmap-calendar");
   // Trace toggle buttons
   const btnTogglePower = document.getElementById("btn-toggle-power");
   const btnToggleDaily = document.getElementById("btn-toggle-daily");
@@ -49,6 +57,12 @@
   const statWeekAvgCost = document.getElementById("stat-week-avg-cost");
   const statDayAvgEnergy = document.getElementById("stat-day-avg-energy");
   const statDayAvgCost = document.getElementById("stat-day-avg-cost");
+  const statForecastDayEnergy = document.getElementById("stat-forecast-day-energy");
+  const statForecastDayCost = document.getElementById("stat-forecast-day-cost");
+  const statForecastWeekEnergy = document.getElementById("stat-forecast-week-energy");
+  const statForecastWeekCost = document.getElementById("stat-forecast-week-cost");
+  const statForecastMonthEnergy = document.getElementById("stat-forecast-month-energy");
+  const statForecastMonthCost = document.getElementById("stat-forecast-month-cost");
 
   // All stat elements for skeleton loading
   const statElements = [
@@ -56,19 +70,19 @@
     statCurrentConsumption, statTotalCost, statMonthEnergy, statMonthCost,
     statWeekEnergy, statWeekCost, statDayEnergy, statDayCost, statAvgEnergy, statAvgCost,
     statMonthAvgEnergy, statMonthAvgCost, statWeekAvgEnergy, statWeekAvgCost,
-    statDayAvgEnergy, statDayAvgCost
+    statDayAvgEnergy, statDayAvgCost, statForecastDayEnergy, statForecastDayCost,
+    statForecastWeekEnergy, statForecastWeekCost, statForecastMonthEnergy, statForecastMonthCost
   ].filter(Boolean);
   const statusLive = document.getElementById("status-live");
 
   let u = null;
-  let xVals = [];
-  let yVals = [];
-  let eVals = [];
-  let rollingAvgVals = []; // Rolling 2-day average of power
-  let dailyEnergyData = []; // Daily energy consumption data {t, kwh, is_partial}
-  let dailyEnergyVals = []; // Interpolated daily energy values aligned with xVals
-  let movingAvgDailyData = []; // 30-day moving average daily usage {t, kwh}
-  let typicalDailyEnergyVals = []; // 30-day moving average values aligned with xVals
+  // Chart series are Float64Arrays computed by static/series-worker.js; missing values are NaN
+  let xVals = new Float64Array(0);
+  let yVals = new Float64Array(0);
+  let eVals = new Float64Array(0);
+  let rollingAvgVals = new Float64Array(0); // Time-aware EMA of power (~2-day response)
+  let dailyEnergyVals = new Float64Array(0); // Daily energy consumption aligned with xVals
+  let typicalDailyEnergyVals = new Float64Array(0); // Typical daily usage aligned with xVals
   let costPerKwh = 0.3102;
   let avgDailyEnergyUsage = null; // kWh per day from historical data
   let powerScaleMode = 'auto'; // 'auto' or 'fixed' - controls power Y-axis scaling
@@ -96,6 +110,15 @@
   let lastDataTimestamp = null;
   let isLiveView = true;
 
+  // Tiles: the overview holds the full range at a coarse level; zoomed views splice finer tiles into it
+  const REFINE_DEBOUNCE_MS = 200;
+  const tileLoader = createTileLoader();
+  let overview = { x: new Float64Array(0), y: new Float64Array(0), e: new Float64Array(0) };
+  let overviewLevel = null;
+  let viewKey = null; // level and tile range of the detail spliced into the chart, null for the overview
+  let refineGeneration = 0;
+  let refineTimer = null;
+
   // --------------------------------------------------------------------------
   // Loading State Helpers
   // --------------------------------------------------------------------------
@@ -292,6 +315,11 @@
             updateHover(idx);
           },
         ],
+        setScale: [
+          (uInst, key) => {
+            if (key === "x") scheduleRefine();
+          },
+        ],
       },
     };
     // Data order: x, power, daily, avgPower, meterReading, typicalDaily
@@ -381,110 +409,57 @@
     updateLiveIndicator();
   }
 
-  /**
-   * Calculate Exponential Moving Average (EMA) of power values.
-   * EMA gives more weight to recent values while smoothing out noise.
-   * The smoothing factor is chosen to approximate a 2-day response time.
-   */
-  function calculateRollingAvg() {
-    if (xVals.length === 0 || yVals.length === 0) {
-      rollingAvgVals = [];
-      return;
-    }
-    
-    // Smoothing factor: lower = smoother (more history), higher = more responsive
-    // alpha ≈ 2/(N+1) where N is the equivalent window size
-    // With 10-second sampling: 2 days = 17,280 points
-    // For 2-day equivalent: alpha ≈ 2/(17280+1) ≈ 0.000116
-    // Using 0.0001 for clean 2-day smoothing
-    const alpha = 0.0001;
-    
-    rollingAvgVals = new Array(xVals.length).fill(null);
-    
-    // Initialize with first valid value
-    let ema = null;
-    for (let i = 0; i < xVals.length; i++) {
-      if (yVals[i] != null && Number.isFinite(yVals[i])) {
-        if (ema === null) {
-          // Initialize EMA with first valid value
-          ema = yVals[i];
-        } else {
-          // EMA formula: EMA_t = alpha * value_t + (1 - alpha) * EMA_{t-1}
-          ema = alpha * yVals[i] + (1 - alpha) * ema;
-        }
-        rollingAvgVals[i] = ema;
-      } else if (ema !== null) {
-        // If current value is null but we have an EMA, keep the last EMA
-        rollingAvgVals[i] = ema;
+  // --------------------------------------------------------------------------
+  // Series Worker
+  // --------------------------------------------------------------------------
+  const seriesWorker = new Worker(document.currentScript?.dataset.seriesWorker || "/static/series-worker.js");
+  const pendingSeries = []; // resolvers, in message order (the worker replies once per message)
+  // Copies of the worker's columns, patched with the rows it changed; the chart series are views on them
+  const seriesCols = {
+    x: new Float64Array(0),
+    y: new Float64Array(0),
+    e: new Float64Array(0),
+    ema: new Float64Array(0),
+    daily: new Float64Array(0),
+    typical: new Float64Array(0),
+  };
+  let seriesLength = 0;
+
+  function applySeriesUpdate(data) {
+    if (data.length > seriesCols.x.length) {
+      let capacity = Math.max(seriesCols.x.length, 1 << 16);
+      while (capacity < data.length) capacity *= 2;
+      for (const key of Object.keys(seriesCols)) {
+        const grown = new Float64Array(capacity);
+        grown.set(seriesCols[key].subarray(0, Math.min(seriesLength, data.from)));
+        seriesCols[key] = grown;
       }
     }
-  }
-
-  /**
-   * Interpolate daily energy consumption values to align with xVals timestamps.
-   * Each point gets the daily kWh value for its corresponding day.
-   */
-  function calculateDailyEnergyVals() {
-    if (!dailyEnergyData.length || !xVals.length) {
-      dailyEnergyVals = new Array(xVals.length).fill(null);
-      return;
-    }
-
-    // Build a map of date -> daily kWh
-    const dailyMap = new Map();
-    for (const d of dailyEnergyData) {
-      const date = new Date(d.t);
-      const dateKey = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()}`;
-      dailyMap.set(dateKey, d.kwh);
+    for (const key of Object.keys(seriesCols)) {
+      if (data[key]) seriesCols[key].set(data[key], data.from);
     }
-
-    // Map each xVal timestamp to its day's kWh value
-    dailyEnergyVals = xVals.map(secTs => {
-      const date = new Date(secTs * 1000);
-      const dateKey = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()}`;
-      return dailyMap.get(dateKey) ?? null;
-    });
+    seriesLength = data.length;
+    xVals = seriesCols.x.subarray(0, seriesLength);
+    yVals = seriesCols.y.subarray(0, seriesLength);
+    eVals = seriesCols.e.subarray(0, seriesLength);
+    rollingAvgVals = seriesCols.ema.subarray(0, seriesLength);
+    dailyEnergyVals = seriesCols.daily.subarray(0, seriesLength);
+    typicalDailyEnergyVals = seriesCols.typical.subarray(0, seriesLength);
   }
 
+  seriesWorker.onmessage = ({ data }) => {
+    applySeriesUpdate(data);
+    pendingSeries.shift()?.(data);
+  };
+
   /**
-   * Calculate typical daily energy values aligned with xVals.
-   * Uses either 30-day moving average or flat total average based on avgMode.
+   * Send a message to the series worker and resolve with its reply once the series are updated.
    */
-  function calculateTypicalDailyEnergyVals() {
-    if (!xVals.length) {
-      typicalDailyEnergyVals = new Array(xVals.length).fill(null);
-      return;
-    }
-
-    if (avgMode === '30d') {
-      // Use 30-day moving average
-      if (!movingAvgDailyData.length) {
-        typicalDailyEnergyVals = new Array(xVals.length).fill(null);
-        return;
-      }
-
-      // Build a map of date -> moving average kWh
-      const movingAvgMap = new Map();
-      for (const d of movingAvgDailyData) {
-        const date = new Date(d.t);
-        const dateKey = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()}`;
-        movingAvgMap.set(dateKey, d.kwh);
-      }
-
-      // Map each xVal timestamp to its day's moving average value
-      typicalDailyEnergyVals = xVals.map(secTs => {
-        const date = new Date(secTs * 1000);
-        const dateKey = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()}`;
-        return movingAvgMap.get(dateKey) ?? null;
-      });
-    } else {
-      // Use flat total average
-      if (!avgDailyEnergyUsage) {
-        typicalDailyEnergyVals = new Array(xVals.length).fill(null);
-        return;
-      }
-      typicalDailyEnergyVals = new Array(xVals.length).fill(avgDailyEnergyUsage);
-    }
+  function computeSeries(message, transfer = []) {
+    return new Promise((resolve) => {
+      pendingSeries.push(resolve);
+      seriesWorker.postMessage(message, transfer);
+    });
   }
 
   /**
@@ -492,18 +467,15 @@
    */
   async function fetchEnergySummary() {
     try {
-      const res = await fetch("/api/energy_summary", { cache: "no-cache" });
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
-      const data = await res.json();
+      const data = await fetchEnergySummaryCached();
       avgDailyEnergyUsage = data.avg_daily;
-      dailyEnergyData = data.daily;
-      movingAvgDailyData = data.moving_avg_30d || [];
-      console.log(`Loaded energy summary: avg=${avgDailyEnergyUsage} kWh/day, ${dailyEnergyData.length} days, ${movingAvgDailyData.length} moving avg points`);
+      const movingAvg = data.moving_avg_30d || [];
+      await computeSeries({ type: "summary", daily: data.daily, movingAvg, avgDaily: avgDailyEnergyUsage });
+      console.log(`Loaded energy summary: avg=${avgDailyEnergyUsage} kWh/day, ${data.daily.length} days, ${movingAvg.length} moving avg points`);
+      if (xVals.length) updateChart();
     } catch (e) {
       console.error("Failed to fetch energy summary:", e);
       avgDailyEnergyUsage = null;
-      dailyEnergyData = [];
-      movingAvgDailyData = [];
     }
   }
 
@@ -518,15 +490,7 @@
     const curMin = curX && Number.isFinite(curX.min) ? curX.min : null;
     const curMax = curX && Number.isFinite(curX.max) ? curX.max : null;
     
-    // Calculate rolling average
-    calculateRollingAvg();
-    
-    // Calculate daily energy values aligned with chart timestamps
-    calculateDailyEnergyVals();
-    
-    // Calculate typical daily energy values
-    calculateTypicalDailyEnergyVals();
-    
+    // Derived series were already computed by the series worker
     u.setData([xVals, yVals, dailyEnergyVals, rollingAvgVals, eVals, typicalDailyEnergyVals]);
     
     if (curMin !== null && curMax !== null && curMax > curMin && xVals.length > 0) {
@@ -568,21 +532,188 @@
     updateLiveIndicator();
   }
 
+  /**
+   * Convert API rows ({t, p, e}) into typed x (sec), power and energy arrays, dropping invalid points.
+   */
+  function rowsToArrays(rows) {
+    // Map primary series from power if present
+    let mapped = rows.map((r) => [r.t, r.p]);
+
+    // If all power values are null/undefined, derive power from cumulative energy deltas
+    if (mapped.length && mapped.every((pt) => pt[1] === null || pt[1] === undefined)) {
+      const derived = [];
+      for (let i = 1; i < rows.length; i++) {
+        const a = rows[i - 1];
+        const b = rows[i];
+        if (a && b && a.e != null && b.e != null &&
+            typeof a.t === "number" && typeof b.t === "number" && b.t > a.t) {
+          const dE_kWh = b.e - a.e;
+          const dt_ms = b.t - a.t;
+          if (dt_ms > 0) {
+            const watts = Math.max(0, (dE_kWh * 3600000000) / dt_ms);
+            derived.push([b.t, watts]);
+          }
+        }
+      }
+      if (derived.length) {
+        mapped = derived;
+      }
+    }
+
+    // Filter out invalid power and energy values into typed arrays for the worker
+    const newXVals = new Float64Array(mapped.length);
+    const newYVals = new Float64Array(mapped.length);
+    const newEVals = new Float64Array(mapped.length);
+    let n = 0;
+
+    for (let i = 0; i < mapped.length; i++) {
+      const energyVal = rows[i].e;
+      if (mapped[i][1] != null && Number.isFinite(mapped[i][1]) && 
+          energyVal != null && Number.isFinite(energyVal) && energyVal > 0) {
+        newXVals[n] = Math.floor(mapped[i][0] / 1000);
+        newYVals[n] = mapped[i][1];
+        newEVals[n] = energyVal;
+        n++;
+      }
+    }
+    return { x: newXVals.slice(0, n), y: newYVals.slice(0, n), e: newEVals.slice(0, n) };
+  }
+
+  /**
+   * Append points newer than the overview's last one, so zooming out keeps data that arrived by polling.
+   */
+  function appendToOverview(x, y, e) {
+    const last = overview.x.length ? overview.x[overview.x.length - 1] : -Infinity;
+    let from = 0;
+    while (from < x.length && x[from] <= last) from++;
+    if (from === x.length) return;
+    const grow = (a, b) => {
+      const out = new Float64Array(a.length + b.length - from);
+      out.set(a);
+      out.set(b.subarray(from), a.length);
+      return out;
+    };
+    overview = { x: grow(overview.x, x), y: grow(overview.y, y), e: grow(overview.e, e) };
+  }
+
+  /**
+   * Replace the chart series with { x, y, e } (copied, the worker takes ownership of what it receives).
+   */
+  async function showSeries({ x, y, e }) {
+    const copy = { type: "reset", x: x.slice(), y: y.slice(), e: e.slice() };
+    await computeSeries(copy, [copy.x.buffer, copy.y.buffer, copy.e.buffer]);
+    if (xVals.length > 0) {
+      lastDataTimestamp = xVals[xVals.length - 1] * 1000;
+    }
+    updateChart();
+  }
+
+  /**
+   * Load the whole history at the level that fills the chart width and show it.
+   */
+  async function loadOverview() {
+    try {
+      const index = await tileLoader.loadIndex();
+      if (index.first === null) {
+        setConnection(true);
+        return;
+      }
+      const widthPx = u ? u.width : getChartSize().width;
+      overviewLevel = tileLoader.chooseLevel(index.last - index.first, widthPx);
+      const { rows } = await tileLoader.loadRange(index.first, index.last, overviewLevel);
+      overview = rowsToArrays(rows);
+      viewKey = null;
+      refineGeneration++;
+      await showSeries(overview);
+      setConnection(true);
+    } catch (e) {
+      console.error(e);
+      setConnection(false);
+    }
+  }
+
+  function scheduleRefine() {
+    clearTimeout(refineTimer);
+    refineTimer = setTimeout(() => {
+      const x = u && u.scales.x;
+      if (x && Number.isFinite(x.min) && Number.isFinite(x.max)) refineView(x.min * 1000, x.max * 1000);
+    }, REFINE_DEBOUNCE_MS);
+  }
+
+  /**
+   * Show [startMs, endMs] at the resolution the chart can display: tiles finer than the overview are
+   * loaded for the visible range and spliced into the overview, zooming back out restores the overview.
+   */
+  async function refineView(startMs, endMs) {
+    if (overviewLevel === null || endMs <= startMs) return;
+    const level = tileLoader.chooseLevel(endMs - startMs, u.width);
+    const generation = ++refineGeneration;
+    if (level >= overviewLevel) {
+      if (viewKey !== null) {
+        viewKey = null;
+        await showSeries(overview);
+      }
+      return;
+    }
+    const key = `${level}:${tileLoader.tileRange(startMs, endMs, level).join("-")}`;
+    if (key === viewKey) return;
+    try {
+      const detail = await tileLoader.loadRange(startMs, endMs, level);
+      if (generation !== refineGeneration) return; // the view moved on while tiles were loading
+      const inner = rowsToArrays(detail.rows);
+      const startSec = detail.start / 1000;
+      const endSec = detail.end / 1000;
+      let i0 = 0;
+      while (i0 < overview.x.length && overview.x[i0] < startSec) i0++;
+      let i1 = i0;
+      while (i1 < overview.x.length && overview.x[i1] < endSec) i1++;
+      const splice = (outer, mid) => {
+        const out = new Float64Array(i0 + mid.length + outer.length - i1);
+        out.set(outer.subarray(0, i0));
+        out.set(mid, i0);
+        out.set(outer.subarray(i1), i0 + mid.length);
+        return out;
+      };
+      viewKey = key;
+      await showSeries({
+        x: splice(overview.x, inner.x),
+        y: splice(overview.y, inner.y),
+        e: splice(overview.e, inner.e),
+      });
+    } catch (e) {
+      console.error("Failed to load detail tiles:", e);
+    }
+  }
+
+  // Readings newer than `after`, following the `next` cursor page by page (e.g. after the laptop slept)
+  async function fetchReadingsAfter(after) {
+    const rows = [];
+    let cursor = after;
+    while (cursor !== null) {
+      const res = await fetch(`/api/readings?after=${cursor}`, { cache: "no-cache" });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const page = await res.json();
+      rows.push(...page.readings);
+      cursor = page.next;
+    }
+    return rows;
+  }
+
   async function fetchReadings({ start = null, end = null, incremental = false } = {}) {
     const qs = new URLSearchParams();
-    
-    // For incremental updates, only fetch data newer than what we have
-    if (incremental && lastDataTimestamp) {
-      qs.set("start", String(lastDataTimestamp + 1));
-    } else if (start) {
-      qs.set("start", String(start));
-    }
+    if (start) qs.set("start", String(start));
     if (end) qs.set("end", String(end));
     
     try {
-      const res = await fetch(`/api/readings?${qs.toString()}`, { cache: "no-cache" });
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
-      const rows = await res.json();
+      let rows;
+      if (incremental && lastDataTimestamp) {
+        // For incremental updates, only fetch data newer than what we have
+        rows = await fetchReadingsAfter(lastDataTimestamp);
+      } else {
+        const res = await fetch(`/api/readings?${qs.toString()}`, { cache: "no-cache" });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        rows = await res.json();
+      }
       
       // No new data
       if (!rows.length) {
@@ -590,72 +721,23 @@
         return;
       }
       
-      // Map primary series from power if present
-      let mapped = rows.map((r) => [r.t, r.p]);
-      
-      // If all power values are null/undefined, derive power from cumulative energy deltas
-      if (mapped.length && mapped.every((pt) => pt[1] === null || pt[1] === undefined)) {
-        const derived = [];
-        for (let i = 1; i < rows.length; i++) {
-          const a = rows[i - 1];
-          const b = rows[i];
-          if (a && b && a.e != null && b.e != null &&
-              typeof a.t === "number" && typeof b.t === "number" && b.t > a.t) {
-            const dE_kWh = b.e - a.e;
-            const dt_ms = b.t - a.t;
-            if (dt_ms > 0) {
-              const watts = Math.max(0, (dE_kWh * 3600000000) / dt_ms);
-              derived.push([b.t, watts]);
-            }
-          }
-        }
-        if (derived.length) {
-          mapped = derived;
-        }
-      }
-      
-      // Filter out invalid power and energy values
-      const newXVals = [];
-      const newYVals = [];
-      const newEVals = [];
-      
-      for (let i = 0; i < mapped.length; i++) {
-        const energyVal = rows[i].e;
-        if (mapped[i][1] != null && Number.isFinite(mapped[i][1]) && 
-            energyVal != null && Number.isFinite(energyVal) && energyVal > 0) {
-          newXVals.push(Math.floor(mapped[i][0] / 1000));
-          newYVals.push(mapped[i][1]);
-          newEVals.push(energyVal);
-        }
+      // Full replacement on initial load or explicit refresh, otherwise the worker appends only
+      // points newer than the ones it has and updates the derived series for those alone
+      const { x, y, e } = rowsToArrays(rows);
+      const type = incremental && xVals.length > 0 ? "append" : "reset";
+      if (type === "append") {
+        appendToOverview(x, y, e);
+      } else {
+        overview = { x: x.slice(), y: y.slice(), e: e.slice() };
       }
-      
-      if (incremental && xVals.length > 0) {
-        // Append only new data points (avoid duplicates)
-        const lastExistingTime = xVals[xVals.length - 1];
-        let appendIndex = 0;
-        for (let i = 0; i < newXVals.length; i++) {
-          if (newXVals[i] > lastExistingTime) {
-            appendIndex = i;
-            break;
-          }
-          appendIndex = newXVals.length; // No new points
-        }
-        
-        if (appendIndex < newXVals.length) {
-          // Append new data
-          xVals = xVals.concat(newXVals.slice(appendIndex));
-          yVals = yVals.concat(newYVals.slice(appendIndex));
-          eVals = eVals.concat(newEVals.slice(appendIndex));
-          
-          // Flash the connection indicator to show new data arrived
-          flashLiveIndicator();
+      const { appended } = await computeSeries({ type, x, y, e }, [x.buffer, y.buffer, e.buffer]);
+      if (type === "append") {
+        if (!appended) {
+          setConnection(true);
+          return;
         }
-      } else {
-        // Full replacement (initial load or explicit refresh)
-        // No downsampling - use all data points
-        xVals = newXVals;
-        yVals = newYVals;
-        eVals = newEVals;
+        // Flash the connection indicator to show new data arrived
+        flashLiveIndicator();
       }
       
       // Update last timestamp
@@ -765,7 +847,7 @@
 
     if (hoverDailyEnergy) {
       const dailyKwh = dailyEnergyVals[idx];
-      hoverDailyEnergy.textContent = dailyKwh != null ? fmt.n(dailyKwh, 2) : "–";
+      hoverDailyEnergy.textContent = Number.isFinite(dailyKwh) ? fmt.n(dailyKwh, 2) : "–";
     }
 
     if (hoverRollingAvg) {
@@ -774,7 +856,7 @@
 
     if (hoverTypicalDailyEnergy) {
       const typicalDailyKwh = typicalDailyEnergyVals[idx];
-      hoverTypicalDailyEnergy.textContent = typicalDailyKwh != null ? fmt.n(typicalDailyKwh, 2) : "–";
+      hoverTypicalDailyEnergy.textContent = Number.isFinite(typicalDailyKwh) ? fmt.n(typicalDailyKwh, 2) : "–";
     }
   }
 
@@ -1030,15 +1112,16 @@
         u.series[6].label = avgMode === '30d' ? "30d Avg Daily Usage" : "Total Avg Daily Usage";
       }
       
-      // Recalculate and update the chart
-      calculateTypicalDailyEnergyVals();
-      if (u && xVals.length > 0) {
-        u.setData([xVals, yVals, dailyEnergyVals, rollingAvgVals, eVals, typicalDailyEnergyVals]);
-        // Preserve current view
-        if (selection.start && selection.end) {
-          u.setScale("x", { min: selection.start / 1000, max: selection.end / 1000 });
+      // Recalculate in the worker and update the chart
+      computeSeries({ type: "mode", avgMode }).then(() => {
+        if (u && xVals.length > 0) {
+          u.setData([xVals, yVals, dailyEnergyVals, rollingAvgVals, eVals, typicalDailyEnergyVals]);
+          // Preserve current view
+          if (selection.start && selection.end) {
+            u.setScale("x", { min: selection.start / 1000, max: selection.end / 1000 });
+          }
         }
-      }
+      });
     });
   }
 
@@ -1086,9 +1169,10 @@
       btnRefresh.textContent = "Refreshing...";
       btnRefresh.classList.add("btn-loading");
       try {
-        // Clear Python cache first, then refresh data
-        await fetch("/api/clear_cache", { cache: "no-cache" }).catch(() => {});
-        await fetchReadings();
+        // The server's caches follow the database on their own; only the browser's need clearing
+        tileLoader.clear();
+        await cacheClear();
+        await loadOverview();
         await fetchEnergySummary();
       } finally {
         btnRefresh.disabled = false;
@@ -1127,6 +1211,42 @@
     selectCalendarRange(start.getTime(), now.getTime());
   });
 
+  // --------------------------------------------------------------------------
+  // Heatmap: fetched when opened, as it isn't needed for the first render
+  // --------------------------------------------------------------------------
+  let heatmapData = null;
+  let heatmapMetric = "energy";
+
+  function drawHeatmap() {
+    if (!heatmapData || heatmapPanel.classList.contains("hidden")) return;
+    drawHours(heatmapHours, heatmapData);
+    drawCalendar(heatmapCalendar, heatmapData);
+  }
+
+  async function loadHeatmap() {
+    try {
+      heatmapData = await fetchHeatmap(heatmapMetric);
+      drawHeatmap();
+    } catch (e) {
+      console.error("Failed to load heatmap:", e);
+    }
+  }
+
+  if (btnHeatmap && heatmapPanel) {
+    btnHeatmap.addEventListener("click", () => {
+      const open = heatmapPanel.classList.toggle("hidden") === false;
+      btnHeatmap.classList.toggle("active", open);
+      if (open) loadHeatmap();
+    });
+    heatmapPanel.querySelectorAll("[data-metric]").forEach((btn) => {
+      btn.addEventListener("click", () => {
+        heatmapPanel.querySelectorAll("[data-metric]").forEach((b) => b.classList.toggle("active", b === btn));
+        heatmapMetric = btn.dataset.metric;
+        loadHeatmap();
+      });
+    });
+  }
+
   async function poll() {
     // Use incremental update for polling (only fetch new data)
     await fetchReadings({ incremental: true });
@@ -1138,6 +1258,7 @@
       const { width, height } = getChartSize();
       u.setSize({ width, height });
     }
+    drawHeatmap();
   });
 
   // --------------------------------------------------------------------------
@@ -1179,6 +1300,10 @@
         e.preventDefault();
         btnLastYear?.click();
         break;
+      case "h":
+        e.preventDefault();
+        btnHeatmap?.click();
+        break;
     }
   });
 
@@ -1191,14 +1316,14 @@
   // Load chart data and summary in parallel for faster initial render
   // Use allSettled to ensure updatePeriodSummaries runs even if one fetch fails
   Promise.allSettled([
-    fetchReadings(),      // Chart data
+    loadOverview(),       // Chart data at overview resolution
     fetchEnergySummary()  // Daily averages for "Typical" column
   ])
     .then((results) => {
       // Log any failures for debugging
       const [readingsResult, summaryResult] = results;
       if (readingsResult.status === "rejected") {
-        console.error("fetchReadings failed:", readingsResult.reason);
+        console.error("loadOverview failed:", readingsResult.reason);
       }
       if (summaryResult.status === "rejected") {
         console.error("fetchEnergySummary failed:", summaryResult.reason);
@@ -1255,10 +1380,11 @@
       fetchStats(last7DaysMs, nowMs),
       fetchStats(last1DayMs, nowMs),
       fetchLatestReading(),
+      fetchProfile(),
     ]);
 
-    const [monthResult, weekResult, dayResult, latestResult] = results;
-    const apiNames = ["30-day stats", "7-day stats", "1-day stats", "latest reading"];
+    const [monthResult, weekResult, dayResult, latestResult, profileResult] = results;
+    const apiNames = ["30-day stats", "7-day stats", "1-day stats", "latest reading", "load profile"];
 
     // Log any failures with context
     results.forEach((result, idx) => {
@@ -1272,6 +1398,7 @@
     const weekStats = weekResult.status === "fulfilled" ? weekResult.value : null;
     const dayStats = dayResult.status === "fulfilled" ? dayResult.value : null;
     const latestReading = latestResult.status === "fulfilled" ? latestResult.value : null;
+    const profile = profileResult.status === "fulfilled" ? profileResult.value : null;
 
     // Populate "Real" values from successful API calls
     if (monthStats) {
@@ -1291,11 +1418,13 @@
       if (statTotalCost) statTotalCost.textContent = fmt.n((latestReading.energy_in_kwh || 0) * costPerKwh, 2);
     }
 
-    // Populate "Typical" values (depends on avgDailyEnergyUsage from fetchEnergySummary)
-    if (avgDailyEnergyUsage) {
-      const avg30Days = avgDailyEnergyUsage * 30;
-      const avg7Days = avgDailyEnergyUsage * 7;
-      const avg1Day = avgDailyEnergyUsage;
+    // Populate "Typical" values: what the load profile expects for these weekdays and times of day,
+    // else the flat average daily usage from fetchEnergySummary
+    const trailing = profile?.trailing;
+    if (trailing || avgDailyEnergyUsage) {
+      const avg30Days = trailing ? trailing.month : avgDailyEnergyUsage * 30;
+      const avg7Days = trailing ? trailing.week : avgDailyEnergyUsage * 7;
+      const avg1Day = trailing ? trailing.day : avgDailyEnergyUsage;
 
       if (statMonthAvgEnergy) statMonthAvgEnergy.textContent = fmt.n(avg30Days, 2);
       if (statMonthAvgCost) statMonthAvgCost.textContent = fmt.n(avg30Days * costPerKwh, 2);
@@ -1311,6 +1440,24 @@
       if (statDayAvgEnergy) statDayAvgEnergy.textContent = "–";
       if (statDayAvgCost) statDayAvgCost.textContent = "–";
     }
+
+    // Projected consumption of the current day, week and month
+    const forecastStats = [
+      ["day", statForecastDayEnergy, statForecastDayCost],
+      ["week", statForecastWeekEnergy, statForecastWeekCost],
+      ["month", statForecastMonthEnergy, statForecastMonthCost],
+    ];
+    for (const [period, energyEl, costEl] of forecastStats) {
+      const projected = profile?.forecast?.[period]?.projected_kwh;
+      if (energyEl) energyEl.textContent = fmt.n(projected, 2);
+      if (costEl) costEl.textContent = fmt.n(projected != null ? projected * costPerKwh : null, 2);
+    }
+  }
+
+  async function fetchProfile() {
+    const res = await fetch("/api/profile", { cache: "no-cache" });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    return res.json();
   }
 
   async function fetchLatestReading() {
@@ -0,0 +1,158 @@
+/**
+ * Energy Monitor - Persistent Cache
+ * Keeps complete tiles and closed days of the energy summary in IndexedDB across page loads.
+ * Cached tiles are revalidated with their ETag, so an unchanged tile costs a 304 instead of its
+ * readings, and the energy summary is only downloaded from the newest cached day on. Tiles are
+ * evicted least recently used first beyond a count, and once unused for a while.
+ * Without IndexedDB (e.g. some private browsing modes) everything is fetched as before.
+ */
+
+const CACHE_DB_NAME = "energy-monitor";
+const CACHE_DB_VERSION = 2; // bump to drop all cached data after a format change
+const CACHE_STORES = ["tiles", "days"];
+// Stores whose entries carry a storedAt time (set on store, refreshed on use) and are evicted by it
+const CACHE_EVICTED_STORES = ["tiles"];
+const CACHE_MAX_ENTRIES = 2000; // ~1M readings at 512 points per tile
+const CACHE_MAX_AGE_MS = 90 * 86400 * 1000;
+const CACHE_TOUCH_MS = 3600 * 1000; // refresh storedAt on use at most this often
+const SUMMARY_KWH_TOLERANCE = 0.001;
+
+let cacheDbPromise = null;
+
+function openCacheDb() {
+  if (!cacheDbPromise) {
+    cacheDbPromise = new Promise((resolve) => {
+      if (!window.indexedDB) {
+        resolve(null);
+        return;
+      }
+      const req = indexedDB.open(CACHE_DB_NAME, CACHE_DB_VERSION);
+      req.onupgradeneeded = () => {
+        const db = req.result;
+        for (const name of [...db.objectStoreNames]) db.deleteObjectStore(name);
+        for (const name of CACHE_STORES) {
+          const store = db.createObjectStore(name);
+          if (CACHE_EVICTED_STORES.includes(name)) store.createIndex("storedAt", "storedAt");
+        }
+      };
+      req.onsuccess = () => resolve(req.result);
+      req.onerror = () => resolve(null);
+    });
+  }
+  return cacheDbPromise;
+}
+
+/**
+ * Run one request against an object store. Resolves with its result, or undefined without a cache.
+ */
+async function cacheRequest(store, mode, makeRequest) {
+  const db = await openCacheDb();
+  if (!db) return undefined;
+  return new Promise((resolve) => {
+    const tx = db.transaction(store, mode);
+    const req = makeRequest(tx.objectStore(store));
+    tx.oncomplete = () => resolve(req.result);
+    tx.onerror = () => resolve(undefined);
+    tx.onabort = () => resolve(undefined);
+  });
+}
+
+const cacheGet = (store, key) => cacheRequest(store, "readonly", (s) => s.get(key));
+const cacheGetAll = (store) => cacheRequest(store, "readonly", (s) => s.getAll());
+const cachePut = (store, key, value) => cacheRequest(store, "readwrite", (s) => s.put(value, key));
+
+async function cacheClear(stores = CACHE_STORES) {
+  for (const store of stores) await cacheRequest(store, "readwrite", (s) => s.clear());
+}
+
+/**
+ * Delete the entries of an evicted store not used for CACHE_MAX_AGE_MS, then the least recently
+ * used ones beyond CACHE_MAX_ENTRIES, walking its storedAt index oldest first.
+ */
+async function cachePrune(store) {
+  const db = await openCacheDb();
+  if (!db) return;
+  return new Promise((resolve) => {
+    const tx = db.transaction(store, "readwrite");
+    const index = tx.objectStore(store).index("storedAt");
+    const expired = Date.now() - CACHE_MAX_AGE_MS;
+    index.count().onsuccess = ({ target }) => {
+      let excess = target.result - CACHE_MAX_ENTRIES;
+      index.openCursor().onsuccess = ({ target }) => {
+        const cursor = target.result;
+        if (!cursor || (excess <= 0 && cursor.key >= expired)) return;
+        cursor.delete();
+        excess--;
+        cursor.continue();
+      };
+    };
+    tx.oncomplete = tx.onerror = tx.onabort = () => resolve();
+  });
+}
+
+/**
+ * GET url as JSON, revalidating the copy cached under key by its ETag. Responses are stored when
+ * keep(body) is true.
+ */
+async function fetchRevalidated(url, store, key, keep = () => true) {
+  const cached = await cacheGet(store, key);
+  const headers = cached ? { "If-None-Match": cached.etag } : {};
+  const res = await fetch(url, { headers });
+  const evicted = CACHE_EVICTED_STORES.includes(store);
+  if (res.status === 304 && cached) {
+    if (evicted && !(Date.now() - cached.storedAt < CACHE_TOUCH_MS)) {
+      cachePut(store, key, { ...cached, storedAt: Date.now() });
+    }
+    return cached.body;
+  }
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const body = await res.json();
+  const etag = res.headers.get("ETag");
+  if (etag && keep(body)) {
+    if (evicted) {
+      cachePut(store, key, { etag, body, storedAt: Date.now() }).then(() => cachePrune(store));
+    } else {
+      cachePut(store, key, { etag, body });
+    }
+  }
+  return body;
+}
+
+/**
+ * Fetch /api/energy_summary in the same shape, downloading only days from the newest cached one on.
+ * Days before it are closed; if the server's total over them differs from the cached days (history
+ * was backfilled or corrected), the cache is dropped and the full summary fetched.
+ */
+async function fetchEnergySummaryCached() {
+  const cached = (await cacheGetAll("days")) || [];
+  const since = cached.length ? cached[cached.length - 1].t : null;
+  const url = since === null ? "/api/energy_summary" : `/api/energy_summary?since=${since}`;
+  const res = await fetch(url, { cache: "no-cache" });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const data = await res.json();
+
+  let days = cached.filter((d) => d.t < since);
+  const cachedKwh = days.reduce((sum, d) => sum + d.kwh, 0);
+  if (since !== null && Math.abs(cachedKwh - data.before_kwh) > SUMMARY_KWH_TOLERANCE) {
+    await cacheClear(["days"]);
+    return fetchEnergySummaryCached();
+  }
+
+  const movingAvg = new Map((data.moving_avg_30d || []).map((d) => [d.t, d.kwh]));
+  const fresh = (data.daily || []).map((d) => ({ ...d, movingAvg: movingAvg.get(d.t) ?? null }));
+  for (const day of fresh) cachePut("days", day.t, day);
+  days = days.concat(fresh);
+
+  return {
+    avg_daily: data.avg_daily,
+    daily: days.map(({ t, kwh, is_partial }) => ({ t, kwh, is_partial })),
+    moving_avg_30d: days.filter((d) => d.movingAvg !== null).map((d) => ({ t: d.t, kwh: d.movingAvg })),
+  };
+}
+
+// Export to window for use by other scripts
+window.EnergyCache = {
+  cacheClear,
+  fetchRevalidated,
+  fetchEnergySummaryCached,
+};
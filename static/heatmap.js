@@ -0,0 +1,123 @@
+/**
+ * Energy Monitor - Heatmap
+ * A year of consumption from /api/heatmap, drawn on canvases: a day x hour-of-day heatmap (days left to
+ * right, midnight at the top) and a month x day-of-month calendar of daily totals.
+ */
+
+const HEATMAP_COLOR = [235, 133, 37]; // --color-energy
+const HEATMAP_SCALE_PERCENTILE = 0.99; // colour scale tops out here, so a few spikes don't wash out the rest
+
+async function fetchHeatmap(metric = "energy") {
+  const res = await fetch(`/api/heatmap?metric=${encodeURIComponent(metric)}`);
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  return res.json();
+}
+
+function dayDate(heatmap, day) {
+  const date = new Date(heatmap.start);
+  date.setDate(date.getDate() + day); // calendar days, so DST changes don't shift the date
+  return date;
+}
+
+/**
+ * One value per day: the total kWh, the mean of the hourly mean power or the max power.
+ */
+function dailyValues(heatmap) {
+  const daily = [];
+  for (let day = 0; day < heatmap.days; day++) {
+    const hours = heatmap.values.slice(day * heatmap.hours, (day + 1) * heatmap.hours).filter((v) => v !== null);
+    if (!hours.length) {
+      daily.push(null);
+    } else if (heatmap.metric === "energy") {
+      daily.push(hours.reduce((sum, v) => sum + v, 0));
+    } else if (heatmap.metric === "mean_power") {
+      daily.push(hours.reduce((sum, v) => sum + v, 0) / hours.length);
+    } else {
+      daily.push(Math.max(...hours));
+    }
+  }
+  return daily;
+}
+
+function scaleMax(values) {
+  const sorted = values.filter((v) => v !== null).sort((a, b) => a - b);
+  if (!sorted.length) return 1;
+  return sorted[Math.floor((sorted.length - 1) * HEATMAP_SCALE_PERCENTILE)] || 1;
+}
+
+function cellColor(value, max) {
+  if (value === null) return "rgba(255, 255, 255, 0.03)";
+  const alpha = 0.08 + 0.92 * Math.min(1, Math.max(0, value / max));
+  return `rgba(${HEATMAP_COLOR.join(", ")}, ${alpha.toFixed(3)})`;
+}
+
+/**
+ * Size the canvas to its CSS width and the given height in device pixels; return a context in CSS pixels.
+ */
+function prepareCanvas(canvas, height) {
+  const dpr = window.devicePixelRatio || 1;
+  const width = canvas.clientWidth;
+  canvas.width = Math.round(width * dpr);
+  canvas.height = Math.round(height * dpr);
+  canvas.style.height = `${height}px`;
+  const ctx = canvas.getContext("2d");
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  ctx.clearRect(0, 0, width, height);
+  return { ctx, width };
+}
+
+function formatValue(value, unit) {
+  if (value === null) return "no data";
+  return `${value.toFixed(unit === "kWh" ? 2 : 0)} ${unit}`;
+}
+
+function drawHours(canvas, heatmap, rowHeight = 8) {
+  const { ctx, width } = prepareCanvas(canvas, heatmap.hours * rowHeight);
+  const cellWidth = width / heatmap.days;
+  const max = scaleMax(heatmap.values);
+  heatmap.values.forEach((value, i) => {
+    const day = Math.floor(i / heatmap.hours);
+    ctx.fillStyle = cellColor(value, max);
+    // Overlap by a pixel fraction so narrow cells don't leave hairline gaps
+    ctx.fillRect(day * cellWidth, (i % heatmap.hours) * rowHeight, cellWidth + 0.5, rowHeight);
+  });
+  canvas.onmousemove = (e) => {
+    const day = Math.floor(e.offsetX / cellWidth);
+    const hour = Math.floor(e.offsetY / rowHeight);
+    const value = heatmap.values[day * heatmap.hours + hour];
+    if (value === undefined) return;
+    canvas.title = `${dayDate(heatmap, day).toLocaleDateString()} ${hour}:00  ${formatValue(value, heatmap.unit)}`;
+  };
+}
+
+function drawCalendar(canvas, heatmap, rowHeight = 14) {
+  const daily = dailyValues(heatmap);
+  const first = dayDate(heatmap, 0);
+  const last = dayDate(heatmap, heatmap.days - 1);
+  const months = (last.getFullYear() - first.getFullYear()) * 12 + last.getMonth() - first.getMonth() + 1;
+  const { ctx, width } = prepareCanvas(canvas, months * rowHeight);
+  const cellWidth = width / 31;
+  const max = scaleMax(daily);
+  const cells = new Map(); // "row:column" -> day index, for the tooltip
+  daily.forEach((value, day) => {
+    const date = dayDate(heatmap, day);
+    const row = (date.getFullYear() - first.getFullYear()) * 12 + date.getMonth() - first.getMonth();
+    const column = date.getDate() - 1;
+    cells.set(`${row}:${column}`, day);
+    ctx.fillStyle = cellColor(value, max);
+    ctx.fillRect(column * cellWidth + 1, row * rowHeight + 1, cellWidth - 2, rowHeight - 2);
+  });
+  canvas.onmousemove = (e) => {
+    const day = cells.get(`${Math.floor(e.offsetY / rowHeight)}:${Math.floor(e.offsetX / cellWidth)}`);
+    if (day === undefined) return;
+    canvas.title = `${dayDate(heatmap, day).toLocaleDateString()}  ${formatValue(daily[day], heatmap.unit)}`;
+  };
+}
+
+// Export to window for use by other scripts
+window.EnergyHeatmap = {
+  fetchHeatmap,
+  dailyValues,
+  drawHours,
+  drawCalendar,
+};
@@ -7,6 +7,8 @@
   // Import shared utilities
   const { Fmt, formatDuration, setConnectionStatus, alignDailyDataToTimestamps, 
           loadCostPerKwh, getBaseChartAxes, processReadingsData, ChartColors } = window.EnergyMonitor;
+  const { fetchEnergySummaryCached } = window.EnergyCache;
+  const { createTileLoader } = window.EnergyTiles;
 
   // DOM Elements
   const chartEl = document.getElementById("chart");
@@ -37,6 +39,7 @@
   let avgDailyEnergyUsage = null;
   let costPerKwh = loadCostPerKwh();
   let debounceTimer = null;
+  const tileLoader = createTileLoader();
 
   // Series visibility: index -> visible
   const seriesVisibility = {
@@ -185,6 +188,18 @@
   // --------------------------------------------------------------------------
   // Data Fetching
   // --------------------------------------------------------------------------
+  /**
+   * Readings in [startMs, endMs] from tiles at the resolution the chart can show; complete tiles are
+   * cached across page loads, so a reload only downloads the open tile.
+   */
+  async function loadReadings(startMs, endMs) {
+    if (!tileLoader.index) await tileLoader.loadIndex();
+    const widthPx = chartEl?.clientWidth || window.innerWidth;
+    const level = tileLoader.chooseLevel(endMs - startMs, widthPx);
+    const { rows } = await tileLoader.loadRange(startMs, endMs, level);
+    return rows.filter((r) => r.t >= startMs && r.t <= endMs);
+  }
+
   async function fetchData(days) {
     const now = Date.now();
     const startMs = now - days * 24 * 60 * 60 * 1000;
@@ -192,19 +207,15 @@
     showLoading();
 
     try {
-      const [readingsRes, statsRes, summaryRes] = await Promise.all([
-        fetch(`/api/readings?start=${startMs}&end=${now}`, { cache: "no-cache" }),
+      const [readings, statsRes, summaryData] = await Promise.all([
+        loadReadings(startMs, now),
         fetch(`/api/stats?start=${startMs}&end=${now}`, { cache: "no-cache" }),
-        fetch("/api/energy_summary", { cache: "no-cache" }),
+        fetchEnergySummaryCached(),
       ]);
 
-      if (!readingsRes.ok) throw new Error(`Readings HTTP ${readingsRes.status}`);
       if (!statsRes.ok) throw new Error(`Stats HTTP ${statsRes.status}`);
-      if (!summaryRes.ok) throw new Error(`Summary HTTP ${summaryRes.status}`);
 
-      const readings = await readingsRes.json();
       const statsData = await statsRes.json();
-      const summaryData = await summaryRes.json();
 
       dailyEnergyData = summaryData.daily || [];
       movingAvgData = summaryData.moving_avg_30d || [];
@@ -0,0 +1,156 @@
+/**
+ * Energy Monitor - Series Worker
+ * Computes the derived chart series (rolling average, daily and typical daily usage) off the main
+ * thread. Readings live in growable Float64Array buffers; appended points are processed
+ * incrementally and only the rows and columns an update changed are posted back, as transferable buffers.
+ *
+ * Messages in:
+ *   { type: "reset",   x, y, e }                      replace all readings (x in seconds)
+ *   { type: "append",  x, y, e }                      append readings newer than the last one
+ *   { type: "summary", daily, movingAvg, avgDaily }   daily usage data from /api/energy_summary
+ *   { type: "mode",    avgMode }                      '30d' or 'total' typical daily usage
+ * Message out (one per message in):
+ *   { type: "series", appended, from, length, x?, y?, e?, ema?, daily?, typical? }
+ *   The series now have length points; each column present holds its new values for [from, length).
+ *   Resets send every column from 0, appends every column from the first new point, summary and mode
+ *   only daily and typical from 0, and appends without new points no column. Missing values are NaN.
+ */
+
+// Time constant of the power EMA. Matches the previous per-sample alpha of 0.0001 at 10 s sampling
+// (alpha = 1 - exp(-dt / tau)), but stays correct for irregular or downsampled points.
+const EMA_TAU_SEC = 100000;
+const INITIAL_CAPACITY = 1 << 16;
+
+const cols = {
+  x: new Float64Array(INITIAL_CAPACITY),
+  y: new Float64Array(INITIAL_CAPACITY),
+  e: new Float64Array(INITIAL_CAPACITY),
+  ema: new Float64Array(INITIAL_CAPACITY),
+  daily: new Float64Array(INITIAL_CAPACITY),
+  typical: new Float64Array(INITIAL_CAPACITY),
+};
+const ALL_COLUMNS = Object.keys(cols);
+const DAY_COLUMNS = ["daily", "typical"];
+let length = 0;
+let emaState = null;
+
+let dailyByDay = new Map(); // local midnight (sec) -> kWh
+let movingAvgByDay = new Map(); // local midnight (sec) -> kWh
+let avgDaily = null;
+let avgMode = "30d";
+
+// Local day containing the last mapped point, so Date objects are only built on day changes
+let dayStart = Infinity;
+let dayEnd = -Infinity;
+
+function localMidnightSec(sec) {
+  const d = new Date(sec * 1000);
+  return new Date(d.getFullYear(), d.getMonth(), d.getDate()).getTime() / 1000;
+}
+
+function ensureCapacity(needed) {
+  const capacity = cols.x.length;
+  if (needed <= capacity) return;
+  let next = capacity;
+  while (next < needed) next *= 2;
+  for (const key of Object.keys(cols)) {
+    const grown = new Float64Array(next);
+    grown.set(cols[key].subarray(0, length));
+    cols[key] = grown;
+  }
+}
+
+function updateEma(from) {
+  const { x, y, ema } = cols;
+  for (let i = from; i < length; i++) {
+    if (emaState === null) {
+      emaState = y[i];
+    } else {
+      const alpha = 1 - Math.exp(-Math.max(0, x[i] - x[i - 1]) / EMA_TAU_SEC);
+      emaState += alpha * (y[i] - emaState);
+    }
+    ema[i] = emaState;
+  }
+}
+
+function updateDays(from) {
+  const { x, daily, typical } = cols;
+  const flatTypical = avgMode === "total" && avgDaily ? avgDaily : NaN;
+  let dailyVal = NaN;
+  let typicalVal = NaN;
+  dayStart = Infinity; // force a lookup for the first point
+  for (let i = from; i < length; i++) {
+    const sec = x[i];
+    if (sec < dayStart || sec >= dayEnd) {
+      dayStart = localMidnightSec(sec);
+      dayEnd = localMidnightSec(dayStart + 36 * 3600); // next midnight, DST-safe
+      dailyVal = dailyByDay.get(dayStart) ?? NaN;
+      typicalVal = avgMode === "30d" ? movingAvgByDay.get(dayStart) ?? NaN : flatTypical;
+    }
+    daily[i] = dailyVal;
+    typical[i] = typicalVal;
+  }
+}
+
+function byDay(rows) {
+  const map = new Map();
+  for (const row of rows || []) map.set(localMidnightSec(row.t / 1000), row.kwh);
+  return map;
+}
+
+function load({ x, y, e }, append) {
+  let from = 0;
+  if (append && length > 0) {
+    const last = cols.x[length - 1];
+    while (from < x.length && x[from] <= last) from++;
+  } else {
+    length = 0;
+    emaState = null;
+  }
+  const count = x.length - from;
+  const start = length;
+  ensureCapacity(length + count);
+  cols.x.set(x.subarray(from), start);
+  cols.y.set(y.subarray(from), start);
+  cols.e.set(e.subarray(from), start);
+  length += count;
+  updateEma(start);
+  updateDays(start);
+  return count;
+}
+
+function post(appended, from, keys) {
+  const out = { type: "series", appended, from, length };
+  const transfer = [];
+  for (const key of keys) {
+    out[key] = cols[key].slice(from, length);
+    transfer.push(out[key].buffer);
+  }
+  self.postMessage(out, transfer);
+}
+
+self.onmessage = ({ data }) => {
+  let appended = 0;
+  switch (data.type) {
+    case "reset":
+      appended = load(data, false);
+      post(appended, 0, ALL_COLUMNS);
+      break;
+    case "append":
+      appended = load(data, true);
+      post(appended, length - appended, appended ? ALL_COLUMNS : []);
+      break;
+    case "summary":
+      dailyByDay = byDay(data.daily);
+      movingAvgByDay = byDay(data.movingAvg);
+      avgDaily = data.avgDaily;
+      updateDays(0);
+      post(0, 0, DAY_COLUMNS);
+      break;
+    case "mode":
+      avgMode = data.avgMode;
+      updateDays(0);
+      post(0, 0, DAY_COLUMNS);
+      break;
+  }
+};
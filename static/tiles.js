@@ -0,0 +1,115 @@
+/**
+ * Energy Monitor - Tile Loader
+ * Zoom-aware level-of-detail fetching. History is served as a fixed grid of time tiles per resolution
+ * level (see /api/tiles); the chart requests only the tiles covering the visible range, at the coarsest
+ * level that still fills the chart width, and keeps complete tiles in an LRU cache in memory and in
+ * IndexedDB across page loads (see cache.js).
+ */
+
+const TILE_CACHE_SIZE = 256; // tiles of at most 512 points each
+
+/**
+ * Least-recently-used cache on Map insertion order.
+ */
+class TileCache {
+  constructor(maxTiles = TILE_CACHE_SIZE) {
+    this.maxTiles = maxTiles;
+    this.tiles = new Map();
+  }
+
+  get(key) {
+    const tile = this.tiles.get(key);
+    if (tile === undefined) return undefined;
+    this.tiles.delete(key);
+    this.tiles.set(key, tile);
+    return tile;
+  }
+
+  set(key, tile) {
+    this.tiles.delete(key);
+    this.tiles.set(key, tile);
+    while (this.tiles.size > this.maxTiles) {
+      this.tiles.delete(this.tiles.keys().next().value);
+    }
+  }
+
+  clear() {
+    this.tiles.clear();
+  }
+}
+
+/**
+ * Create a loader for the tile grid. Call loadIndex() before choosing levels or loading ranges.
+ */
+function createTileLoader({ fields = "p,e", cacheSize = TILE_CACHE_SIZE } = {}) {
+  const cache = new TileCache(cacheSize);
+  let index = null;
+
+  async function loadIndex() {
+    const res = await fetch("/api/tiles", { cache: "no-cache" });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    index = await res.json();
+    return index;
+  }
+
+  /**
+   * Coarsest level whose buckets are no wider than one pixel of a chart spanning spanMs over widthPx.
+   */
+  function chooseLevel(spanMs, widthPx) {
+    const msPerPx = spanMs / Math.max(1, widthPx);
+    let level = 0;
+    for (const l of index.levels) {
+      if (l.bucket_ms <= msPerPx) level = l.level;
+    }
+    return level;
+  }
+
+  /**
+   * First and last tile index covering [startMs, endMs] at level.
+   */
+  function tileRange(startMs, endMs, level) {
+    const span = index.levels[level].span_ms;
+    return [Math.floor(startMs / span), Math.floor(endMs / span)];
+  }
+
+  async function fetchTile(level, i) {
+    const key = `${level}/${i}`;
+    const cached = cache.get(key);
+    if (cached) return cached;
+    // The open tile keeps growing, so only complete tiles are worth keeping
+    const url = `/api/tiles/${key}?fields=${fields}`;
+    const tile = await window.EnergyCache.fetchRevalidated(url, "tiles", `${key}?${fields}`, (t) => t.complete);
+    if (tile.complete) cache.set(key, tile);
+    return tile;
+  }
+
+  /**
+   * Load the tiles covering [startMs, endMs] at level in parallel.
+   * Resolves with the covered window { start, end } (ms, tile-aligned) and its rows in time order.
+   */
+  async function loadRange(startMs, endMs, level) {
+    const [i0, i1] = tileRange(startMs, endMs, level);
+    const indices = [];
+    for (let i = i0; i <= i1; i++) indices.push(i);
+    const tiles = await Promise.all(indices.map((i) => fetchTile(level, i)));
+    const span = index.levels[level].span_ms;
+    return { start: i0 * span, end: (i1 + 1) * span, rows: tiles.flatMap((t) => t.readings) };
+  }
+
+  return {
+    loadIndex,
+    chooseLevel,
+    tileRange,
+    loadRange,
+    clear: () => cache.clear(),
+    get index() {
+      return index;
+    },
+  };
+}
+
+// Export to window for use by other scripts
+window.EnergyTiles = {
+  TileCache,
+  createTileLoader,
+};
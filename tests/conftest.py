@@ -40,6 +40,15 @@ def test_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def patched_db(test_db, monkeypatch):
+    """Point src.database at the test database."""
+    import src.database
+
+    monkeypatch.setattr(src.database, "SessionLocal", test_db)
+    return test_db
+
+
 @pytest.fixture
 def sample_readings(test_db):
     """Create sample energy readings spanning 3 days."""
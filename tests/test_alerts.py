@@ -0,0 +1,112 @@
+"""Tests for the streaming alert rules."""
+
+from datetime import datetime
+
+import pytest
+
+import src.alerts
+from src.alerts import AlertEngine
+from src.alerts import DailyEnergyRule
+from src.alerts import NoDataRule
+from src.alerts import PhaseImbalanceRule
+from src.alerts import PowerAboveRule
+from src.alerts import SustainedThresholdRule
+
+
+def _values(power=500.0, energy=1000.0, phases=(200.0, 150.0, 150.0)) -> dict:
+    p1, p2, p3 = phases
+    return {
+        "power_watts": power,
+        "energy_in_kwh": energy,
+        "power_phase_1_watts": p1,
+        "power_phase_2_watts": p2,
+        "power_phase_3_watts": p3,
+    }
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+def test_power_rule_fires_once_after_sustained_excess(sent):
+    """Power must stay above the threshold for the whole duration, and an episode alerts only once."""
+    engine = AlertEngine([PowerAboveRule("power", 3000, 60)], notify=sent.append, cooldown_s=0)
+    for t, power in [(0, 3500), (30, 3500), (40, 100), (50, 3500), (100, 3500), (110, 3600), (120, 3600)]:
+        engine.on_reading(t, _values(power=power))
+
+    assert len(sent) == 1
+    assert "above 3000 W" in sent[0]
+
+
+def test_cooldown_suppresses_repeated_episodes(sent):
+    """A new episode within the cooldown is not re-sent; after the cooldown it is."""
+    engine = AlertEngine([PowerAboveRule("power", 3000, 0)], notify=sent.append, cooldown_s=600)
+    for t, power in [(0, 3500), (10, 100), (20, 3500), (30, 100), (700, 3500)]:
+        engine.on_reading(t, _values(power=power))
+
+    assert len(sent) == 2
+
+
+def test_episode_held_back_by_cooldown_alerts_once_it_ends(sent):
+    """A meter that comes back briefly and goes offline again within the cooldown still gets its alert."""
+    engine = AlertEngine([NoDataRule(120)], notify=sent.append, cooldown_s=600)
+    engine.on_reading(0, _values())
+    engine.tick(200)
+    engine.on_reading(300, _values())
+    engine.tick(500)
+    engine.tick(700)
+    assert len(sent) == 1
+
+    engine.tick(800)
+    engine.tick(900)
+    assert len(sent) == 2
+
+
+def test_no_data_rule_fires_from_watchdog_tick(sent):
+    """Silence is detected by ticks and cleared by the next reading."""
+    engine = AlertEngine([NoDataRule(120)], notify=sent.append, cooldown_s=0)
+    engine.on_reading(0, _values())
+    engine.tick(100)
+    assert sent == []
+
+    engine.tick(200)
+    engine.tick(210)
+    assert sent == ["No readings for 3 min"]
+
+    engine.on_reading(220, _values())
+    engine.tick(400)
+    assert len(sent) == 2
+
+
+@pytest.mark.parametrize("phases,expected_alerts", [((1000.0, 100.0, 100.0), 1), ((400.0, 350.0, 300.0), 0)])
+def test_phase_imbalance_rule(sent, phases, expected_alerts):
+    """Imbalance is (max - min) / mean of the phases."""
+    engine = AlertEngine([PhaseImbalanceRule("phase_imbalance", 1.0, 30)], notify=sent.append, cooldown_s=0)
+    for t in range(0, 60, 10):
+        engine.on_reading(t, _values(phases=phases))
+
+    assert len(sent) == expected_alerts
+
+
+def test_daily_energy_rule_compares_to_typical_usage(sent, monkeypatch):
+    """The baseline is fetched once per day and today's usage is compared against it."""
+    baseline_calls = []
+
+    def baseline(day_start):
+        baseline_calls.append(day_start)
+        return 1000.0, 10.0
+
+    monkeypatch.setattr(src.alerts, "daily_energy_baseline", baseline)
+    engine = AlertEngine([DailyEnergyRule(1.5)], notify=sent.append, cooldown_s=0)
+    noon = datetime(2026, 1, 15, 12).timestamp()
+    for i, energy in enumerate([1010.0, 1014.0, 1016.0, 1017.0]):
+        engine.on_reading(noon + i * 60, _values(energy=energy))
+
+    assert len(baseline_calls) == 1
+    assert sent == ["Used 16.0 kWh today, typical is 10.0 kWh"]
+
+
+def test_sustained_threshold_rule_is_abstract():
+    with pytest.raises(TypeError):
+        SustainedThresholdRule("base", threshold=1, duration_s=1)
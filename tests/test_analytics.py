@@ -0,0 +1,249 @@
+"""Tests for the daily energy analytics."""
+
+import math
+from datetime import datetime
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from src.analytics import daily_energy
+from src.analytics import derive_power
+from src.analytics import ema
+from src.analytics import get_avg_daily_energy_usage
+from src.analytics import get_daily_energy_usage
+from src.analytics import get_moving_avg_daily_usage
+from src.analytics import moving_mean
+from src.analytics import power_overlays
+from src.helpers import local_timezone
+
+
+@pytest.mark.parametrize(
+    "data,expected_error",
+    [
+        ([], (ValueError, KeyError)),  # Empty data
+        ([{"t": 0, "p": 0, "e": 100}], ValueError),  # Single point
+    ],
+)
+def test_avg_daily_usage_rejects_insufficient_data(data, expected_error):
+    """Average daily calculation requires at least 2 data points."""
+    with pytest.raises(expected_error):
+        get_avg_daily_energy_usage(data)
+
+
+def test_avg_daily_usage_calculates_over_span():
+    """Average daily usage divides energy delta by days."""
+    now_ms = int(datetime.now(local_timezone()).timestamp() * 1000)
+    one_day_ago = now_ms - (24 * 3600 * 1000)
+    two_days_ago = now_ms - (2 * 24 * 3600 * 1000)
+
+    data = [
+        {"t": two_days_ago, "p": 500, "e": 100.0},
+        {"t": one_day_ago, "p": 600, "e": 110.0},
+        {"t": now_ms, "p": 700, "e": 120.0},
+    ]
+
+    avg = get_avg_daily_energy_usage(data)
+    assert avg == pytest.approx(10.0, rel=0.01)  # 20 kWh over 2 days = 10/day
+
+
+@pytest.mark.parametrize(
+    "hours,expected_days",
+    [
+        (0, 0),  # No data
+        (24, 1),  # One full day
+        (72, 3),  # Three days
+    ],
+)
+def test_daily_energy_usage_groups_by_day(hours, expected_days):
+    """Daily usage groups readings by calendar day."""
+    now = datetime.now(local_timezone())
+    base = now - timedelta(hours=hours)
+
+    data = []
+    for i in range(hours):
+        ts = base + timedelta(hours=i)
+        data.append(
+            {
+                "t": int(ts.timestamp() * 1000),
+                "p": 500,
+                "e": 100.0 + i * 0.5,  # Cumulative energy
+            }
+        )
+
+    daily = get_daily_energy_usage(data)
+    if expected_days == 0:
+        assert len(daily) == 0
+    else:
+        assert len(daily) >= expected_days
+
+
+def test_daily_energy_usage_marks_partial_days():
+    """Days with less than 23 hours coverage are marked partial."""
+    now = datetime.now(local_timezone())
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Only 2 hours of data for today
+    data = [
+        {"t": int(today_start.timestamp() * 1000), "p": 500, "e": 100.0},
+        {"t": int((today_start + timedelta(hours=2)).timestamp() * 1000), "p": 500, "e": 101.0},
+    ]
+
+    daily = get_daily_energy_usage(data)
+    assert len(daily) > 0
+    assert daily[0]["is_partial"] is True
+
+
+def test_moving_avg_daily_usage_returns_empty_for_empty_input():
+    """Moving average returns empty list for empty input."""
+    result = get_moving_avg_daily_usage([])
+    assert result == []
+
+
+def test_moving_avg_daily_usage_with_single_day():
+    """Moving average with single day returns that day's value."""
+    daily_data = [{"t": 1000000, "kwh": 10.0}]
+    result = get_moving_avg_daily_usage(daily_data, window_days=30)
+
+    assert len(result) == 1
+    assert result[0]["t"] == 1000000
+    assert result[0]["kwh"] == pytest.approx(10.0)
+
+
+def test_moving_avg_daily_usage_calculates_average():
+    """Moving average correctly calculates average over window."""
+    # Create 5 days of data with known values
+    daily_data = [{"t": 1000000 + i * 86400000, "kwh": float(i + 1) * 10.0} for i in range(5)]
+    # Day 0: 10, Day 1: 20, Day 2: 30, Day 3: 40, Day 4: 50
+
+    result = get_moving_avg_daily_usage(daily_data, window_days=3)
+
+    assert len(result) == 5
+    # Day 0: avg(10) = 10
+    assert result[0]["kwh"] == pytest.approx(10.0)
+    # Day 1: avg(10, 20) = 15
+    assert result[1]["kwh"] == pytest.approx(15.0)
+    # Day 2: avg(10, 20, 30) = 20
+    assert result[2]["kwh"] == pytest.approx(20.0)
+    # Day 3: avg(20, 30, 40) = 30 (window of 3)
+    assert result[3]["kwh"] == pytest.approx(30.0)
+    # Day 4: avg(30, 40, 50) = 40 (window of 3)
+    assert result[4]["kwh"] == pytest.approx(40.0)
+
+
+def test_moving_avg_daily_usage_handles_small_history():
+    """Moving average uses available data when history is less than window."""
+    # Create 10 days of data
+    daily_data = [{"t": 1000000 + i * 86400000, "kwh": 15.0} for i in range(10)]
+
+    # Request 30-day window but only have 10 days
+    result = get_moving_avg_daily_usage(daily_data, window_days=30)
+
+    assert len(result) == 10
+    # Each day should use all available history up to that point
+    # Last day should average all 10 days = 15.0
+    assert result[-1]["kwh"] == pytest.approx(15.0)
+
+
+def loop_ema(t_s, values, tau_s):
+    """The series worker's per-sample EMA, as a reference."""
+    out, state = [], None
+    for i, value in enumerate(values):
+        if state is None:
+            state = value
+        else:
+            state += (1 - math.exp(-max(0.0, t_s[i] - t_s[i - 1]) / tau_s)) * (value - state)
+        out.append(state)
+    return out
+
+
+@pytest.mark.parametrize("tau_s", [100_000, 600, 1])
+def test_ema_matches_the_per_sample_recursion(tau_s):
+    rng = np.random.default_rng(0)
+    # Irregular steps with a few long gaps spanning many EMA blocks, and one step back in time
+    t_s = np.cumsum(rng.choice([10.0, 12.0, 3600.0, 40 * 86400.0], 2000, p=[0.6, 0.38, 0.019, 0.001]))
+    t_s[500] = t_s[499] - 5
+    values = rng.normal(800, 300, 2000)
+
+    assert ema(t_s, values, tau_s) == pytest.approx(loop_ema(t_s, values, tau_s), rel=1e-9, abs=1e-9)
+
+
+def test_moving_mean_uses_cumulative_sums():
+    assert moving_mean([10.0, 20.0, 30.0, 40.0, 50.0], 3).tolist() == pytest.approx([10, 15, 20, 30, 40])
+    assert moving_mean([], 30).tolist() == []
+
+
+def test_derive_power_from_energy_deltas():
+    t = [0, 3_600_000, 3_600_000, 5_400_000, 7_200_000, 9_000_000]
+    t, watts = derive_power(t, [1.0, 2.0, 2.5, np.nan, 3.0, 2.0])
+
+    # A repeated timestamp and a missing value give no power, a counter reset gives 0 W
+    assert t.tolist() == [3_600_000, 9_000_000]
+    assert watts.tolist() == pytest.approx([1000.0, 0.0])
+
+
+def test_daily_energy_buckets_by_local_day():
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=2)
+    t = np.array([int((midnight + timedelta(hours=h)).timestamp() * 1000) for h in range(0, 48, 2)])
+    energy = 100.0 + np.arange(len(t)) * 0.5
+
+    daily = daily_energy(t, energy)
+
+    assert daily["kwh"].tolist() == pytest.approx([5.5, 5.5])
+    assert daily["is_partial"].tolist() == [True, True]  # 00:00 to 22:00
+    noon = datetime.combine(midnight.date(), datetime.min.time().replace(hour=12), local_timezone())
+    assert daily["t"][0] == int(noon.timestamp() * 1000)
+
+
+@pytest.mark.parametrize("with_power", [True, False])
+def test_power_overlays_reduce_to_max_points(with_power):
+    t = np.arange(0, 1000) * 10_000
+    energy = 100.0 + np.arange(1000) / 360  # 1 kW
+    power = np.full(1000, 1000.0) if with_power else np.full(1000, np.nan)
+
+    overlays = power_overlays(t, power, energy, max_points=10)
+
+    assert overlays["derived"] is not with_power
+    assert len(overlays["t"]) == len(overlays["power"]) == len(overlays["ema"]) == 10
+    assert overlays["t"][-1] == t[-1]
+    assert overlays["power"] == pytest.approx([1000.0] * 10)
+    assert overlays["ema"] == pytest.approx([1000.0] * 10)
+
+
+@pytest.mark.parametrize(
+    "t,power,energy",
+    [([], [], []), ([0], [np.nan], [100.0]), ([0, 10_000], [np.nan, np.nan], [np.nan, np.nan])],
+    ids=["no readings", "one reading", "no values"],
+)
+def test_power_overlays_of_unusable_readings_are_empty(t, power, energy):
+    overlays = power_overlays(np.array(t, dtype=np.int64), np.array(power), np.array(energy), max_points=10)
+
+    assert overlays["t"] == overlays["power"] == overlays["ema"] == []
+
+
+def test_api_overlays_caps_max_points_at_the_row_cap(client, patched_db, sample_readings, monkeypatch):
+    """max_points beyond response_max_rows can't fetch the full-resolution history around the cap."""
+    monkeypatch.setattr("src.app.RESPONSE_MAX_ROWS", 10)
+
+    overlays = client.get("/api/overlays?max_points=100000000").get_json()
+
+    assert len(overlays["t"]) == len(overlays["power"]) == len(overlays["ema"]) == 10
+
+
+def test_api_overlays_of_an_empty_range(client, patched_db, sample_readings):
+    response = client.get("/api/overlays?start=0&end=1000")
+
+    assert response.status_code == 200
+    assert response.get_json()["t"] == []
+
+
+@pytest.mark.parametrize(
+    "query,expected_status",
+    [("", 200), ("?max_points=50&tau=3600", 200), ("?max_points=0", 400), ("?tau=-1", 400)],
+)
+def test_api_overlays_validates_params(client, patched_db, sample_readings, query, expected_status):
+    response = client.get(f"/api/overlays{query}")
+
+    assert response.status_code == expected_status
+    if expected_status == 200:
+        assert set(response.get_json()) == {"derived", "tau_s", "t", "power", "ema"}
@@ -4,8 +4,10 @@ from datetime import datetime
 from datetime import timedelta
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
+from src.database import get_readings
 from src.helpers import local_timezone
 
 
@@ -40,7 +42,7 @@ def test_api_endpoints_return_json(client, endpoint, expected_keys):
                             assert key in data
 
 
-def test_api_readings_accepts_time_params(client):
+def test_api_readings_accepts_time_params(client, patched_db):
     """Readings endpoint accepts start/end parameters."""
     with patch("src.app.get_readings", return_value=[]):
         response = client.get("/api/readings?start=1704067200000&end=1704153600000")
@@ -87,6 +89,122 @@ def test_api_stats_swaps_inverted_range(client):
             assert call_args["end"] == later
 
 
+@pytest.mark.parametrize("max_rows,expected_status", [(0, 200), (100, 200), (71, 413)])
+def test_api_readings_caps_rows_per_response(
+    client, patched_db, sample_readings, monkeypatch, max_rows, expected_status
+):
+    """Unpaged responses larger than response_max_rows are refused (0 disables the cap)."""
+    monkeypatch.setattr("src.app.RESPONSE_MAX_ROWS", max_rows)
+
+    response = client.get("/api/readings")
+
+    assert response.status_code == expected_status
+    if expected_status == 200:
+        assert len(response.get_json()) == 72
+
+
+def test_api_readings_counts_only_uncached_requests(client, patched_db, sample_readings, monkeypatch):
+    """A response served from the readings cache was counted when it was fetched."""
+    monkeypatch.setattr("src.app.RESPONSE_MAX_ROWS", 100)
+    get_readings.cache_clear()
+    with patch("src.app.count_readings", return_value=72) as mock_count:
+        assert client.get("/api/readings").status_code == 200
+        assert client.get("/api/readings").status_code == 200
+
+    assert mock_count.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "query,expected_status,expected_fields",
+    [
+        ("", 200, ("p", "e")),
+        ("?fields=p1,p2,p3", 200, ("p1", "p2", "p3")),
+        ("?fields=p,p,o", 200, ("p", "o")),
+        ("?fields=raw_payload", 400, None),
+    ],
+)
+def test_api_readings_fields_param(client, patched_db, query, expected_status, expected_fields):
+    """Readings endpoint validates `fields` and forwards them to the query."""
+    with patch("src.app.get_readings", return_value=[]) as mock_readings:
+        response = client.get(f"/api/readings{query}")
+        assert response.status_code == expected_status
+        if expected_fields:
+            assert mock_readings.call_args[1]["fields"] == expected_fields
+
+
+@pytest.mark.parametrize(
+    "query,expected_status,expected_limit",
+    [
+        ("?limit=50", 200, 50),
+        ("?after=1704067200000", 200, 100),
+        ("?after=1704067200000&limit=5000", 200, 100),
+        ("?limit=0", 400, None),
+        ("?limit=ten", 400, None),
+    ],
+)
+def test_api_readings_pages_are_capped(client, monkeypatch, query, expected_status, expected_limit):
+    """`after`/`limit` switch to one page of at most readings_page_max readings, continuing after `after`."""
+    monkeypatch.setattr("src.app.READINGS_PAGE_MAX", 100)
+    with patch("src.app.get_readings_page", return_value=([{"t": 1}], 1)) as mock_page:
+        response = client.get(f"/api/readings{query}")
+        assert response.status_code == expected_status
+        if expected_limit:
+            start, _, _, limit = mock_page.call_args[0]
+            assert limit == expected_limit
+            assert response.get_json() == {"readings": [{"t": 1}], "next": 1}
+            if "after" in query:
+                assert int(start.timestamp() * 1000) == 1704067200001
+
+
+@pytest.mark.parametrize(
+    "extent,max_points,expected_bucket_ms",
+    [
+        ((0, 999_999), 1000, 1000),
+        ((0, 999_999), 3, 333_334),
+        (None, 1000, None),
+    ],
+)
+def test_api_phases_sizes_buckets_to_max_points(client, extent, max_points, expected_bucket_ms):
+    """Phases endpoint picks a bucket size that keeps the series within max_points."""
+    with (
+        patch("src.app.get_time_extent", return_value=extent),
+        patch("src.app.get_bucketed_readings", return_value=[]) as mock_buckets,
+        patch("src.app.get_phase_stats", return_value={"imbalance_ratio": None}),
+    ):
+        response = client.get(f"/api/phases?max_points={max_points}")
+        assert response.status_code == 200
+        assert response.get_json()["bucket_ms"] == expected_bucket_ms
+        if expected_bucket_ms:
+            assert mock_buckets.call_args[1]["fields"] == ("p1", "p2", "p3")
+
+
+@pytest.mark.parametrize(
+    "query,expected_status,expected_type",
+    [
+        ("?format=csv&fields=p,e", 200, "text/csv"),
+        ("?format=xlsx", 400, "application/json"),
+    ],
+)
+def test_api_export_streams_requested_format(client, query, expected_status, expected_type):
+    """Export endpoint streams CSV and rejects unknown formats."""
+    with patch("src.export.iter_readings", return_value=iter([[(1704067200000, 450.0, 12.5)]])):
+        response = client.get(f"/api/export{query}")
+        assert response.status_code == expected_status
+        assert response.content_type.startswith(expected_type)
+        if expected_status == 200:
+            assert response.get_data(as_text=True).splitlines()[1] == "1704067200000,450.0,12.5"
+
+
+def test_api_gaps_passes_time_range(client):
+    """Gaps endpoint forwards the parsed range and returns the gap list."""
+    gaps = [{"start": 1704067200000, "end": 1704067500000, "seconds": 300.0}]
+    with patch("src.app.get_gaps", return_value=gaps) as mock_gaps:
+        response = client.get("/api/gaps?start=1704067200000&end=1704153600000")
+        assert response.status_code == 200
+        assert response.get_json() == gaps
+        assert mock_gaps.call_args[1]["start"] is not None
+
+
 def test_clear_cache_returns_previous_stats(client):
     """Cache clear endpoint returns previous cache statistics."""
     with patch("src.app.get_readings") as mock_readings:
@@ -99,3 +217,60 @@ def test_clear_cache_returns_previous_stats(client):
         assert data["cleared"] is True
         assert data["previous"]["hits"] == 10
         assert data["previous"]["misses"] == 2
+
+
+@pytest.mark.parametrize(
+    "complete,cache_control", [(True, "max-age=3600"), (False, "no-cache")], ids=["complete", "open"]
+)
+def test_api_tile_sets_cache_control(client, complete, cache_control):
+    """Complete tiles are cacheable by the browser, the open tile is revalidated."""
+    tile = {"level": 1, "index": 5, "complete": complete, "readings": []}
+    with patch("src.app.get_tile", return_value=tile):
+        response = client.get("/api/tiles/1/5")
+        assert response.status_code == 200
+        assert cache_control in response.headers["Cache-Control"]
+
+
+def test_api_tile_rejects_unknown_level(client):
+    response = client.get("/api/tiles/99/0")
+    assert response.status_code == 400
+
+
+def test_api_tile_revalidates_with_etag(client):
+    """A tile requested with its ETag is answered with an empty 304, with or without compression."""
+    tile = {"level": 1, "index": 5, "complete": True, "readings": [{"t": i, "p": 450.0} for i in range(100)]}
+    with patch("src.app.get_tile", return_value=tile):
+        for headers in ({}, {"Accept-Encoding": "gzip"}):
+            etag = client.get("/api/tiles/1/5", headers=headers).headers["ETag"]
+            response = client.get("/api/tiles/1/5", headers={**headers, "If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.data == b""
+
+
+def test_energy_summary_since_returns_newer_days(client):
+    """With since, older days are summarized by their total only."""
+    daily = [{"t": 1000, "kwh": 10.0, "is_partial": False}, {"t": 2000, "kwh": 12.0, "is_partial": True}]
+    arrays = {
+        "t": np.array([1000, 2000]),
+        "kwh": np.array([10.0, 12.0]),
+        "is_partial": np.array([False, True]),
+    }
+    with (
+        patch("src.app.get_reading_arrays", return_value={"t": np.empty(0), "e": np.empty(0)}),
+        patch("src.app.daily_energy", return_value=arrays),
+        patch("src.app.avg_daily_energy", return_value=11.0),
+    ):
+        data = client.get("/api/energy_summary?since=2000").get_json()
+
+    assert data["before_kwh"] == 10.0
+    assert data["daily"] == daily[1:]
+    assert [day["t"] for day in data["moving_avg_30d"]] == [2000]
+
+
+def test_debug_slow_queries_lists_recorded_queries(client):
+    queries = [{"ms": 350.0, "statement": "SELECT 1", "plan": ["SCAN energy_readings"], "full_scan": True}]
+    with patch("src.app.recent_slow_queries", return_value=queries):
+        data = client.get("/api/debug/slow_queries").get_json()
+
+    assert data["queries"] == queries
+    assert data["threshold_ms"] > 0
@@ -0,0 +1,62 @@
+"""Tests for the fingerprinted static asset build."""
+
+import gzip
+
+import brotli
+import pytest
+
+from src.app import asset_url
+from src.assets import build_assets
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "app.js").write_text("console.log('v1');\n" * 100)
+    (static / "favicon.ico").write_bytes(b"\x00\x01")
+    return static
+
+
+def test_build_writes_hashed_precompressed_copies(static_dir, tmp_path):
+    """Only JS/CSS are built, each with gzip and brotli variants of the same content."""
+    out = tmp_path / "dist"
+    manifest = build_assets(static_dir, out)
+
+    hashed = manifest["app.js"]
+    assert list(manifest) == ["app.js"]
+    assert hashed.startswith("app.") and hashed.endswith(".js")
+    content = (static_dir / "app.js").read_bytes()
+    assert gzip.decompress((out / f"{hashed}.gz").read_bytes()) == content
+    assert brotli.decompress((out / f"{hashed}.br").read_bytes()) == content
+
+
+def test_rebuild_after_change_removes_stale_build(static_dir, tmp_path):
+    out = tmp_path / "dist"
+    old = build_assets(static_dir, out)["app.js"]
+    (static_dir / "app.js").write_text("console.log('v2');\n")
+    new = build_assets(static_dir, out)["app.js"]
+
+    assert new != old
+    assert sorted(p.name for p in out.iterdir()) == sorted([new, f"{new}.gz", f"{new}.br"])
+
+
+@pytest.mark.parametrize("accept,encoding", [("gzip, deflate, br", "br"), ("gzip", "gzip"), ("", None)])
+def test_asset_served_precompressed_and_immutable(client, accept, encoding):
+    response = client.get(asset_url("app.js"), headers={"Accept-Encoding": accept})
+
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding") == encoding
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "javascript" in response.mimetype
+
+
+def test_templates_reference_hashed_assets(client):
+    html = client.get("/").get_data(as_text=True)
+    assert asset_url("app.js") in html
+    assert asset_url("styles.css") in html
+    assert "/static/app.js" not in html
+
+
+def test_unknown_asset_is_404(client):
+    assert client.get("/assets/app.000000000000.js").status_code == 404
@@ -0,0 +1,174 @@
+"""Tests for the compressed chunk store."""
+
+import math
+from datetime import datetime
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import func
+from sqlalchemy import select
+
+import src.retention
+from src.chunks import decode_timestamps
+from src.chunks import decode_values
+from src.chunks import encode_timestamps
+from src.chunks import encode_values
+from src.database import EnergyReading
+from src.database import ReadingChunk
+from src.database import get_bucketed_readings
+from src.database import get_phase_stats
+from src.database import get_reading_arrays
+from src.database import get_readings
+from src.database import get_readings_page
+from src.database import get_stats
+from src.database import iter_readings
+from src.database import num_total_energy_readings
+from src.database import pack_chunks
+from src.retention import compact
+
+FIELDS = ("p", "e", "p1")
+
+
+@pytest.mark.parametrize(
+    "t",
+    [
+        np.arange(1_700_000_000_000, 1_700_086_400_000, 10_000),
+        1_700_000_000_000 + np.cumsum(np.random.default_rng(0).integers(9_000, 11_000, 1000)),
+        np.array([1_700_000_000_000]),
+        np.array([], dtype=np.int64),
+    ],
+)
+def test_timestamps_round_trip(t):
+    assert np.array_equal(decode_timestamps(encode_timestamps(t), len(t)), t)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        1000 + np.cumsum(np.random.default_rng(0).random(1000) * 0.003).round(4),
+        np.array([450.0, np.nan, -12.5, 0.0, np.inf]),
+        np.array([], dtype=np.float64),
+    ],
+)
+def test_values_round_trip(values):
+    assert np.array_equal(decode_values(encode_values(values), len(values)), values, equal_nan=True)
+
+
+def test_constant_interval_compresses_to_almost_nothing():
+    t = np.arange(1_700_000_000_000, 1_700_086_400_000, 10_000)
+
+    assert len(encode_timestamps(t)) < 200  # 8640 timestamps, 69 KB as int64
+
+
+@pytest.fixture
+def days(patched_db):
+    """Readings every 10 minutes over the last three days, one with a missing power value."""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    with patched_db() as session:
+        for i in range(3 * 144):
+            session.add(
+                EnergyReading(
+                    timestamp=today - timedelta(days=2) + timedelta(minutes=10 * i, seconds=i % 3),
+                    power_watts=None if i == 100 else 100.0 + i % 7 * 50,
+                    energy_in_kwh=1000.0 + i * 0.1,
+                    power_phase_1_watts=50.0 + i % 5,
+                    raw_payload="{}",
+                )
+            )
+        session.commit()
+    get_readings.cache_clear()
+    return today
+
+
+def _reads(start, end) -> dict:
+    get_readings.cache_clear()
+    arrays = get_reading_arrays(start, end, FIELDS)
+    return {
+        "readings": get_readings(start, end, FIELDS),
+        "arrays": {
+            key: [None if math.isnan(v) else v for v in values.tolist()] for key, values in arrays.items()
+        },
+        "bucketed": get_bucketed_readings(start, end, FIELDS, 3_600_000),
+        "stats": get_stats(start, end),
+        "phases": get_phase_stats(start, end),
+        "export": [row for chunk in iter_readings(start, end, FIELDS, chunk_size=100) for row in chunk],
+    }
+
+
+@pytest.mark.parametrize("span_hours", [None, (-30, 2), (-47, -1), (-20, 20)])
+def test_packed_days_read_like_raw_rows(patched_db, days, span_hours):
+    """Reads spanning packed days, the packing boundary and raw rows return exactly what the rows did."""
+    start = end = None
+    if span_hours is not None:
+        start, end = (days + timedelta(hours=hours) for hours in span_hours)
+    before = _reads(start, end)
+
+    assert pack_chunks(days) == 2 * 144
+
+    with patched_db() as session:
+        assert session.scalar(select(func.count()).select_from(ReadingChunk)) == 2
+        assert session.scalar(select(func.min(EnergyReading.timestamp))) >= days
+    assert num_total_energy_readings() == 3 * 144
+    assert _reads(start, end) == before
+
+
+def test_packed_reading_at_a_sub_millisecond_start_stays_in_range(patched_db, days):
+    """Packed timestamps are whole ms; a reading exactly at a start with microseconds is still read."""
+    at = days - timedelta(hours=30) + timedelta(microseconds=123_456)
+    with patched_db() as session:
+        session.add(EnergyReading(timestamp=at, power_watts=4321.0, energy_in_kwh=1010.0, raw_payload="{}"))
+        session.commit()
+    get_readings.cache_clear()
+    before = _reads(at, days + timedelta(hours=2))
+    assert before["stats"]["count"] == 32 * 6 + 1
+
+    pack_chunks(days)
+
+    assert _reads(at, days + timedelta(hours=2)) == before
+
+
+def test_late_rows_are_read_and_merged_into_their_day(patched_db, days):
+    """Readings imported into a packed day are read with it and packed into its chunk on the next run."""
+    pack_chunks(days)
+    late = days - timedelta(hours=5, seconds=30)
+    with patched_db() as session:
+        session.add(EnergyReading(timestamp=late, power_watts=1234.0, energy_in_kwh=1100.0, raw_payload="{}"))
+        session.commit()
+
+    get_readings.cache_clear()
+    readings = get_readings(None, None, FIELDS)
+    assert {"t": int(late.timestamp() * 1000), "p": 1234.0, "e": 1100.0, "p1": None} in readings
+    assert readings == sorted(readings, key=lambda r: r["t"])
+
+    assert pack_chunks(days) == 1
+    get_readings.cache_clear()
+    assert get_readings(None, None, FIELDS) == readings
+    with patched_db() as session:
+        assert session.scalar(select(func.sum(ReadingChunk.count))) == 2 * 144 + 1
+
+
+def test_compaction_packs_days_and_drops_expired_chunks(patched_db, days, monkeypatch):
+    monkeypatch.setattr(src.retention, "CHUNK_STORE_DAYS", 1)
+    stats = compact()
+    assert stats["packed"] == 144  # the day before yesterday; yesterday stays raw
+
+    monkeypatch.setattr(src.retention, "tier_cutoffs", lambda: (None, days))
+    stats = compact()
+    assert stats["chunks_deleted"] == 1
+
+
+def test_pages_walk_packed_days_and_raw_rows_once(days):
+    """Paging with the next cursor returns every reading once, across packed days and raw rows."""
+    pack_chunks(days)
+    pages, cursor = [], None
+    while True:
+        start = datetime.fromtimestamp((cursor + 1) / 1000) if cursor is not None else None
+        page, cursor = get_readings_page(start, None, FIELDS, 100)
+        pages.append(page)
+        if cursor is None:
+            break
+
+    get_readings.cache_clear()
+    assert [row for page in pages for row in page] == get_readings(None, None, FIELDS)
+    assert all(len(page) <= 100 for page in pages)
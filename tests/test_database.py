@@ -3,142 +3,26 @@
 from datetime import datetime
 from datetime import timedelta
 
+import numpy as np
 import pytest
 
-from src.database import get_avg_daily_energy_usage
-from src.database import get_daily_energy_usage
-from src.database import get_moving_avg_daily_usage
+from src.database import EnergyReading
+from src.database import _update_gap_index
+from src.database import daily_energy_baseline
+from src.database import data_state
+from src.database import get_bucketed_readings
+from src.database import get_gaps
+from src.database import get_phase_stats
+from src.database import get_reading_arrays
+from src.database import get_readings
 from src.database import get_stats
+from src.database import latest_energy_reading
+from src.database import missing_seconds
+from src.database import rebuild_gap_index
+from src.database import rebuild_rollups
 from src.helpers import local_timezone
 
 
-@pytest.mark.parametrize(
-    "data,expected_error",
-    [
-        ([], (ValueError, KeyError)),  # Empty data
-        ([{"t": 0, "p": 0, "e": 100}], ValueError),  # Single point
-    ],
-)
-def test_avg_daily_usage_rejects_insufficient_data(data, expected_error):
-    """Average daily calculation requires at least 2 data points."""
-    with pytest.raises(expected_error):
-        get_avg_daily_energy_usage(data)
-
-
-def test_avg_daily_usage_calculates_over_span():
-    """Average daily usage divides energy delta by days."""
-    now_ms = int(datetime.now(local_timezone()).timestamp() * 1000)
-    one_day_ago = now_ms - (24 * 3600 * 1000)
-    two_days_ago = now_ms - (2 * 24 * 3600 * 1000)
-
-    data = [
-        {"t": two_days_ago, "p": 500, "e": 100.0},
-        {"t": one_day_ago, "p": 600, "e": 110.0},
-        {"t": now_ms, "p": 700, "e": 120.0},
-    ]
-
-    avg = get_avg_daily_energy_usage(data)
-    assert avg == pytest.approx(10.0, rel=0.01)  # 20 kWh over 2 days = 10/day
-
-
-@pytest.mark.parametrize(
-    "hours,expected_days",
-    [
-        (0, 0),  # No data
-        (24, 1),  # One full day
-        (72, 3),  # Three days
-    ],
-)
-def test_daily_energy_usage_groups_by_day(hours, expected_days):
-    """Daily usage groups readings by calendar day."""
-    now = datetime.now(local_timezone())
-    base = now - timedelta(hours=hours)
-
-    data = []
-    for i in range(hours):
-        ts = base + timedelta(hours=i)
-        data.append(
-            {
-                "t": int(ts.timestamp() * 1000),
-                "p": 500,
-                "e": 100.0 + i * 0.5,  # Cumulative energy
-            }
-        )
-
-    daily = get_daily_energy_usage(data)
-    if expected_days == 0:
-        assert len(daily) == 0
-    else:
-        assert len(daily) >= expected_days
-
-
-def test_daily_energy_usage_marks_partial_days():
-    """Days with less than 23 hours coverage are marked partial."""
-    now = datetime.now(local_timezone())
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # Only 2 hours of data for today
-    data = [
-        {"t": int(today_start.timestamp() * 1000), "p": 500, "e": 100.0},
-        {"t": int((today_start + timedelta(hours=2)).timestamp() * 1000), "p": 500, "e": 101.0},
-    ]
-
-    daily = get_daily_energy_usage(data)
-    assert len(daily) > 0
-    assert daily[0]["is_partial"] is True
-
-
-def test_moving_avg_daily_usage_returns_empty_for_empty_input():
-    """Moving average returns empty list for empty input."""
-    result = get_moving_avg_daily_usage([])
-    assert result == []
-
-
-def test_moving_avg_daily_usage_with_single_day():
-    """Moving average with single day returns that day's value."""
-    daily_data = [{"t": 1000000, "kwh": 10.0}]
-    result = get_moving_avg_daily_usage(daily_data, window_days=30)
-
-    assert len(result) == 1
-    assert result[0]["t"] == 1000000
-    assert result[0]["kwh"] == pytest.approx(10.0)
-
-
-def test_moving_avg_daily_usage_calculates_average():
-    """Moving average correctly calculates average over window."""
-    # Create 5 days of data with known values
-    daily_data = [{"t": 1000000 + i * 86400000, "kwh": float(i + 1) * 10.0} for i in range(5)]
-    # Day 0: 10, Day 1: 20, Day 2: 30, Day 3: 40, Day 4: 50
-
-    result = get_moving_avg_daily_usage(daily_data, window_days=3)
-
-    assert len(result) == 5
-    # Day 0: avg(10) = 10
-    assert result[0]["kwh"] == pytest.approx(10.0)
-    # Day 1: avg(10, 20) = 15
-    assert result[1]["kwh"] == pytest.approx(15.0)
-    # Day 2: avg(10, 20, 30) = 20
-    assert result[2]["kwh"] == pytest.approx(20.0)
-    # Day 3: avg(20, 30, 40) = 30 (window of 3)
-    assert result[3]["kwh"] == pytest.approx(30.0)
-    # Day 4: avg(30, 40, 50) = 40 (window of 3)
-    assert result[4]["kwh"] == pytest.approx(40.0)
-
-
-def test_moving_avg_daily_usage_handles_small_history():
-    """Moving average uses available data when history is less than window."""
-    # Create 10 days of data
-    daily_data = [{"t": 1000000 + i * 86400000, "kwh": 15.0} for i in range(10)]
-
-    # Request 30-day window but only have 10 days
-    result = get_moving_avg_daily_usage(daily_data, window_days=30)
-
-    assert len(result) == 10
-    # Each day should use all available history up to that point
-    # Last day should average all 10 days = 15.0
-    assert result[-1]["kwh"] == pytest.approx(15.0)
-
-
 def test_get_stats_computes_power_aggregates(test_db, sample_readings):
     """Stats calculation includes min/max/avg power and energy delta."""
     start = sample_readings[0]["timestamp"]
@@ -178,3 +62,160 @@ def test_get_stats_handles_empty_range(test_db):
         assert stats["energy_used_kwh"] is None
     finally:
         src.database.SessionLocal = original_session
+
+
+def _insert_reading(session_factory, timestamp: datetime):
+    """Insert a bare reading and update the gap index, as save_energy_reading does."""
+    with session_factory() as session:
+        session.add(
+            EnergyReading(timestamp=timestamp, power_watts=500.0, energy_in_kwh=1.0, raw_payload="{}")
+        )
+        _update_gap_index(session, timestamp)
+        session.commit()
+
+
+def test_gap_index_tracks_inserts_and_backfills(patched_db):
+    """Gaps are recorded on insert and split or closed when a reading is backfilled into them."""
+    base = datetime.now(local_timezone()).replace(microsecond=0) - timedelta(hours=1)
+    for offset in [0, 10, 300]:
+        _insert_reading(patched_db, base + timedelta(seconds=offset))
+    assert [g["seconds"] for g in get_gaps()] == [290.0]
+
+    _insert_reading(patched_db, base + timedelta(seconds=100))
+    assert [g["seconds"] for g in get_gaps()] == [90.0, 200.0]
+
+    _insert_reading(patched_db, base + timedelta(seconds=55))
+    assert [g["seconds"] for g in get_gaps()] == [200.0]
+
+
+def test_rebuild_gap_index_matches_incremental_index(patched_db, sample_readings):
+    """A full rebuild finds every gap between the hourly sample readings."""
+    rebuild_gap_index()
+    gaps = get_gaps()
+    assert len(gaps) == len(sample_readings) - 1
+    assert gaps[0]["start"] == int(sample_readings[0]["timestamp"].timestamp() * 1000)
+
+
+def test_missing_seconds_includes_open_gap_since_latest_reading(patched_db):
+    """Time since the latest reading counts as missing even before the gap is closed."""
+    now = datetime.now(local_timezone())
+    _insert_reading(patched_db, now - timedelta(minutes=30))
+    _insert_reading(patched_db, now - timedelta(minutes=20))
+
+    missing = missing_seconds(now - timedelta(hours=1), now)
+    assert missing == pytest.approx(20 * 60 + 10 * 60, abs=1)
+
+
+@pytest.mark.parametrize("fields", [("p", "e"), ("p1", "p2", "p3"), ("o",)])
+def test_get_readings_returns_only_requested_fields(patched_db, sample_readings, fields):
+    """Readings carry the ms timestamp plus exactly the requested fields."""
+    get_readings.cache_clear()
+    rows = get_readings(start=None, end=None, fields=fields)
+
+    assert len(rows) == len(sample_readings)
+    assert set(rows[0]) == {"t", *fields}
+    assert rows[0]["t"] == int(sample_readings[0]["timestamp"].timestamp() * 1000)
+
+
+def test_get_reading_arrays_returns_numpy_columns(patched_db, sample_readings):
+    """Array query returns int64 timestamps and float64 value columns."""
+    arrays = get_reading_arrays(fields=("p", "e"))
+
+    assert arrays["t"].dtype.name == "int64"
+    assert arrays["p"].dtype.name == "float64"
+    assert arrays["e"].tolist() == [r["energy_in_kwh"] for r in sample_readings]
+
+
+def test_get_reading_arrays_converts_in_batches(patched_db, sample_readings, monkeypatch):
+    """Batched conversion matches the row query across batch boundaries, with NULL as NaN."""
+    monkeypatch.setattr("src.database.ARRAY_FETCH_ROWS", 5)
+    with patched_db() as session:
+        session.get(EnergyReading, sample_readings[7]["timestamp"]).power_watts = None
+        session.commit()
+
+    arrays = get_reading_arrays(fields=("p", "e"))
+
+    get_readings.cache_clear()
+    rows = get_readings(fields=("p", "e"))
+    assert arrays["t"].tolist() == [row["t"] for row in rows]
+    assert arrays["e"].tolist() == [row["e"] for row in rows]
+    assert np.isnan(arrays["p"][7]) and rows[7]["p"] is None
+    assert arrays["t"].flags.c_contiguous and arrays["p"].flags.c_contiguous
+
+
+def test_get_reading_arrays_handles_empty_range(patched_db):
+    """Empty ranges return empty arrays for every field."""
+    arrays = get_reading_arrays(fields=("p",))
+    assert len(arrays["t"]) == 0
+    assert len(arrays["p"]) == 0
+
+
+def test_latest_energy_reading_omits_raw_payload(patched_db, sample_readings):
+    """Latest reading returns the newest row's columns without the raw payload."""
+    latest = latest_energy_reading()
+
+    assert "raw_payload" not in latest
+    assert latest["timestamp"] == sample_readings[-1]["timestamp"].replace(tzinfo=None).isoformat()
+    assert latest["energy_in_kwh"] == sample_readings[-1]["energy_in_kwh"]
+
+
+def test_latest_energy_reading_returns_none_when_empty(patched_db):
+    """No readings yields None instead of raising."""
+    assert latest_energy_reading() is None
+
+
+def test_get_bucketed_readings_averages_power_and_keeps_last_energy(patched_db, sample_readings):
+    """Buckets average power fields and take the last cumulative energy value."""
+    rows = get_bucketed_readings(None, None, fields=("p1", "e"), bucket_ms=6 * 3600 * 1000)
+
+    assert len(rows) in (12, 13)  # 72 hourly readings in 6-hour buckets, maybe unaligned
+    assert all(r["t"] % (6 * 3600 * 1000) == 0 for r in rows)
+    assert all(r["p1"] == pytest.approx(200.0) for r in rows)
+    assert rows[-1]["e"] == pytest.approx(sample_readings[-1]["energy_in_kwh"])
+
+
+def test_get_phase_stats_reports_imbalance(patched_db, sample_readings):
+    """Phase stats include per-phase aggregates and the spread of phase averages."""
+    stats = get_phase_stats(None, None)
+
+    assert stats["p1"]["avg_power_watts"] == pytest.approx(200.0)
+    assert stats["p3"]["max_power_watts"] == pytest.approx(150.0)
+    assert stats["imbalance_ratio"] == pytest.approx(50.0 / (500.0 / 3))
+
+
+def test_get_phase_stats_handles_empty_range(patched_db):
+    """Empty ranges produce null aggregates and no imbalance ratio."""
+    stats = get_phase_stats(None, None)
+    assert stats["p1"]["avg_power_watts"] is None
+    assert stats["imbalance_ratio"] is None
+
+
+def test_daily_energy_baseline_reads_hourly_rollups(patched_db, sample_readings):
+    """Baseline is the meter value at day start and the average daily usage before it."""
+    rebuild_rollups()
+    day_start = sample_readings[24]["timestamp"].replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+    start_kwh, typical_kwh = daily_energy_baseline(day_start)
+
+    assert start_kwh == pytest.approx(sample_readings[24]["energy_in_kwh"])
+    assert typical_kwh == pytest.approx(24 * 0.5, rel=0.05)
+
+
+@pytest.mark.parametrize("backfill", [False, True], ids=["new", "backfill"])
+def test_data_state_tells_new_readings_from_backfills(patched_db, sample_readings, backfill):
+    """Readings before the high-water mark's hour change the generation; new readings only the mark."""
+    rebuild_rollups()
+    before = data_state()
+    assert before.high_water_ms == int(sample_readings[-1]["timestamp"].timestamp() * 1000)
+
+    offset = timedelta(hours=-5, minutes=-30) if backfill else timedelta(seconds=10)
+    timestamp = sample_readings[-1]["timestamp"] + offset
+    with patched_db() as session:
+        session.add(EnergyReading(timestamp=timestamp, power_watts=1.0, raw_payload="{}"))
+        session.commit()
+    rebuild_rollups()
+
+    after = data_state()
+    assert after.rows == before.rows + 1
+    assert after.generation == before.generation + backfill
+    assert (after.high_water_ms > before.high_water_ms) != backfill
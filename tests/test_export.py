@@ -0,0 +1,87 @@
+"""Tests for streaming exports."""
+
+import csv
+import io
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from src.database import iter_bucketed_readings
+from src.export import export_cli
+from src.export import parse_fields
+from src.export import stream_export
+
+
+def _read_csv(chunks) -> list[list[str]]:
+    return list(csv.reader(io.StringIO("".join(chunks))))
+
+
+def test_csv_export_streams_all_rows_with_header(patched_db, sample_readings, monkeypatch):
+    """CSV export spans several keyset chunks without losing or repeating rows."""
+    monkeypatch.setattr("src.export.EXPORT_CHUNK_ROWS", 10)
+    rows = _read_csv(stream_export(None, None, ("p", "e"), "csv"))
+
+    assert rows[0] == ["timestamp_ms", "power_watts", "energy_in_kwh"]
+    assert len(rows) == len(sample_readings) + 1
+    assert len({r[0] for r in rows[1:]}) == len(sample_readings)
+
+
+def test_csv_export_resamples_to_interval(patched_db, sample_readings):
+    """An interval groups readings into fixed buckets."""
+    rows = _read_csv(stream_export(None, None, ("p",), "csv", interval_s=24 * 3600))
+    assert len(rows) - 1 in (3, 4)  # 72 hourly readings, maybe straddling a day boundary
+
+
+def test_parquet_export_round_trips(patched_db, sample_readings):
+    """Parquet export produces one readable file with typed columns."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = b"".join(stream_export(None, None, ("p1", "o"), "parquet"))
+
+    table = pq.read_table(io.BytesIO(data))
+    assert table.column_names == ["timestamp_ms", "power_phase_1_watts", "energy_out_kwh"]
+    assert table.num_rows == len(sample_readings)
+
+
+@pytest.mark.parametrize("fields,fmt", [("p,bogus", "csv"), ("p", "xlsx")])
+def test_export_rejects_unknown_fields_and_formats(fields, fmt):
+    """Invalid fields or formats fail before any rows are read."""
+    with pytest.raises(ValueError):
+        stream_export(None, None, parse_fields(fields), fmt)
+
+
+@pytest.mark.parametrize("interval_s", [0, -1])
+def test_export_rejects_non_positive_intervals(interval_s):
+    """A zero or negative interval would never advance the bucket windows."""
+    with pytest.raises(ValueError):
+        stream_export(None, None, ("p",), "csv", interval_s=interval_s)
+
+
+def test_bucketed_readings_require_a_positive_window(patched_db, sample_readings):
+    with pytest.raises(AssertionError):
+        next(iter_bucketed_readings(None, None, ("p",), bucket_ms=-1000))
+
+
+@pytest.mark.parametrize(
+    "interval,expected_status",
+    [("3600", 200), ("0", 400), ("-1", 400), ("5m", 400), ("abc", 400), ("1.5", 400), ("", 400)],
+)
+def test_api_export_validates_interval(client, patched_db, sample_readings, interval, expected_status):
+    response = client.get(f"/api/export?interval={interval}")
+
+    assert response.status_code == expected_status
+
+
+@pytest.mark.parametrize(
+    "args,error",
+    [(["--interval", "-5"], "interval"), (["--fields", "bogus"], "bogus"), (["--format", "xml"], "xml")],
+)
+def test_export_cli_reports_invalid_options(tmp_path, args, error):
+    app = typer.Typer()
+    app.command()(export_cli)
+
+    result = CliRunner().invoke(app, [str(tmp_path / "out.csv"), *args])
+
+    assert result.exit_code == 1
+    assert "Error:" in result.output and error in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
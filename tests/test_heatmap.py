@@ -0,0 +1,73 @@
+"""Tests for the day x hour heatmap."""
+
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from src.database import EnergyReading
+from src.database import rebuild_rollups
+from src.heatmap import get_heatmap
+
+
+@pytest.fixture
+def two_days(patched_db):
+    """Readings every 10 minutes over the two days before today: 1 kW, 4 kW from 18:00 to 19:00."""
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=2)
+    energy = 100.0
+    with patched_db() as session:
+        for i in range(2 * 144):
+            timestamp = first_day + timedelta(minutes=10 * i)
+            power = 4000.0 if timestamp.hour == 18 else 1000.0
+            energy += power / 6000
+            session.add(
+                EnergyReading(timestamp=timestamp, power_watts=power, energy_in_kwh=energy, raw_payload="{}")
+            )
+        session.commit()
+    rebuild_rollups()
+    return first_day
+
+
+@pytest.mark.parametrize(
+    "metric,hour,expected",
+    [
+        ("energy", 0, 5 / 6),  # no earlier reading: from the first reading of the hour on
+        ("energy", 1, 1.0),
+        ("energy", 18, 4.0),
+        ("energy", 19, 1.0),
+        ("mean_power", 18, 4000.0),
+        ("max_power", 19, 1000.0),
+    ],
+)
+def test_heatmap_cells_hold_hourly_values(two_days, metric, hour, expected):
+    heatmap = get_heatmap(two_days, two_days + timedelta(days=1, hours=12), metric)
+
+    assert heatmap["days"] == 2 and heatmap["hours"] == 24
+    assert heatmap["start"] == int(two_days.timestamp() * 1000)
+    assert len(heatmap["values"]) == 48
+    assert heatmap["values"][hour] == pytest.approx(expected, abs=1e-4)
+    if metric == "energy" and hour:
+        assert heatmap["values"][24 + hour] == pytest.approx(expected, abs=1e-4)
+
+
+def test_heatmap_leaves_hours_without_data_empty(two_days):
+    heatmap = get_heatmap(two_days - timedelta(days=1), two_days)
+
+    assert heatmap["values"][:24] == [None] * 24
+    assert None not in heatmap["values"][24:]
+
+
+@pytest.mark.parametrize(
+    "query,expected_status",
+    [
+        ("", 200),
+        ("?metric=max_power", 200),
+        ("?metric=median", 400),
+        ("?start=1704067200000&end=1703980800000", 400),
+        ("?start=0", 400),
+    ],
+)
+def test_api_heatmap_validates_params(client, patched_db, query, expected_status):
+    response = client.get(f"/api/heatmap{query}")
+
+    assert response.status_code == expected_status
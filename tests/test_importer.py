@@ -0,0 +1,134 @@
+"""Tests for bulk import of historical readings."""
+
+import io
+import json
+from datetime import timedelta
+
+import pytest
+import typer
+from sqlalchemy import func
+from sqlalchemy import select
+from typer.testing import CliRunner
+
+from src.database import HourlyRollup
+from src.database import get_gaps
+from src.database import get_readings
+from src.database import rebuild_gap_index
+from src.database import to_db_text
+from src.importer import STAGING_TABLE
+from src.importer import bulk_insert
+from src.importer import import_cli
+from src.importer import parse_csv
+from src.importer import parse_jsonl
+from src.importer import parse_tasmota_log
+
+MT681 = {
+    "Meter_id": "0a01",
+    "Power": 412,
+    "E_in": 1234.5,
+    "E_out": 0.0,
+    "Power_p1": 200,
+    "Power_p2": 112,
+    "Power_p3": 100,
+}
+
+
+@pytest.fixture
+def patched_engine(patched_db, monkeypatch):
+    """Point the importer's raw connections at the test database."""
+    monkeypatch.setattr("src.importer.engine", patched_db.kw["bind"])
+    return patched_db
+
+
+@pytest.mark.parametrize(
+    "parser,lines",
+    [
+        (parse_jsonl, [json.dumps({"Time": "2024-01-01T12:00:00", "MT681": MT681}), ""]),
+        (
+            parse_tasmota_log,
+            [
+                "12:00:00.123 MQT: tele/tasmota/STATE = {}",
+                f"12:00:00.456 MQT: tele/tasmota/SENSOR = {json.dumps({'Time': '2024-01-01T12:00:00', 'MT681': MT681})}",
+            ],
+        ),
+        (parse_csv, ["timestamp,power_watts,energy_in_kwh", "2024-01-01T12:00:00,412,1234.5"]),
+    ],
+)
+def test_parsers_keep_original_timestamps(parser, lines):
+    """Every format yields one row stamped with the source timestamp, not the import time."""
+    rows = list(parser(io.StringIO("\n".join(lines))))
+
+    assert len(rows) == 1
+    assert rows[0][0] == "2024-01-01 12:00:00.000000"
+    assert rows[0][2] == 412.0
+    assert rows[0][3] == 1234.5
+
+
+def test_bulk_insert_fills_gaps_and_skips_existing_readings(patched_engine, sample_readings):
+    """Only rows inside gaps are loaded, the gap index is refreshed and new rows reach the rollups."""
+    rebuild_gap_index()
+    first = sample_readings[0]["timestamp"]
+    rows = [
+        (to_db_text(first + timedelta(minutes=30)), "m", 1.0, 1000.1, 0.0, 1.0, 1.0, 1.0, "{}"),
+        (to_db_text(first + timedelta(hours=1, minutes=30)), "m", 1.0, 1000.6, 0.0, 1.0, 1.0, 1.0, "{}"),
+        (
+            to_db_text(first + timedelta(seconds=2)),
+            "m",
+            1.0,
+            1000.0,
+            0.0,
+            1.0,
+            1.0,
+            1.0,
+            "{}",
+        ),  # near-duplicate
+    ]
+
+    stats = bulk_insert(iter(rows), batch_size=2)
+
+    assert stats == {**stats, "read": 3, "skipped": 1, "inserted": 2}
+    get_readings.cache_clear()
+    assert len(get_readings(start=None, end=None)) == len(sample_readings) + 2
+    assert [g["seconds"] for g in get_gaps(end=first + timedelta(hours=2))][:4] == [1800.0] * 4
+    with patched_engine() as session:
+        assert session.scalar(select(func.sum(HourlyRollup.count))) == 2
+
+
+def test_bulk_insert_restores_pragmas_when_the_import_fails(patched_engine):
+    """A failing import must not hand a connection with synchronous=OFF back to the pool."""
+
+    def rows():
+        yield ("2024-01-01 12:00:00.000000", "m", 1.0, 1000.0, 0.0, 1.0, 1.0, 1.0, "{}")
+        raise ValueError("bad line")
+
+    with pytest.raises(ValueError):
+        bulk_insert(rows())
+
+    raw = patched_engine.kw["bind"].raw_connection()
+    try:
+        cursor = raw.cursor()
+        assert cursor.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert cursor.execute("PRAGMA cache_size").fetchone()[0] == -2000
+        assert (
+            cursor.execute(f"SELECT name FROM sqlite_temp_master WHERE name = '{STAGING_TABLE}'").fetchall()
+            == []
+        )
+    finally:
+        raw.close()
+
+
+def test_csv_without_a_timestamp_column_is_rejected_up_front():
+    with pytest.raises(ValueError, match="timestamp"):
+        parse_csv(io.StringIO("time,power_watts\n2024-01-01T12:00:00,412\n"))
+
+
+def test_import_cli_reports_invalid_files(patched_engine, tmp_path):
+    path = tmp_path / "readings.csv"
+    path.write_text("time,power_watts\n2024-01-01T12:00:00,412\n")
+    app = typer.Typer()
+    app.command()(import_cli)
+
+    result = CliRunner().invoke(app, [str(path)])
+
+    assert result.exit_code == 1
+    assert "Error: CSV header ['time', 'power_watts'] has neither" in result.output
@@ -0,0 +1,63 @@
+"""Tests for the scheduler's concurrent job runner."""
+
+import threading
+import time
+
+import pytest
+
+from src.jobs import Job
+from src.jobs import JobRunner
+from src.jobs import read_job_status
+
+
+def wait_for_runs(job: Job, count: int, timeout_s: float = 5):
+    deadline = time.monotonic() + timeout_s
+    while len(job.history) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(job.history) >= count
+
+
+def fail():
+    raise RuntimeError("push rejected")
+
+
+@pytest.mark.parametrize("func,outcome", [(lambda: None, "ok"), (fail, "error")], ids=["ok", "error"])
+def test_runs_are_recorded(func, outcome):
+    job = Job("job", func, timeout_s=5)
+    JobRunner().submit(job)
+    wait_for_runs(job, 1)
+
+    assert job.history[-1]["outcome"] == outcome
+    assert not job.running
+
+
+def test_hung_job_times_out_without_blocking_others():
+    """A hung job is abandoned after its timeout, skipped while still hung, and other jobs keep running."""
+    release = threading.Event()
+    hung = Job("hung", release.wait, timeout_s=0.1)
+    quick = Job("quick", lambda: None, timeout_s=5)
+    runner = JobRunner(max_workers=2)
+
+    runner.submit(hung)
+    wait_for_runs(hung, 1)
+    runner.submit(hung)
+    runner.submit(quick)
+    wait_for_runs(quick, 1)
+
+    assert [run["outcome"] for run in hung.history] == ["timeout", "skipped"]
+    assert hung.running
+    assert quick.history[-1]["outcome"] == "ok"
+    release.set()
+
+
+def test_status_is_published_to_file(tmp_path):
+    status_file = tmp_path / "jobs.json"
+    job = Job("job", lambda: None, timeout_s=5)
+    JobRunner(status_file=status_file).submit(job)
+    deadline = time.monotonic() + 5
+    while read_job_status(status_file) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    status = read_job_status(status_file)
+    assert status["job"]["last"]["outcome"] == "ok"
+    assert len(status["job"]["history"]) == 1
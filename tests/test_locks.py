@@ -0,0 +1,56 @@
+"""Tests for the lock-wait instrumentation."""
+
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from src.database import create_db_engine
+from src.locks import lock_wait_stats
+from src.locks import percentile
+
+
+@pytest.fixture
+def engine(tmp_path):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'locks.db'}")
+    with db_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    yield db_engine
+    db_engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "values,q,expected",
+    [([], 50, None), ([5.0], 99, 5.0), ([1.0, 2.0, 3.0, 4.0], 50, 2.0), (list(range(1, 101)), 99, 99)],
+)
+def test_percentile(values, q, expected):
+    assert percentile(values, q) == expected
+
+
+def test_write_lock_wait_is_measured_apart_from_the_statement(engine, tmp_path):
+    """A write blocked by another writer records the wait as lock wait, and its commit is timed."""
+    before = lock_wait_stats()
+    other = sqlite3.connect(tmp_path / "locks.db", isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.3, other.execute, ("COMMIT",)).start()
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    other.close()
+
+    stats = lock_wait_stats()
+    assert stats["lock_wait"]["count"] == before["lock_wait"]["count"] + 1
+    assert stats["lock_wait"]["max_ms"] >= 250
+    assert stats["commit"]["count"] > before["commit"]["count"]
+
+
+def test_reads_and_autocommit_statements_do_not_take_the_write_lock(engine):
+    before = lock_wait_stats()["lock_wait"]["count"]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT count(*) FROM t")).scalar()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("INSERT INTO t VALUES (2)"))
+        assert not conn.connection.dbapi_connection.in_transaction
+
+    assert lock_wait_stats()["lock_wait"]["count"] == before
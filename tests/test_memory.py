@@ -0,0 +1,104 @@
+"""Tests for memory accounting and the cache memory budget."""
+
+import sys
+from datetime import datetime
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+import src.memory
+from src.memory import cache_usage
+from src.memory import estimate_bytes
+from src.memory import memory_stats
+from src.memory import stop_tracing
+from src.querycache import DataState
+from src.querycache import range_cache
+
+STATE = DataState(None, None, 0, 0)
+DAY = datetime(2024, 1, 1)
+
+
+def _cached(name: str, rows: int):
+    """A range-cached query returning `rows` reading dicts, registered under a unique name."""
+
+    def query(start: datetime | None, end: datetime | None):
+        return [{"t": i, "p": float(i), "e": float(i)} for i in range(rows)]
+
+    query.__qualname__ = name
+    return range_cache(lambda: STATE)(query)
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def set_budget(nbytes: int):
+        monkeypatch.setattr(src.memory, "BUDGET_BYTES", nbytes)
+
+    return set_budget
+
+
+def test_estimate_bytes_of_rows_scales_a_sample():
+    rows = [{"t": 1_700_000_000_000 + i, "p": float(i), "e": float(i)} for i in range(10_000)]
+    exact = sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values()) for row in rows
+    )
+
+    assert estimate_bytes(rows) == pytest.approx(exact, rel=0.01)
+    assert estimate_bytes(np.zeros(1000)) == 8000
+
+
+def test_cache_accounts_bytes_and_evicts_under_pressure(budget):
+    small, large = _cached("small_query", 100), _cached("large_query", 1000)
+    row_bytes = estimate_bytes(small(DAY, DAY))
+    budget(row_bytes * 100)  # room for the small result and ten large ones
+
+    for day in range(12):
+        large(DAY, DAY + timedelta(days=day))
+
+    usage = cache_usage()
+    assert usage[f"{__name__}.small_query"] == {"entries": 1, "bytes": row_bytes}
+    assert usage[f"{__name__}.large_query"]["entries"] < 12
+    assert sum(cache["bytes"] for cache in usage.values()) <= row_bytes * 100
+    # The least recently used entries went first
+    before = large.cache_info().misses
+    large(DAY, DAY + timedelta(days=11))
+    assert large.cache_info().misses == before
+
+
+def test_results_too_large_for_the_budget_are_not_cached(budget):
+    query = _cached("huge_query", 1000)
+    budget(1000)
+
+    assert query(DAY, DAY) is not query(DAY, DAY)
+    assert query.cache_info().currsize == 0
+
+
+def test_memory_stats_report_rss_and_allocation_sites_on_demand():
+    stats = memory_stats()
+    assert stats["tracing"] is False and stats["top_allocations"] == []
+    if sys.platform == "linux":
+        assert stats["rss_bytes"] > 0
+
+    src.memory.start_tracing()
+    try:
+        retained = [bytearray(1024) for _ in range(1000)]
+        stats = memory_stats(top=3)
+    finally:
+        stop_tracing()
+
+    assert stats["tracing"] is True
+    assert len(stats["top_allocations"]) == 3
+    assert stats["top_allocations"][0]["bytes"] >= 1024 * len(retained)
+    assert __file__ in stats["top_allocations"][0]["site"]
+
+
+@pytest.mark.parametrize(
+    "query,expected_status",
+    [("", 200), ("?top=5", 200), ("?trace=maybe", 400), ("?top=0", 400)],
+)
+def test_api_debug_memory_validates_params(client, query, expected_status):
+    response = client.get(f"/api/debug/memory{query}")
+
+    assert response.status_code == expected_status
+    if expected_status == 200:
+        assert "src.database.get_readings" in response.get_json()["caches"]
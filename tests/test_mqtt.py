@@ -0,0 +1,15 @@
+"""Tests for the MQTT service's DB write queue."""
+
+import queue
+
+import src.mqtt
+from src.mqtt import enqueue
+
+
+def test_full_queue_drops_the_oldest_reading(monkeypatch):
+    monkeypatch.setattr(src.mqtt, "db_queue", queue.Queue(maxsize=3))
+
+    for i in range(5):
+        enqueue({"MT681": {"i": i}})
+
+    assert [src.mqtt.db_queue.get_nowait()["MT681"]["i"] for _ in range(3)] == [2, 3, 4]
@@ -0,0 +1,105 @@
+"""Tests for the typical load profile and consumption forecasts."""
+
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from src.database import EnergyReading
+from src.database import rebuild_rollups
+from src.profile import SLOTS_PER_DAY
+from src.profile import expected_energy_kwh
+from src.profile import get_profile
+from src.profile import parse_season
+from src.profile import profile_summary
+from src.profile import update_profile
+
+ONE_KW = [[0.25] * SLOTS_PER_DAY for _ in range(7)]  # 1 kW in every 15-minute slot
+
+
+@pytest.fixture
+def weeks(patched_db):
+    """Two weeks of readings every 5 minutes ending at today's midnight: 1 kW, 3 kW on Sundays 18:00-19:00."""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=14)
+    with patched_db() as session:
+        for i in range(14 * 288):
+            timestamp = start + timedelta(minutes=5 * i)
+            power = 3000.0 if timestamp.weekday() == 6 and timestamp.hour == 18 else 1000.0
+            session.add(
+                EnergyReading(
+                    timestamp=timestamp, power_watts=power, energy_in_kwh=100.0 + i / 12, raw_payload="{}"
+                )
+            )
+        session.commit()
+    rebuild_rollups()
+    return today
+
+
+def test_update_profile_folds_each_closed_day_once(weeks):
+    assert update_profile(weeks) == 14
+    assert update_profile(weeks) == 0
+    assert update_profile(weeks + timedelta(days=1)) == 0  # no data for today yet
+
+    profile = get_profile()
+    assert profile["days"][0] == [2] * SLOTS_PER_DAY
+    assert profile["power_watts"][6][18 * 4] == pytest.approx(3000.0)
+    assert profile["power_watts"][6][19 * 4] == pytest.approx(1000.0)
+    assert profile["energy_kwh"][0][0] == pytest.approx(0.25)
+
+
+@pytest.mark.parametrize(
+    "start,end,expected_kwh",
+    [
+        (datetime(2024, 1, 1), datetime(2024, 1, 2), 24.0),
+        (datetime(2024, 1, 1, 10, 5), datetime(2024, 1, 1, 10, 10), 1 / 12),
+        (datetime(2024, 1, 1, 23, 50), datetime(2024, 1, 3, 0, 20), 24.5),
+        (datetime(2024, 1, 1), datetime(2024, 1, 1), 0.0),
+    ],
+)
+def test_expected_energy_counts_partial_slots_pro_rata(start, end, expected_kwh):
+    assert expected_energy_kwh(ONE_KW, start, end) == pytest.approx(expected_kwh)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(None, (0, 1, 2, 3)), ("all", (0, 1, 2, 3)), ("current", (1,)), ("winter", (0,)), ("autumn", (3,))],
+)
+def test_parse_season(value, expected):
+    assert parse_season(value, now=datetime(2024, 4, 15)) == expected
+
+
+def test_forecast_adds_expected_remainder_to_actual_usage(patched_db, weeks):
+    update_profile(weeks)
+    now = weeks + timedelta(hours=6)
+    with patched_db() as session:
+        for timestamp, energy in ((weeks, 500.0), (now, 506.0)):
+            session.add(EnergyReading(timestamp=timestamp, energy_in_kwh=energy, raw_payload="{}"))
+        session.commit()
+    rebuild_rollups()
+
+    summary = profile_summary(now=now)
+
+    day = summary["forecast"]["day"]
+    remaining = 18.0 + (2.0 if weeks.weekday() == 6 else 0.0)  # Sundays expect 2 kWh more from 18:00
+    assert day["start"] == int(weeks.timestamp() * 1000)
+    assert day["actual_kwh"] == pytest.approx(6.0)
+    assert day["remaining_kwh"] == pytest.approx(remaining)
+    assert day["projected_kwh"] == pytest.approx(6.0 + remaining)
+    assert summary["trailing"]["week"] == pytest.approx(7 * 24 + 2)
+
+
+def test_summary_without_profile_has_no_forecast(patched_db):
+    summary = profile_summary()
+
+    assert summary["trailing"] is None and summary["forecast"] is None
+    assert summary["seasons"] == ["winter", "spring", "summer", "autumn"]
+
+
+@pytest.mark.parametrize(
+    "query,expected_status", [("", 200), ("?season=summer", 200), ("?season=monsoon", 400)]
+)
+def test_api_profile_validates_season(client, patched_db, query, expected_status):
+    response = client.get(f"/api/profile{query}")
+
+    assert response.status_code == expected_status
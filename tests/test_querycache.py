@@ -0,0 +1,75 @@
+"""Tests for the data-driven range query cache."""
+
+from datetime import datetime
+
+import pytest
+
+from src.querycache import DataState
+from src.querycache import range_cache
+
+HOUR = datetime(2024, 1, 1, 10)  # boundary of the high-water mark below
+CLOSED = (datetime(2024, 1, 1), datetime(2024, 1, 1, 9))
+OPEN = (datetime(2024, 1, 1), None)
+CURRENT_HOUR = (datetime(2024, 1, 1), datetime(2024, 1, 1, 10, 30))
+
+
+def _cached(state: dict):
+    calls = []
+
+    @range_cache(lambda: state["now"], maxsize=10)
+    def query(start: datetime | None, end: datetime | None, fields: tuple = ("p",)):
+        calls.append((start, end, fields))
+        return [len(calls)]
+
+    return query, calls
+
+
+@pytest.fixture
+def state():
+    high_water = int(HOUR.timestamp() * 1000) + 60_000
+    return {"now": DataState(high_water, int(HOUR.timestamp() * 1000), 100, 0)}
+
+
+def test_equal_calls_hit_however_they_pass_arguments(state):
+    query, calls = _cached(state)
+
+    assert query(*CLOSED) is query(start=CLOSED[0], end=CLOSED[1], fields=("p",))
+    assert query(*CLOSED, ("e",)) is not query(*CLOSED)
+    assert len(calls) == 2
+    assert query.cache_info().hits == 2
+
+
+@pytest.mark.parametrize("span,invalidated", [(CLOSED, False), (OPEN, True), (CURRENT_HOUR, True)])
+def test_new_readings_invalidate_ranges_reaching_the_current_hour(state, span, invalidated):
+    query, calls = _cached(state)
+    first = query(*span)
+
+    state["now"] = state["now"]._replace(high_water_ms=state["now"].high_water_ms + 10_000, rows=101)
+
+    assert (query(*span) is not first) == invalidated
+    assert len(calls) == 1 + invalidated
+
+
+def test_backfill_invalidates_closed_ranges(state):
+    query, calls = _cached(state)
+    first = query(*CLOSED)
+
+    state["now"] = state["now"]._replace(rows=150, generation=1)
+
+    assert query(*CLOSED) is not first
+    assert len(calls) == 2
+    assert query.cache_info().invalidated == 1
+
+
+def test_cached_reports_current_entries_without_counting(state):
+    query, calls = _cached(state)
+    assert not query.cached(*CLOSED)
+
+    query(*CLOSED)
+
+    assert query.cached(start=CLOSED[0], end=CLOSED[1], fields=("p",))
+    assert not query.cached(*CLOSED, ("e",))
+    assert query.cache_info()[:2] == (0, 1)
+    state["now"] = state["now"]._replace(generation=1)
+    assert not query.cached(*CLOSED)
+    assert len(calls) == 1
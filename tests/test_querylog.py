@@ -0,0 +1,72 @@
+"""Tests for the slow-query log."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import text
+
+import src.querylog
+from src.database import num_total_energy_readings
+from src.querylog import install_slow_query_log
+from src.querylog import is_full_scan
+from src.querylog import recent_slow_queries
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(src.querylog, "_slow_queries", src.querylog.deque(maxlen=10))
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE readings (id INTEGER PRIMARY KEY, t TEXT, p REAL)"))
+        conn.execute(text("CREATE INDEX ix_t ON readings (t)"))
+    return engine
+
+
+@pytest.mark.parametrize(
+    "query,full_scan",
+    [("SELECT count(p) FROM readings", True), ("SELECT p FROM readings WHERE t > :t", False)],
+    ids=["scan", "index"],
+)
+def test_slow_queries_are_recorded_with_plan(engine, query, full_scan):
+    install_slow_query_log(engine, threshold_ms=0)
+    with engine.connect() as conn:
+        conn.execute(text(query), {"t": "2026-01-01"})
+
+    [entry] = recent_slow_queries()
+    assert entry["statement"] == query.replace(":t", "?")
+    assert entry["plan"]
+    assert entry["full_scan"] is full_scan
+
+
+def test_fast_queries_are_not_recorded(engine):
+    install_slow_query_log(engine, threshold_ms=10_000)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT count(p) FROM readings"))
+
+    assert recent_slow_queries() == []
+
+
+@pytest.mark.parametrize(
+    "plan,expected",
+    [
+        (["SCAN energy_readings"], True),
+        (["SCAN energy_readings USING COVERING INDEX ix_energy_readings_phases"], True),
+        (["SEARCH energy_readings USING INDEX ix_energy_readings_timestamp (timestamp>?)"], False),
+        (["SCAN CONSTANT ROW"], False),
+        (["CO-ROUTINE anon_1", "SEARCH energy_readings USING INDEX ix_t (t>?)", "SCAN anon_1"], False),
+        ([], False),
+    ],
+)
+def test_is_full_scan(plan, expected):
+    assert is_full_scan(plan) is expected
+
+
+def test_counting_all_readings_is_a_full_scan(patched_db, monkeypatch):
+    """The total count walks the whole timestamp index, which must be flagged like a table scan."""
+    monkeypatch.setattr(src.querylog, "_slow_queries", src.querylog.deque(maxlen=10))
+    install_slow_query_log(patched_db.kw["bind"], threshold_ms=0)
+
+    num_total_energy_readings()
+
+    [count] = [entry for entry in recent_slow_queries() if "FROM energy_readings" in entry["statement"]]
+    assert count["plan"] == ["SCAN energy_readings USING COVERING INDEX ix_energy_readings_timestamp"]
+    assert count["full_scan"] is True
@@ -0,0 +1,163 @@
+"""Tests for the fixed-interval resample API."""
+
+import time
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from src.database import EnergyReading
+from src.database import rebuild_rollups
+from src.resample import bucket_edges
+from src.resample import parse_aggregations
+from src.resample import parse_fill
+from src.resample import parse_interval
+from src.resample import resample
+
+
+@pytest.fixture
+def berlin(monkeypatch):
+    """Local time in Europe/Berlin, which changes clocks on 2024-03-31 and 2024-10-27."""
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def yesterday(patched_db):
+    """Readings every 10 minutes yesterday: 1 kW, 4 kW from 18:00 to 19:00, none from 12:00 to 14:00."""
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    energy = 100.0
+    with patched_db() as session:
+        for i in range(144):
+            timestamp = day + timedelta(minutes=10 * i)
+            power = 4000.0 if timestamp.hour == 18 else 1000.0
+            energy += power / 6000
+            if 12 <= timestamp.hour < 14:
+                continue
+            session.add(
+                EnergyReading(timestamp=timestamp, power_watts=power, energy_in_kwh=energy, raw_payload="{}")
+            )
+        session.commit()
+    rebuild_rollups()
+    return day
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("30s", 30), ("5m", 300), ("15m", 900), ("1h", 3600), ("6h", 21600), ("1d", 86400), ("7d", 604800)],
+)
+def test_parse_interval(value, expected):
+    assert parse_interval(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "0m", "7m", "5h", "25h", "1w", "m", "1.5h"])
+def test_parse_interval_rejects_unaligned_or_malformed(value):
+    with pytest.raises(ValueError):
+        parse_interval(value)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(None, ("mean",)), ("max,min", ("max", "min")), ("mean, mean,energy_delta", ("mean", "energy_delta"))],
+)
+def test_parse_aggregations(value, expected):
+    assert parse_aggregations(value) == expected
+
+
+@pytest.mark.parametrize("value", ["median", "mean,sum", ","])
+def test_parse_aggregations_rejects_unknown(value):
+    with pytest.raises(ValueError):
+        parse_aggregations(value)
+
+
+def test_parse_fill():
+    assert parse_fill(None) == "null"
+    assert parse_fill("linear") == "linear"
+    with pytest.raises(ValueError):
+        parse_fill("previous")
+
+
+@pytest.mark.parametrize(
+    "day,interval_s,buckets,first_hours",
+    [
+        (datetime(2024, 3, 31), 86400, 1, 23),  # clocks go forward: a 23 hour day
+        (datetime(2024, 10, 27), 86400, 1, 25),
+        (datetime(2024, 10, 27), 900, 100, 0.25),
+        (datetime(2024, 3, 31), 21600, 4, 5),  # 00:00-06:00 is 5 hours long
+        (datetime(2024, 6, 1), 3600, 24, 1),
+    ],
+)
+def test_bucket_edges_follow_local_time_across_dst(berlin, day, interval_s, buckets, first_hours):
+    edges = bucket_edges(day, day + timedelta(days=1), interval_s)
+
+    assert len(edges) - 1 == buckets
+    assert edges[0] == int(day.timestamp() * 1000)
+    assert edges[-1] == int((day + timedelta(days=1)).timestamp() * 1000)
+    assert (edges[1] - edges[0]) / 3_600_000 == first_hours
+
+
+def test_bucket_edges_start_at_or_before_start():
+    start = datetime(2024, 6, 1, 10, 7)
+    edges = bucket_edges(start, start + timedelta(minutes=20), 900)
+
+    assert [datetime.fromtimestamp(ms / 1000) for ms in edges] == [
+        datetime(2024, 6, 1, 10, 0),
+        datetime(2024, 6, 1, 10, 15),
+        datetime(2024, 6, 1, 10, 30),
+    ]
+
+
+@pytest.mark.parametrize("interval_s,source", [(30, "raw"), (300, "1m"), (3600, "1h"), (86400, "1h")])
+def test_resample_reads_the_coarsest_source_dividing_the_interval(yesterday, interval_s, source):
+    result = resample(yesterday, yesterday + timedelta(days=1), interval_s, ("mean",))
+
+    assert result["source"] == source
+    assert result["interval_s"] == interval_s
+    assert len(result["t"]) == len(result["mean"]) == 86400 // interval_s
+
+
+def test_resample_aggregates_each_bucket(yesterday):
+    result = resample(yesterday, yesterday + timedelta(days=1), 3600, ("mean", "max", "min", "energy_delta"))
+
+    assert result["t"][0] == int(yesterday.timestamp() * 1000)
+    assert result["mean"][18] == pytest.approx(4000.0)
+    assert result["max"][17] == result["min"][17] == pytest.approx(1000.0)
+    assert result["energy_delta"][18] == pytest.approx(4.0)
+    assert result["energy_delta"][19] == pytest.approx(1.0)
+    # Deltas run from the previous bucket's last counter value, so they add up to the whole day's usage
+    total = sum(v for v in result["energy_delta"] if v is not None)
+    assert total == pytest.approx(27 - 1 / 6)  # last counter value minus the first
+
+
+@pytest.mark.parametrize("fill", ["null", "linear"])
+def test_resample_fills_gaps_as_requested(yesterday, fill):
+    result = resample(yesterday, yesterday + timedelta(days=1), 3600, ("mean", "energy_delta"), fill)
+
+    if fill == "null":
+        assert result["mean"][12:14] == [None, None]
+        assert result["energy_delta"][12:14] == [None, None]
+        assert result["energy_delta"][14] == pytest.approx(3.0)  # usage over the whole gap
+    else:
+        assert result["mean"][12:14] == pytest.approx([1000.0, 1000.0])
+        assert result["energy_delta"][12:15] == pytest.approx([1.0, 1.0, 1.0])
+
+
+@pytest.mark.parametrize(
+    "query,expected_status",
+    [
+        ("?start=1717200000000&end=1717286400000&interval=1h&agg=mean,energy_delta", 200),
+        ("?start=1717200000000&end=1717286400000&interval=15m&fill=linear", 200),
+        ("?end=1717286400000&interval=1h", 400),
+        ("?start=1717200000000&end=1717286400000&interval=7m", 400),
+        ("?start=1717200000000&end=1717286400000&interval=1h&agg=median", 400),
+        ("?start=1717286400000&end=1717200000000&interval=1h", 400),
+        ("?start=0&end=1717286400000&interval=1s", 400),
+    ],
+)
+def test_api_resample_validates_params(client, patched_db, query, expected_status):
+    response = client.get(f"/api/resample{query}")
+
+    assert response.status_code == expected_status
@@ -0,0 +1,98 @@
+"""Tests for rollup tiers and retention compaction."""
+
+import json
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy import select
+
+import src.database
+import src.retention
+from src.database import EnergyReading
+from src.database import HourlyRollup
+from src.database import MinuteRollup
+from src.database import get_readings
+from src.database import get_stats
+from src.database import rebuild_rollups
+from src.database import save_energy_reading
+from src.helpers import local_timezone
+from src.retention import compact
+
+
+def _payload(power: float, energy: float) -> dict:
+    mt681 = {"Meter_id": "m", "Power": power, "E_in": energy, "E_out": 0.0}
+    return {"MT681": {**mt681, "Power_p1": power / 2, "Power_p2": power / 4, "Power_p3": power / 4}}
+
+
+def _rollup_rows(session_factory) -> dict:
+    with session_factory() as session:
+        return {
+            model.__tablename__: [tuple(row) for row in session.execute(select(model.__table__)).all()]
+            for model in (MinuteRollup, HourlyRollup)
+        }
+
+
+@pytest.fixture
+def history(patched_db):
+    """Three days of readings every 20 minutes, with rollups built from them."""
+    now = datetime.now(local_timezone())
+    with patched_db() as session:
+        for i in range(3 * 72):
+            session.add(
+                EnergyReading(
+                    timestamp=now - timedelta(days=3) + timedelta(minutes=20 * i),
+                    power_watts=100.0 + i % 7 * 50,
+                    energy_in_kwh=1000.0 + i * 0.1,
+                    raw_payload=json.dumps({"i": i}),
+                )
+            )
+        session.commit()
+    rebuild_rollups()
+    return now
+
+
+def test_ingest_rollups_match_rebuild(patched_db):
+    """Merging readings into rollups one at a time gives the same buckets as a rebuild."""
+    for power, energy in [(100.0, 1.0), (300.0, 1.1), (200.0, 1.2)]:
+        save_energy_reading(_payload(power, energy))
+    ingested = _rollup_rows(patched_db)
+    rebuild_rollups()
+
+    assert ingested == _rollup_rows(patched_db)
+    with patched_db() as session:
+        assert session.scalar(select(func.sum(HourlyRollup.count))) == 3
+        assert session.scalar(select(func.max(MinuteRollup.power_watts_max))) == 300.0
+
+
+def test_compaction_keeps_history_readable(patched_db, history, monkeypatch):
+    """Old raw rows and minute rollups are deleted in batches; reads fall back to the coarser tiers."""
+    monkeypatch.setattr(src.database, "RETENTION_RAW_DAYS", 0)
+    get_readings.cache_clear()
+    raw_stats = get_stats(history - timedelta(days=4), history)
+    raw_readings = get_readings(None, None, ("p", "e"))
+
+    monkeypatch.setattr(src.database, "RETENTION_RAW_DAYS", 1)
+    monkeypatch.setattr(src.database, "RETENTION_MINUTE_DAYS", 2)
+    monkeypatch.setattr(src.retention, "COMPACTION_PAUSE_SECONDS", 0)
+    stats = compact(batch_rows=10)
+
+    with patched_db() as session:
+        assert session.scalar(select(func.count()).select_from(EnergyReading)) < 80
+        oldest_minute = session.scalar(select(func.min(MinuteRollup.bucket)))
+    assert stats["raw_deleted"] > 130
+    assert stats["minute_deleted"] > 0
+    assert oldest_minute >= (history - timedelta(days=2, hours=1)).timestamp()
+
+    get_readings.cache_clear()
+    readings = get_readings(None, None, ("p", "e"))
+    assert readings == sorted(readings, key=lambda r: r["t"])
+    assert len(readings) < len(raw_readings)
+    assert readings[-1] == raw_readings[-1]
+
+    compacted_stats = get_stats(history - timedelta(days=4), history)
+    assert compacted_stats["count"] == raw_stats["count"]
+    assert compacted_stats["energy_used_kwh"] == pytest.approx(raw_stats["energy_used_kwh"])
+    assert compacted_stats["avg_power_watts"] == pytest.approx(raw_stats["avg_power_watts"])
+    assert compacted_stats["max_power_watts"] == raw_stats["max_power_watts"]
@@ -0,0 +1,63 @@
+"""Tests for single-flight coalescing of concurrent calls."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.singleflight import single_flight
+from src.singleflight import single_flight_stats
+
+
+def _blocking(func):
+    """Wrap func to block until released, counting the calls that actually ran."""
+    release = threading.Event()
+    runs = []
+
+    def blocked(*args):
+        runs.append(args)
+        release.wait(5)
+        return func(*args)
+
+    return blocked, release, runs
+
+
+def _call_concurrently(func, args: list, release: threading.Event) -> list:
+    with ThreadPoolExecutor(len(args)) as pool:
+        futures = [pool.submit(func, *a) for a in args]
+        time.sleep(0.1)  # let every call reach the in-flight one
+        release.set()
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_concurrent_equal_calls_share_one_result():
+    blocked, release, runs = _blocking(lambda day: {"day": day})
+    shared = single_flight(blocked)
+    before = single_flight_stats()[blocked.__qualname__]
+
+    results = _call_concurrently(shared, [("mon",)] * 5 + [("tue",)], release)
+
+    assert len(runs) == 2
+    assert all(result is results[0] for result in results[:5])
+    assert results[5] == {"day": "tue"}
+    stats = single_flight_stats()[blocked.__qualname__]
+    assert stats["calls"] - before["calls"] == 6
+    assert stats["coalesced"] - before["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_waiters_get_the_exception_and_later_calls_run_again():
+    def fail(day):
+        raise ValueError(day)
+
+    blocked, release, runs = _blocking(fail)
+    shared = single_flight(blocked)
+
+    results = _call_concurrently(shared, [("mon",)] * 3, release)
+
+    assert len(runs) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        shared("mon")
+    assert len(runs) == 2
@@ -0,0 +1,39 @@
+"""Startup-time budgets for the service entry points, measured with python -X importtime."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+# Cumulative import time per entry point in seconds, about 3x what a laptop measures, to absorb CI noise
+STARTUP_BUDGETS = {"src.mqtt": 1.0, "src.scheduler": 1.0, "src.app": 1.5}
+# Heavy dependencies only some code paths need; services must not import them at startup
+LAZY_MODULES = ("pandas", "numpy", "pyarrow", "requests")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import module in a fresh interpreter and return the cumulative import time in µs per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module,budget", STARTUP_BUDGETS.items())
+def test_entry_point_starts_within_budget(module, budget):
+    times = import_times(module)
+
+    assert not [name for name in LAZY_MODULES if name in times], f"{module} imports a lazy dependency"
+    assert times[module] / 1e6 < budget, f"{module} took {times[module] / 1e6:.2f}s to import"
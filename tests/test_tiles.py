@@ -0,0 +1,71 @@
+"""Tests for the multi-resolution tile grid."""
+
+from datetime import datetime
+
+import pytest
+
+from src.database import EnergyReading
+from src.database import get_readings
+from src.helpers import local_timezone
+from src.tiles import MAX_TILE_END_MS
+from src.tiles import TILE_LEVELS
+from src.tiles import TILE_POINTS
+from src.tiles import get_tile
+from src.tiles import tile_index
+from src.tiles import tile_span_ms
+
+
+@pytest.mark.parametrize("level", range(len(TILE_LEVELS)))
+def test_tiles_cover_the_same_number_of_points(patched_db, sample_readings, level):
+    """Every level's tile holds at most TILE_POINTS buckets aligned to the tile grid."""
+    t = int(sample_readings[36]["timestamp"].timestamp() * 1000)
+    tile = get_tile(level, t // tile_span_ms(level), fields=("p", "e"))
+
+    assert tile["start"] <= t < tile["end"]
+    assert tile["end"] - tile["start"] == tile["bucket_ms"] * TILE_POINTS
+    assert 0 < len(tile["readings"]) <= TILE_POINTS
+    assert all(tile["start"] <= r["t"] < tile["end"] for r in tile["readings"])
+
+
+def test_open_tile_is_cached_until_a_reading_arrives(patched_db, sample_readings):
+    """The tile containing now is marked incomplete; new readings invalidate its cached readings."""
+    get_readings.cache_clear()
+    t = int(sample_readings[-1]["timestamp"].timestamp() * 1000)
+    index = t // tile_span_ms(0)
+    tile = get_tile(0, index)
+
+    assert not tile["complete"]
+    assert tile["readings"][-1]["t"] == t
+    assert get_tile(0, index) == tile
+    assert get_readings.cache_info().hits == 1
+
+    new_t = (t + tile["end"]) // 2
+    with patched_db() as session:
+        timestamp = datetime.fromtimestamp(new_t / 1000, tz=local_timezone())
+        session.add(EnergyReading(timestamp=timestamp, power_watts=1.0, raw_payload="{}"))
+        session.commit()
+
+    assert get_tile(0, index)["readings"][-1]["t"] == new_t
+
+
+def test_get_tile_rejects_unknown_level(patched_db):
+    with pytest.raises(ValueError):
+        get_tile(len(TILE_LEVELS), 0)
+
+
+@pytest.mark.parametrize("level", [0, len(TILE_LEVELS) - 1])
+def test_api_tile_rejects_indexes_beyond_the_datetime_range(client, patched_db, level):
+    last = MAX_TILE_END_MS // tile_span_ms(level) - 1
+
+    assert client.get(f"/api/tiles/{level}/{last}").status_code == 200
+    assert client.get(f"/api/tiles/{level}/{last + 1}").status_code == 400
+    assert client.get(f"/api/tiles/{level}/{10**30}").status_code == 400
+
+
+def test_tile_index_reports_extent(patched_db, sample_readings):
+    """The index lists every level and the first/last reading timestamps."""
+    index = tile_index()
+
+    assert [level["level"] for level in index["levels"]] == list(range(len(TILE_LEVELS)))
+    assert index["first"] == int(sample_readings[0]["timestamp"].timestamp() * 1000)
+    assert index["last"] == int(sample_readings[-1]["timestamp"].timestamp() * 1000)
@@ -0,0 +1,89 @@
+"""Tests for the WAL checkpoint manager."""
+
+import os
+import sqlite3
+import time
+
+import pytest
+
+import src.wal
+from src.wal import MB
+from src.wal import checkpoint
+from src.wal import checkpoint_mode
+from src.wal import run_checkpoint
+from src.wal import wal_file
+from src.wal import wal_size_bytes
+from src.wal import wal_status
+
+
+@pytest.fixture
+def wal_db(tmp_path):
+    """A WAL database with uncheckpointed writes, kept open so the WAL isn't checkpointed on close."""
+    db_path = tmp_path / "energy.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    conn.execute("CREATE TABLE readings (t INTEGER, p REAL)")
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO readings VALUES (?, ?)", [(i, 450.0) for i in range(10_000)])
+    conn.execute("COMMIT")
+    yield db_path, conn
+    conn.close()
+
+
+@pytest.mark.parametrize(
+    "wal_mb,expected", [(1, "PASSIVE"), (16, "RESTART"), (63, "RESTART"), (64, "TRUNCATE")]
+)
+def test_checkpoint_mode_escalates_with_wal_size(monkeypatch, wal_mb, expected):
+    monkeypatch.setattr(src.wal, "WAL_RESTART_MB", 16)
+    monkeypatch.setattr(src.wal, "WAL_TRUNCATE_MB", 64)
+    assert checkpoint_mode(wal_mb * MB) == expected
+
+
+def test_truncate_checkpoint_empties_wal(wal_db):
+    db_path, _ = wal_db
+    assert wal_size_bytes(db_path) > 0
+
+    result = checkpoint("TRUNCATE", db_path)
+
+    assert not result["busy"]
+    assert result["checkpointed_frames"] == result["log_frames"]
+    assert result["wal_bytes_after"] == 0
+
+
+def test_checkpoint_blocked_by_reader_gives_up_quickly(wal_db):
+    """A reader's snapshot keeps a TRUNCATE from completing; the checkpoint reports busy instead of waiting."""
+    db_path, writer = wal_db
+    reader = sqlite3.connect(db_path, isolation_level=None)
+    reader.execute("BEGIN")
+    reader.execute("SELECT count(*) FROM readings").fetchone()
+    writer.execute("INSERT INTO readings VALUES (-1, 0.0)")
+
+    result = checkpoint("TRUNCATE", db_path)
+    reader.close()
+
+    assert result["busy"]
+    assert result["duration_ms"] < 1000
+    assert result["wal_bytes_after"] > 0
+
+
+def test_run_checkpoint_publishes_status(wal_db):
+    db_path, _ = wal_db
+    assert wal_status(db_path)["last_checkpoint"] is None
+
+    result = run_checkpoint(db_path)
+
+    status = wal_status(db_path)
+    assert status["last_checkpoint"] == result
+    assert status["wal_bytes"] == wal_size_bytes(db_path)
+
+
+@pytest.mark.parametrize("idle_s,expected", [(0, "PASSIVE"), (60, "TRUNCATE")])
+def test_escalated_checkpoints_wait_for_writes_to_pause(wal_db, monkeypatch, idle_s, expected):
+    db_path, _ = wal_db
+    monkeypatch.setattr(src.wal, "WAL_TRUNCATE_MB", 0.01)
+    monkeypatch.setattr(src.wal, "WAL_QUIET_SECONDS", 2)
+    written = time.time() - idle_s
+    os.utime(wal_file(db_path), (written, written))
+
+    assert run_checkpoint(db_path)["mode"] == expected